@@ -0,0 +1,30 @@
+#!/usr/bin/env bash
+
+usage ()
+{
+  CMD_NAME=`basename $0`
+  echo "Usage: $CMD_NAME [-d] [-- options]"
+  echo "  Run with \"-- -h\" to show options of the generator."
+  exit 1
+}
+
+while getopts dh OPT
+do
+    case ${OPT} in
+        d)  export PMH_PLUGIN_ROOT=""
+            ;;
+        h)  usage
+            ;;
+    esac
+done
+shift $((OPTIND - 1))
+
+BASEDIR=$(dirname "$0")/..
+
+${BASEDIR}/bin/checkver.sh || exit 1
+
+export PYTHONPATH=${PYTHONPATH}:${BASEDIR}/src
+
+python3 ${BASEDIR}/src/pyminehub/mcpe/main/generator.py "$@"
+
+exit 0
@@ -2,7 +2,12 @@ from typing import Any
 
 from pyminehub.mcpe.command.annotation import *
 from pyminehub.mcpe.command.api import *
+from pyminehub.mcpe.network.traffic import traffic_counter
 from pyminehub.mcpe.plugin.command import ExtraCommandPlugin
+from pyminehub.mcpe.plugin.profiler import plugin_profiler
+
+
+_TOP_TALKER_NUM = 5  # number of packet types reported for each player
 
 
 class AboutCommandProcessor:
@@ -21,8 +26,48 @@ class AboutCommandProcessor:
 
     @about.overload
     def _about(self, context: CommandContext, info_type: Message= '') -> None:
+        if info_type == 'plugin':
+            self._send_plugin_timing(context)
+            return
+        if info_type == 'profile':
+            self._send_slow_tick_profile(context)
+            return
+        if info_type == 'traffic':
+            self._send_top_talkers(context)
+            return
         context.send_text('This is about description by message {}.'.format(info_type))  # TODO implement this
 
+    @staticmethod
+    def _send_plugin_timing(context: CommandContext) -> None:
+        timings = plugin_profiler.timings
+        if len(timings) == 0:
+            context.send_text('No plugin is called.')
+            return
+        for timing in timings:
+            context.send_text('{}: count={} p50={:.3f}ms p90={:.3f}ms p99={:.3f}ms max={:.3f}ms slow={}'.format(
+                timing.name, timing.count,
+                timing.p50 * 1000, timing.p90 * 1000, timing.p99 * 1000, timing.max * 1000, timing.slow))
+
+    @staticmethod
+    def _send_slow_tick_profile(context: CommandContext) -> None:
+        profiles = plugin_profiler.slow_tick_profiles
+        if len(profiles) == 0:
+            context.send_text('No slow tick is profiled. (see TICK_PROFILE_THRESHOLD)')
+            return
+        context.send_text(profiles[-1])
+
+    @staticmethod
+    def _send_top_talkers(context: CommandContext) -> None:
+        addresses = traffic_counter.addresses
+        if len(addresses) == 0:
+            context.send_text('No game packet is counted.')
+            return
+        for addr in addresses:
+            context.send_text('{}:{}'.format(*addr[:2]))
+            for entry in traffic_counter.top_talkers(addr, _TOP_TALKER_NUM):
+                context.send_text('  {} {}: packets={} raw={}B compressed={}B'.format(
+                    entry.type, entry.direction, entry.packets, entry.raw_bytes, entry.compressed_bytes))
+
 
 class AboutCommandPlugin(ExtraCommandPlugin):
 
@@ -49,13 +49,10 @@ class LevelDBChunkGeneratorPlugin(ChunkGeneratorPlugin):
 
     @staticmethod
     def _create_default_chunk() -> Chunk:
-        def set_data(x: int, z: int) -> None:
-            chunk.set_block(Vector3(x, 0, z), Block.create(BlockType.BEDROCK, 0))
-            chunk.set_block(Vector3(x, 1, z), Block.create(BlockType.WATER, 0))
-            chunk.set_height(x, z, 2)
-            chunk.set_biome_id(x, z, BiomeType.OCEAN)
         chunk = create_empty_chunk()
-        foreach_xz(set_data)
+        chunk.fill(Vector3(0, 0, 0), Vector3(15, 0, 15), Block.create(BlockType.BEDROCK, 0))
+        chunk.fill(Vector3(0, 1, 0), Vector3(15, 1, 15), Block.create(BlockType.WATER, 0))
+        foreach_xz(lambda x, z: chunk.set_biome_id(x, z, BiomeType.OCEAN))
         return chunk
 
     def create(self, position: ChunkPosition) -> Chunk:
@@ -33,6 +33,11 @@ class ConfigKey(Enum):
     RAKNET_SERVER_PORT = 102
     TCP_SERVER_PORT = 103
     MAX_LOG_LENGTH = 104
+    METRICS_PORT = 105
+    METRICS_FILE = 106
+    METRICS_FILE_INTERVAL = 107
+    PACKET_TRACE_SIZE = 108
+    PACKET_TRACE_SAMPLING = 109
     # raknet
     SERVER_GUID = 201
     RESEND_TIME = 202
@@ -47,12 +52,31 @@ class ConfigKey(Enum):
     CLOCK_TICK_TIME = 308
     INIT_SPACE = 309
     PLAYER_SPAWN_POSITION = 310
+    CHUNK_LOADING_BUDGET = 311
+    CHUNK_LOADING_BUDGET_PER_PLAYER = 312
+    CHUNK_EXECUTOR = 313
+    CHUNK_EXECUTOR_WORKERS = 314
+    CHUNK_RESEND_THRESHOLD = 315
+    TICK_PHASE_BUDGET = 316
+    PLUGIN_SLOW_TIME = 317
+    TICK_PROFILE_THRESHOLD = 318
+    WORLD_EVENT_QUEUE_SIZE = 319
     # raknet and mcpe.world
     WORLD_NAME = 401
     GAME_MODE = 402
     # mcpe.network
     BATCH_COMPRESS_THRESHOLD = 501
     ROUGH_MOVE = 502
+    BATCH_COMPRESS_LEVEL = 503
+    BATCH_COMPRESS_CPU_BUDGET = 504
+    BATCH_MAX_DECOMPRESSED_SIZE = 505
+    CHUNK_RADIUS_MAX = 506
+    CHUNK_RADIUS_MIN = 507
+    CHUNK_VIEW_BUDGET = 508
+    SEND_QUEUE_THRESHOLD = 509
+    VIEW_DISTANCE_INTERVAL = 510
+    LOGIN_CONCURRENCY = 511
+    LOGIN_ADMISSION_TIMEOUT = 512
 
 
 __default_config = (
@@ -60,6 +84,11 @@ __default_config = (
     (ConfigKey.RAKNET_SERVER_PORT, 19132),
     (ConfigKey.TCP_SERVER_PORT, 19142),
     (ConfigKey.MAX_LOG_LENGTH, 100),  # cut log string. don't cut if value is None
+    (ConfigKey.METRICS_PORT, None),  # port of HTTP server on the loopback address to export metrics, disabled if None
+    (ConfigKey.METRICS_FILE, None),  # path of text file to export metrics, disabled if None
+    (ConfigKey.METRICS_FILE_INTERVAL, 10.0),  # seconds, interval to write metrics into METRICS_FILE
+    (ConfigKey.PACKET_TRACE_SIZE, None),  # number of datagrams kept in the packet trace, don't trace if None
+    (ConfigKey.PACKET_TRACE_SAMPLING, 1),  # trace one of every N datagrams
     (ConfigKey.SERVER_GUID, None),  # use random value if value is None
     (ConfigKey.RESEND_TIME, 500),  # ms, interval that is greater than interval of ACK/NCK arrives
     (ConfigKey.SEED, 0),
@@ -72,10 +101,32 @@ __default_config = (
     (ConfigKey.CLOCK_TICK_TIME, 10.0),  # seconds
     (ConfigKey.INIT_SPACE, (32, 32)),  # size of space area or None if it generate space on demand
     (ConfigKey.PLAYER_SPAWN_POSITION, (256, 56, 256)),
+    (ConfigKey.CHUNK_LOADING_BUDGET, 16),  # number of chunks loaded in a tick
+    (ConfigKey.CHUNK_LOADING_BUDGET_PER_PLAYER, 8),  # number of chunks loaded for each player in a tick
+    # CHUNK_EXECUTOR only applies if INIT_SPACE is None, since the space of INIT_SPACE is generated at startup in the
+    # event loop and loaded from DataStore after that (see mcpe.main.generator to generate it before startup).
+    # 'process' needs ChunkGeneratorPlugin.worker_factory, otherwise threads are used.
+    (ConfigKey.CHUNK_EXECUTOR, None),  # 'thread', 'process' or None if chunks are generated in the event loop
+    (ConfigKey.CHUNK_EXECUTOR_WORKERS, None),  # number of workers, or None to decide from number of CPUs
+    (ConfigKey.CHUNK_RESEND_THRESHOLD, 256),  # number of updated blocks in a chunk, resend the chunk if exceeded
+    (ConfigKey.TICK_PHASE_BUDGET, dict(input=0.3, movement=0.2, mob=0.15, extension=0.15, flush=0.2)),  # ratio of tick
+    (ConfigKey.PLUGIN_SLOW_TIME, 0.05),  # seconds, warn if a plugin call takes longer
+    (ConfigKey.TICK_PROFILE_THRESHOLD, None),  # seconds, keep cProfile report of slower ticks, don't profile if None
+    (ConfigKey.WORLD_EVENT_QUEUE_SIZE, 1024),  # number of events waiting for the network, chunks aren't loaded if full
     (ConfigKey.WORLD_NAME, 'PyMineHub'),
     (ConfigKey.GAME_MODE, 'SURVIVAL'),  # see mcpe.const.GameMode
     (ConfigKey.BATCH_COMPRESS_THRESHOLD, 256),  # bytes, compress if exceeded
+    (ConfigKey.BATCH_MAX_DECOMPRESSED_SIZE, 2 * 1024 * 1024),  # bytes, received BATCH is discarded if exceeded
     (ConfigKey.ROUGH_MOVE, True),  # don't resend move packets
+    (ConfigKey.BATCH_COMPRESS_LEVEL, 7),  # zlib level for bulky payloads, others are compressed more lightly
+    (ConfigKey.BATCH_COMPRESS_CPU_BUDGET, 0.1),  # ratio of time allowed for compression, level is lowered if exceeded
+    (ConfigKey.CHUNK_RADIUS_MAX, 16),  # chunk radius given to players is capped by it
+    (ConfigKey.CHUNK_RADIUS_MIN, 4),  # chunk radius isn't lowered below it by the load of the server
+    (ConfigKey.CHUNK_VIEW_BUDGET, 1200),  # number of chunks in the view of all players, chunk radius is capped to it
+    (ConfigKey.SEND_QUEUE_THRESHOLD, 1024),  # unacknowledged frames, chunk radius of the player is lowered if exceeded
+    (ConfigKey.VIEW_DISTANCE_INTERVAL, 5.0),  # seconds, interval to adapt chunk radius to the load
+    (ConfigKey.LOGIN_CONCURRENCY, 2),  # number of logins in flight, other logins wait for them
+    (ConfigKey.LOGIN_ADMISSION_TIMEOUT, 30.0),  # seconds, the slot of the login in flight is released if exceeded
 )
 
 _config = dict(__default_config)  # type: Dict[ConfigKey, Any]
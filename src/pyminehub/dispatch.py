@@ -0,0 +1,90 @@
+"""
+Tables that map message types to handler methods
+
+>>> class MessageType(Enum):
+...     PING = 1
+...     PONG = 2
+...     CLOSE = 3
+>>> _HANDLERS = DispatchTable(MessageType, '_process_')
+>>> class Receiver:
+...     def __init__(self):
+...         self._handlers = _HANDLERS.of(type(self))
+...     def receive(self, message_type, value):
+...         self._handlers[message_type](self, value)
+...     def _process_ping(self, value):
+...         print('ping', value)
+>>> class ExtendedReceiver(Receiver):
+...     def _process_pong(self, value):
+...         print('pong', value)
+>>> ExtendedReceiver().receive(MessageType.PONG, 1)
+pong 1
+>>> Receiver().receive(MessageType.PING, 2)
+ping 2
+>>> _HANDLERS.unhandled(Receiver)
+(<MessageType.PONG: 2>, <MessageType.CLOSE: 3>)
+>>> _HANDLERS.unhandled(ExtendedReceiver)
+(<MessageType.CLOSE: 3>,)
+"""
+from enum import Enum
+from logging import getLogger
+from typing import Any, Callable, Dict, Generic, Iterable, Tuple, TypeVar
+
+__all__ = [
+    'DispatchTable'
+]
+
+
+_logger = getLogger(__name__)
+
+K = TypeVar('K')
+
+
+def _to_lower_name(key: Enum) -> str:
+    return key.name.lower()
+
+
+class DispatchTable(Generic[K]):
+    """Map each key to the handler method, which is named prefix + to_name(key).
+
+    The table is built only once for each class, instead of building the method name for each message.
+    Subclasses have their own tables, so that they can add or override handlers.
+    """
+
+    def __init__(self, keys: Iterable[K], prefix: str, to_name: Callable[[K], str]=_to_lower_name) -> None:
+        self._keys = tuple(keys)
+        self._prefix = prefix
+        self._to_name = to_name
+        self._tables = {}  # type: Dict[type, Dict[K, Callable[..., Any]]]
+        self._unhandled = {}  # type: Dict[type, Tuple[K, ...]]
+
+    def of(self, cls: type) -> Dict[K, Callable[..., Any]]:
+        """Return the table of the class, which maps each key to the function to be called with the instance."""
+        table = self._tables.get(cls)
+        if table is None:
+            table = self._tables[cls] = self._build(cls)
+        return table
+
+    def unhandled(self, cls: type) -> Tuple[K, ...]:
+        """Keys that the class has no handler for."""
+        self.of(cls)
+        return self._unhandled[cls]
+
+    def _build(self, cls: type) -> Dict[K, Callable[..., Any]]:
+        table = {}
+        unhandled = []
+        for key in self._keys:
+            handler = getattr(cls, self._prefix + self._to_name(key), None)
+            if handler is None:
+                unhandled.append(key)
+            else:
+                table[key] = handler
+        self._unhandled[cls] = tuple(unhandled)
+        if len(unhandled) > 0:
+            _logger.info(
+                '%s has no handler for %s', cls.__name__, ', '.join(self._to_name(key) for key in unhandled))
+        return table
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
@@ -2,7 +2,7 @@ from typing import Optional, Tuple
 
 from pyminehub.mcpe.const import MoveMode, EntityType
 from pyminehub.mcpe.geometry import Vector3, Face, ChunkPositionWithDistance
-from pyminehub.mcpe.value import PlayerID, EntityRuntimeID, Item, Hotbar
+from pyminehub.mcpe.value import PlayerID, EntityRuntimeID, Item, Hotbar, Block, PlacedBlock
 from pyminehub.value import ValueType, ValueObject, ValueObjectFactory
 
 __all__ = [
@@ -29,6 +29,8 @@ class ActionType(ValueType):
     MOVE_MOB = 10
     SET_INVENTORY = 11
     REMOVE_MOB = 12
+    FILL_BLOCKS = 13
+    SET_BLOCKS = 14
 
 
 _action_specs = {
@@ -117,6 +119,16 @@ _action_specs = {
         ('type', ActionType),
         ('entity_runtime_id', EntityRuntimeID)
     ],
+    ActionType.FILL_BLOCKS: [
+        ('type', ActionType),
+        ('start', Vector3[int]),
+        ('end', Vector3[int]),
+        ('block', Block)
+    ],
+    ActionType.SET_BLOCKS: [
+        ('type', ActionType),
+        ('blocks', Tuple[PlacedBlock, ...])
+    ],
 }
 
 
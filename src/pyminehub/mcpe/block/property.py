@@ -0,0 +1,121 @@
+"""
+Flat table of block properties indexed by block ID and block data
+
+Properties are looked up without creating FunctionalBlock.
+
+>>> has_property(Block.create(BlockType.STONE, 0), CAN_BE_BROKEN)
+True
+>>> has_property(Block.create(BlockType.BEDROCK, 0), CAN_BE_BROKEN)
+False
+>>> has_property(Block.create(BlockType.SNOW_LAYER, 0), HAS_LAYER)
+True
+
+Properties that depend on block data are also in the table.
+
+>>> has_property(Block.create(BlockType.FENCE_GATE, 0), CAN_PASS)
+False
+>>> has_property(Block.create(BlockType.FENCE_GATE, 4), CAN_PASS | IS_ON)
+True
+>>> has_property(Block.create(BlockType.LEVER, 0), IS_SWITCHABLE)
+True
+>>> has_property(Block.create(BlockType.STONE, 0), IS_SWITCHABLE)
+False
+
+Passability is translated from a string of block IDs,
+and only the blocks in DATA_DEPENDENT_PASSABILITY need block data.
+
+>>> bytes([BlockType.AIR.value, BlockType.STONE.value, BlockType.TALLGRASS.value]).translate(PASSABLE_TABLE)
+b'\\x01\\x00\\x01'
+>>> BlockType.FENCE_GATE.value in DATA_DEPENDENT_PASSABILITY
+True
+"""
+from typing import Tuple
+
+from pyminehub.mcpe.block.catalog import block_specs
+from pyminehub.mcpe.const import BlockType
+from pyminehub.mcpe.value import Block
+
+__all__ = [
+    'CAN_PASS',
+    'CAN_BE_BROKEN',
+    'CAN_BE_ATTACHED_ON_GROUND',
+    'HAS_LAYER',
+    'IS_SWITCHABLE',
+    'IS_ON',
+    'BLOCK_PROPERTIES',
+    'PASSABLE_TABLE',
+    'DATA_DEPENDENT_PASSABILITY',
+    'get_properties',
+    'has_property'
+]
+
+
+CAN_PASS = 0x01
+CAN_BE_BROKEN = 0x02
+CAN_BE_ATTACHED_ON_GROUND = 0x04
+HAS_LAYER = 0x08
+IS_SWITCHABLE = 0x10
+IS_ON = 0x20
+
+_DATA_BITS = 4
+_DATA_NUM = 1 << _DATA_BITS
+_BLOCK_ID_NUM = 256
+
+
+def _compute_properties(block: Block) -> int:
+    block_spec = block_specs[block.type]
+    properties = 0
+    if block_spec.can_pass(block):
+        properties |= CAN_PASS
+    if block_spec.can_be_broken:
+        properties |= CAN_BE_BROKEN
+    if block_spec.can_be_attached_on_ground:
+        properties |= CAN_BE_ATTACHED_ON_GROUND
+    if block_spec.has_layer:
+        properties |= HAS_LAYER
+    if block_spec.is_switchable:
+        properties |= IS_SWITCHABLE
+        if block_spec.is_on(block):
+            properties |= IS_ON
+    return properties
+
+
+def _create_property_table() -> bytes:
+    table = bytearray(_BLOCK_ID_NUM * _DATA_NUM)
+    for block_type in block_specs:
+        for data in range(_DATA_NUM):
+            table[block_type.value << _DATA_BITS | data] = _compute_properties(Block.create(block_type, data))
+    return bytes(table)
+
+
+def _create_passable_table(properties: bytes) -> Tuple[bytes, Tuple[int, ...]]:
+    table = bytearray(_BLOCK_ID_NUM)
+    data_dependent = []
+    for block_id in range(_BLOCK_ID_NUM):
+        passability = set(p & CAN_PASS for p in properties[block_id << _DATA_BITS:(block_id + 1) << _DATA_BITS])
+        if len(passability) > 1:
+            data_dependent.append(block_id)
+        elif CAN_PASS in passability:
+            table[block_id] = 1
+    return bytes(table), tuple(data_dependent)
+
+
+# properties of (block ID << 4 | block data)
+BLOCK_PROPERTIES = _create_property_table()
+
+# 1 if the block can be passed through, or 0 if not or it depends on block data
+PASSABLE_TABLE, DATA_DEPENDENT_PASSABILITY = _create_passable_table(BLOCK_PROPERTIES)
+
+
+def get_properties(block: Block) -> int:
+    return BLOCK_PROPERTIES[block.type.value << _DATA_BITS | block.aux_value & 0xf]
+
+
+def has_property(block: Block, properties: int) -> bool:
+    """Return True if the block has all the properties."""
+    return BLOCK_PROPERTIES[block.type.value << _DATA_BITS | block.aux_value & 0xf] & properties == properties
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
@@ -1,12 +1,17 @@
-from itertools import islice
-from typing import Callable, Iterator, List, Sequence
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+try:
+    # noinspection PyUnresolvedReferences
+    import numpy
+except ImportError:
+    numpy = None
 
 from pyminehub.binutil.composite import CompositeCodec, VarListData, CompositeData
 from pyminehub.binutil.converter import RawData
 from pyminehub.binutil.instance import BYTE_DATA, VAR_INT_DATA, FALSE_DATA
 from pyminehub.mcpe.const import BlockType, BiomeType
 from pyminehub.mcpe.geometry import ChunkGeometry, Vector3
-from pyminehub.mcpe.value import Block
+from pyminehub.mcpe.value import Block, PlacedBlock
 
 __all__ = [
     'Chunk',
@@ -39,6 +44,7 @@ _EMPTY_BLOCK_ID = b'\00' * _layout['sub_chunk_block_id']
 _EMPTY_BLOCK_DATA = b'\00' * _layout['sub_chunk_block_data']
 _EMPTY_HEIGHT_MAP = b'\00' * _layout['chunk_height_map']
 _EMPTY_BIOME_ID = b'\00' * _layout['chunk_biome_id']
+_BLOCK_AIR = Block.create(BlockType.AIR, 0)
 
 
 class _SubChunk:
@@ -61,6 +67,9 @@ class _SubChunk:
     def _to_block_id_index(cls, x: int, y: int, z: int) -> int:
         return (x * ChunkGeometry.SHAPE.x + z) * ChunkGeometry.SHAPE.z + y
 
+    def get_block_id(self, x: int, y: int, z: int) -> int:
+        return self._block_id[self._to_block_id_index(x, y, z)]
+
     def get_block_type(self, x: int, y: int, z: int) -> BlockType:
         return BlockType(self._block_id[self._to_block_id_index(x, y, z)])
 
@@ -85,6 +94,36 @@ class _SubChunk:
         else:
             self._block_data[index] = ((block_data << 4) & 0xf0) | (self._block_data[index] & 0x0f)
 
+    def fill_column(self, x: int, z: int, y_start: int, y_end: int, block_type: BlockType, block_data: int) -> None:
+        """Set the block in [y_start, y_end) of the column."""
+        index = self._to_block_id_index(x, y_start, z)
+        self._block_id[index:index + y_end - y_start] = bytes((block_type.value, )) * (y_end - y_start)
+        if y_start & 1 == 1:
+            self.set_block_data(x, y_start, z, block_data)
+            y_start += 1
+        if y_end & 1 == 1 and y_start < y_end:
+            self.set_block_data(x, y_end - 1, z, block_data)
+            y_end -= 1
+        if y_start < y_end:
+            index = self._to_block_data_index(x, y_start, z)
+            packed_data = (block_data & 0x0f) | ((block_data << 4) & 0xf0)
+            self._block_data[index:index + (y_end - y_start) // 2] = bytes((packed_data, )) * ((y_end - y_start) // 2)
+
+    def set_column(self, x: int, z: int, y_start: int, blocks: Sequence[Block]) -> None:
+        """Set the blocks upward from y_start in the column."""
+        index = self._to_block_id_index(x, y_start, z)
+        self._block_id[index:index + len(blocks)] = bytes(block.type.value for block in blocks)
+        for y, block in enumerate(blocks, y_start):
+            self.set_block_data(x, y, z, block.data)
+
+    def is_air(self, x: int, y: int, z: int) -> bool:
+        return self._block_id[self._to_block_id_index(x, y, z)] == BlockType.AIR.value
+
+    @property
+    def block_id(self) -> bytes:
+        """Block IDs in order of x, z and y."""
+        return bytes(self._block_id)
+
 
 def _create_empty_sub_chunk() -> _SubChunk:
     return _SubChunk(_EMPTY_HEADER, _EMPTY_BLOCK_ID, _EMPTY_BLOCK_DATA)
@@ -133,29 +172,117 @@ class Chunk:
     def get_block(self, position: Vector3[int]) -> Block:
         sub_chunk_index = position.y // self._Y_UNIT
         if sub_chunk_index >= len(self._sub_chunk):
-            block_type = BlockType.AIR
-            return Block.create(block_type, 0)  # TODO check data or aux_value
+            return _BLOCK_AIR  # TODO check data or aux_value
         else:
             sub_chunk = self._sub_chunk[sub_chunk_index]
             y_in_sub = position.y % self._Y_UNIT
-            block_type = sub_chunk.get_block_type(position.x, y_in_sub, position.z)
+            block_id = sub_chunk.get_block_id(position.x, y_in_sub, position.z)
             block_data = sub_chunk.get_block_data(position.x, y_in_sub, position.z)
-            return Block.create(block_type, block_data)
+            return Block.from_id(block_id, block_data)
 
     def set_block(self, position: Vector3[int], block: Block) -> None:
-        sub_chunk_index = position.y // self._Y_UNIT
-        if sub_chunk_index >= len(self._sub_chunk):
-            for _ in range(sub_chunk_index - len(self._sub_chunk) + 1):
-                self._sub_chunk.append(_create_empty_sub_chunk())
-        sub_chunk = self._sub_chunk[sub_chunk_index]
+        self._extend_sub_chunk(position.y)
+        sub_chunk = self._sub_chunk[position.y // self._Y_UNIT]
         y_in_sub = position.y % self._Y_UNIT
         sub_chunk.set_block_type(position.x, y_in_sub, position.z, block.type)
         sub_chunk.set_block_data(position.x, y_in_sub, position.z, block.data)  # TODO check data or aux_value
-        height = self.get_height(position.x, position.z)
-        if position.y == height and block.type != BlockType.AIR:
-            self.set_height(position.x, position.z, height + 1)
-        if position.y == height - 1 and block.type == BlockType.AIR:
-            self.set_height(position.x, position.z, height - 1)
+        self._update_heights({(position.x, position.z): position.y})
+
+    def fill(self, start: Vector3[int], end: Vector3[int], block: Block) -> None:
+        """Set the block in the box from start to end, including both ends.
+
+        >>> chunk = create_empty_chunk()
+        >>> chunk.fill(Vector3(0, 0, 0), Vector3(15, 2, 15), Block.create(BlockType.STONE, 0))
+        >>> chunk.fill(Vector3(1, 5, 1), Vector3(1, 17, 1), Block.create(BlockType.WOOL, 3))
+        >>> chunk.get_block(Vector3(1, 17, 1))
+        Block(type=<BlockType.WOOL: 35>, aux_value=3)
+        >>> chunk.get_height(0, 0), chunk.get_height(1, 1)
+        (3, 18)
+        >>> chunk.fill(Vector3(1, 10, 1), Vector3(1, 30, 1), Block.create(BlockType.AIR, 0))
+        >>> chunk.get_height(1, 1)
+        10
+        """
+        y_start, y_end = min(start.y, end.y), max(start.y, end.y) + 1
+        self._extend_sub_chunk(y_end - 1)
+        columns = tuple(
+            (x, z)
+            for x in range(min(start.x, end.x), max(start.x, end.x) + 1)
+            for z in range(min(start.z, end.z), max(start.z, end.z) + 1))
+        for i in range(y_start // self._Y_UNIT, (y_end - 1) // self._Y_UNIT + 1):
+            sub_chunk = self._sub_chunk[i]
+            sub_y_start = max(y_start - i * self._Y_UNIT, 0)
+            sub_y_end = min(y_end - i * self._Y_UNIT, self._Y_UNIT)
+            for x, z in columns:
+                sub_chunk.fill_column(x, z, sub_y_start, sub_y_end, block.type, block.data)
+        self._update_heights(dict.fromkeys(columns, y_end - 1))
+
+    def set_column(self, x: int, z: int, blocks: Sequence[Block], y: int=0) -> None:
+        """Set the blocks upward from y in the column.
+
+        >>> chunk = create_empty_chunk()
+        >>> chunk.set_column(0, 0, [Block.create(BlockType.BEDROCK, 0)] + [Block.create(BlockType.DIRT, 0)] * 20)
+        >>> chunk.get_block(Vector3(0, 20, 0))
+        Block(type=<BlockType.DIRT: 3>, aux_value=0)
+        >>> chunk.get_height(0, 0)
+        21
+        """
+        if len(blocks) == 0:
+            return
+        y_end = y + len(blocks)
+        self._extend_sub_chunk(y_end - 1)
+        for i in range(y // self._Y_UNIT, (y_end - 1) // self._Y_UNIT + 1):
+            sub_y_start = max(y - i * self._Y_UNIT, 0)
+            sub_y_end = min(y_end - i * self._Y_UNIT, self._Y_UNIT)
+            offset = i * self._Y_UNIT + sub_y_start - y
+            self._sub_chunk[i].set_column(x, z, sub_y_start, blocks[offset:offset + sub_y_end - sub_y_start])
+        self._update_heights({(x, z): y_end - 1})
+
+    def set_blocks(self, blocks: Iterable[PlacedBlock]) -> None:
+        """Set the blocks at the positions.
+
+        >>> chunk = create_empty_chunk()
+        >>> chunk.set_blocks([
+        ...     PlacedBlock(Vector3(0, 0, 0), Block.create(BlockType.STONE, 0)),
+        ...     PlacedBlock(Vector3(0, 3, 0), Block.create(BlockType.STONE, 0))])
+        >>> chunk.get_height(0, 0)
+        4
+        """
+        top = {}  # type: Dict[Tuple[int, int], int]
+        for position, block in blocks:
+            self._extend_sub_chunk(position.y)
+            sub_chunk = self._sub_chunk[position.y // self._Y_UNIT]
+            y_in_sub = position.y % self._Y_UNIT
+            sub_chunk.set_block_type(position.x, y_in_sub, position.z, block.type)
+            sub_chunk.set_block_data(position.x, y_in_sub, position.z, block.data)  # TODO check data or aux_value
+            column = (position.x, position.z)
+            top[column] = max(top.get(column, 0), position.y)
+        self._update_heights(top)
+
+    @property
+    def sub_chunk_num(self) -> int:
+        return len(self._sub_chunk)
+
+    def get_sub_chunk_block_id(self, index: int) -> bytes:
+        """Block IDs of the sub-chunk in order of x, z and y."""
+        return self._sub_chunk[index].block_id
+
+    def _extend_sub_chunk(self, y: int) -> None:
+        sub_chunk_index = y // self._Y_UNIT
+        if sub_chunk_index >= len(self._sub_chunk):
+            for _ in range(sub_chunk_index - len(self._sub_chunk) + 1):
+                self._sub_chunk.append(_create_empty_sub_chunk())
+
+    def _update_heights(self, top: Dict[Tuple[int, int], int]) -> None:
+        """Update height map of the columns at once.
+
+        :param top: highest y that is set in each column
+        """
+        for (x, z), y in top.items():
+            height = min(max(self.get_height(x, z), y + 1), len(self._sub_chunk) * self._Y_UNIT)
+            while height > 0 and self._sub_chunk[(height - 1) // self._Y_UNIT].is_air(
+                    x, (height - 1) % self._Y_UNIT, z):
+                height -= 1
+            self.set_height(x, z, height)
         self._is_updated = True
 
     def get_height(self, x: int, z: int) -> int:
@@ -214,25 +341,52 @@ def _divide_to_sub_chunk(block_id: bytes, block_data: bytes) -> Iterator[_SubChu
 
 
 def _divide_data(data: bytes, size: int) -> Iterator[bytes]:
+    """Divide legacy column-major data into sub-chunk data.
+
+    Legacy data has a column of units for each (x, z), and sub-chunk data has a unit of the column for each (x, z).
+
+    >>> data = bytes(range(8)) * ChunkGeometry.SHAPE.area
+    >>> size = 2 * ChunkGeometry.SHAPE.area
+    >>> [sub_data[:6] for sub_data in _divide_data(data, size)]
+    [b'\\x00\\x01\\x00\\x01\\x00\\x01', b'\\x02\\x03\\x02\\x03\\x02\\x03', \
+b'\\x04\\x05\\x04\\x05\\x04\\x05', b'\\x06\\x07\\x06\\x07\\x06\\x07']
+    >>> list(_divide_data(data, size)) == list(_divide_data_by_slice(data, size))
+    True
+    """
+    if numpy is None:
+        return _divide_data_by_slice(data, size)
+    unit_size = size // ChunkGeometry.SHAPE.area
+    columns = numpy.frombuffer(data, numpy.uint8).reshape(ChunkGeometry.SHAPE.area, -1, unit_size)
+    return (sub_data.tobytes() for sub_data in columns.transpose(1, 0, 2))
+
+
+def _divide_data_by_slice(data: bytes, size: int) -> Iterator[bytes]:
     legacy_unit_size = len(data) // ChunkGeometry.SHAPE.area
     unit_size = size // ChunkGeometry.SHAPE.area
     for i in range(len(data) // size):
-        buffer = bytearray()
-        for area_index in range(ChunkGeometry.SHAPE.area):
-            start = area_index * legacy_unit_size + i * unit_size
-            buffer += data[start:start + unit_size]
+        buffer = bytearray(size)
+        for k in range(unit_size):
+            # copy k-th byte of the unit in all columns at once
+            buffer[k::unit_size] = data[i * unit_size + k::legacy_unit_size]
         yield bytes(buffer)
 
 
-def _from_legacy_height_map(height_map: bytes) -> Iterator[int]:
-    for value in height_map:
-        yield value
-        yield 0
+def _from_legacy_height_map(height_map: bytes) -> bytes:
+    """
+    >>> _from_legacy_height_map(b'\\x01\\x02')
+    b'\\x01\\x00\\x02\\x00'
+    """
+    buffer = bytearray(len(height_map) * 2)
+    buffer[0::2] = height_map
+    return bytes(buffer)
 
 
-def _from_legacy_biome_id(biome_id: bytes) -> Iterator[int]:
-    for value in islice(biome_id, 0, None, 4):
-        yield value
+def _from_legacy_biome_id(biome_id: bytes) -> bytes:
+    """
+    >>> _from_legacy_biome_id(b'\\x01\\x00\\x00\\x00\\x02\\x00\\x00\\x00')
+    b'\\x01\\x02'
+    """
+    return bytes(biome_id[0::4])
 
 
 def create_empty_chunk() -> Chunk:
@@ -247,8 +401,8 @@ def decode_chunk(data: bytes, is_legacy=False) -> Chunk:
     if is_legacy:
         parts = _legacy_chunk_codec.decode(data)
         block_id, block_data = parts[0:2]
-        height_map = bytes(_from_legacy_height_map(parts[4]))
-        biome_id = bytes(_from_legacy_biome_id(parts[5]))
+        height_map = _from_legacy_height_map(parts[4])
+        biome_id = _from_legacy_biome_id(parts[5])
         return Chunk(tuple(_divide_to_sub_chunk(block_id, block_data)), height_map, biome_id, tuple(), tuple())
     else:
         return Chunk(*_chunk_codec.decode(data))
@@ -258,3 +412,8 @@ def foreach_xz(func: Callable[[int, int], None]) -> None:
     for x in range(ChunkGeometry.SHAPE.x):
         for z in range(ChunkGeometry.SHAPE.z):
             func(x, z)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
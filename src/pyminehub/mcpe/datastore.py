@@ -1,11 +1,13 @@
 import pickle
 import sqlite3
-from typing import Optional
+import time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
 
 from pyminehub.config import ConfigKey, get_value
 from pyminehub.mcpe.chunk import Chunk, encode_chunk, decode_chunk
 from pyminehub.mcpe.geometry import ChunkPosition
 from pyminehub.mcpe.value import PlayerState
+from pyminehub.metrics import Histogram, Sample, histogram_samples, register_collector
 
 __all__ = [
     'DataStore',
@@ -15,6 +17,8 @@ __all__ = [
 
 _PICKLE_PROTOCOL = 4
 
+_WRITE_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)  # seconds
+
 
 class DataStore:
 
@@ -24,9 +28,25 @@ class DataStore:
     def save_chunk(self, position: ChunkPosition, chunk: Chunk, insert_only=False) -> None:
         raise NotImplementedError()
 
+    def save_chunks(self, chunks: Iterable[Tuple[ChunkPosition, Chunk]], insert_only=False) -> None:
+        for position, chunk in chunks:
+            self.save_chunk(position, chunk, insert_only)
+
+    def save_encoded_chunks(self, chunks: Iterable[Tuple[ChunkPosition, bytes]], insert_only=False) -> None:
+        """Save chunks encoded by `pyminehub.mcpe.chunk.encode_chunk`."""
+        self.save_chunks(((position, decode_chunk(data)) for position, data in chunks), insert_only)
+
     def load_chunk(self, position: ChunkPosition) -> Optional[Chunk]:
         raise NotImplementedError()
 
+    def load_encoded_chunk(self, position: ChunkPosition) -> Optional[bytes]:
+        """Load chunk as it is encoded by `pyminehub.mcpe.chunk.encode_chunk`."""
+        chunk = self.load_chunk(position)
+        return encode_chunk(chunk) if chunk is not None else None
+
+    def load_chunk_positions(self) -> Iterator[ChunkPosition]:
+        raise NotImplementedError()
+
     def count_chunk(self) -> int:
         raise NotImplementedError()
 
@@ -42,6 +62,14 @@ class _DataBase(DataStore):
     def __init__(self, name: str) -> None:
         self._connection = sqlite3.connect(name + '.db')
         self._create_table()
+        self._write_time = dict(
+            (operation, Histogram(_WRITE_TIME_BUCKETS))
+            for operation in ('save_chunk', 'save_chunks', 'save_player'))  # type: Dict[str, Histogram]
+        register_collector(self._collect)
+
+    def _collect(self) -> Iterator[Sample]:
+        for operation, histogram in self._write_time.items():
+            yield from histogram_samples('pmh_datastore_write_seconds', (('operation', operation), ), histogram)
 
     def _create_table(self) -> None:
         with self._connection:
@@ -58,17 +86,41 @@ class _DataBase(DataStore):
     def save_chunk(self, position: ChunkPosition, chunk: Chunk, insert_only=False) -> None:
         encoded_chunk = encode_chunk(chunk)
         param = (encoded_chunk, position.x, position.z)
+        start_time = time.perf_counter()
         with self._connection:
             if not insert_only:
                 self._connection.execute(
                     'UPDATE chunk SET data=? WHERE x=? AND z=?', param)
             self._connection.execute(
                 'INSERT OR IGNORE INTO chunk(data,x,z) VALUES(?,?,?)', param)
+        self._write_time['save_chunk'].observe(time.perf_counter() - start_time)
+
+    def save_chunks(self, chunks: Iterable[Tuple[ChunkPosition, Chunk]], insert_only=False) -> None:
+        self.save_encoded_chunks(((position, encode_chunk(chunk)) for position, chunk in chunks), insert_only)
+
+    def save_encoded_chunks(self, chunks: Iterable[Tuple[ChunkPosition, bytes]], insert_only=False) -> None:
+        params = tuple((data, position.x, position.z) for position, data in chunks)
+        start_time = time.perf_counter()
+        with self._connection:
+            if not insert_only:
+                self._connection.executemany(
+                    'UPDATE chunk SET data=? WHERE x=? AND z=?', params)
+            self._connection.executemany(
+                'INSERT OR IGNORE INTO chunk(data,x,z) VALUES(?,?,?)', params)
+        self._write_time['save_chunks'].observe(time.perf_counter() - start_time)
 
     def load_chunk(self, position: ChunkPosition) -> Optional[Chunk]:
+        data = self.load_encoded_chunk(position)
+        return decode_chunk(data) if data is not None else None
+
+    def load_encoded_chunk(self, position: ChunkPosition) -> Optional[bytes]:
         param = (position.x, position.z)
         row = self._connection.execute('SELECT data FROM chunk WHERE x=? AND z=?', param).fetchone()
-        return decode_chunk(row[0]) if row else None
+        return row[0] if row else None
+
+    def load_chunk_positions(self) -> Iterator[ChunkPosition]:
+        for x, z in self._connection.execute('SELECT x, z FROM chunk'):
+            yield ChunkPosition(x, z)
 
     def count_chunk(self) -> int:
         row = self._connection.execute('SELECT count(*) FROM chunk').fetchone()
@@ -76,12 +128,14 @@ class _DataBase(DataStore):
 
     def save_player(self, player_id: str, player: PlayerState, insert_only=False) -> None:
         param = (pickle.dumps(player, protocol=_PICKLE_PROTOCOL), player_id)
+        start_time = time.perf_counter()
         with self._connection:
             if not insert_only:
                 self._connection.execute(
                     'UPDATE player SET data=? WHERE player_id=?', param)
             self._connection.execute(
                 'INSERT OR IGNORE INTO player(data,player_id) VALUES(?,?)', param)
+        self._write_time['save_player'].observe(time.perf_counter() - start_time)
 
     def load_player(self, player_id: str) -> Optional[PlayerState]:
         param = (player_id, )
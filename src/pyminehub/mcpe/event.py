@@ -31,6 +31,7 @@ class EventType(ValueType):
     MOB_MOVED = 14
     ENTITY_LOADED = 15
     TIME_UPDATED = 16
+    CHUNK_UPDATED = 17
     WORLD_TERMINATED = 99
 
 
@@ -69,6 +70,11 @@ _event_specs = {
         ('data', bytes),
         ('player_runtime_id', Optional[EntityRuntimeID])
     ],
+    EventType.CHUNK_UPDATED: [
+        ('type', EventType),
+        ('position', ChunkPosition),
+        ('data', bytes)
+    ],
     EventType.ENTITY_LOADED: [
         ('type', EventType),
         ('player_id', PlayerID),
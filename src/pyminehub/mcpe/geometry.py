@@ -14,7 +14,10 @@ __all__ = [
     'ChunkGeometry',
     'ChunkPosition',
     'ChunkPositionWithDistance',
+    'chunk_distance',
+    'chunk_area_offsets',
     'to_chunk_area',
+    'entering_chunk_area',
     'to_local_position',
     'revise_angle'
 ]
@@ -42,8 +45,10 @@ class Vector3(NamedTuple('Vector3', [('x', NT), ('y', NT), ('z', NT)]), Generic[
     volume = property(lambda self: self.x * self.y * self.z)
 
     def _calc(self, f, value) -> 'Vector3':
-        if isinstance(value, Number):
-            return Vector3(f(self.x, value), f(self.y, value), f(self.z, value))
+        if type(value) is Vector3:
+            return _new_vector3(f(self.x, value.x), f(self.y, value.y), f(self.z, value.z))
+        if type(value) in _SCALAR_TYPES or isinstance(value, Number):
+            return _new_vector3(f(self.x, value), f(self.y, value), f(self.z, value))
         else:
             if len(value) == 3:
                 return Vector3(f(self.x, value[0]), f(self.y, value[1]), f(self.z, value[2]))
@@ -67,6 +72,8 @@ class Vector3(NamedTuple('Vector3', [('x', NT), ('y', NT), ('z', NT)]), Generic[
         >>> Vector3(1, 2, 3) + (4, 5)
         Vector3(x=5, y=2, z=8)
         """
+        if type(value) is Vector3:
+            return _new_vector3(self.x + value.x, self.y + value.y, self.z + value.z)
         return self._calc(_op.add, value)
 
     def __sub__(self, value) -> 'Vector3':
@@ -78,6 +85,8 @@ class Vector3(NamedTuple('Vector3', [('x', NT), ('y', NT), ('z', NT)]), Generic[
         >>> Vector3(3, 2, 1) - (4, 5)
         Vector3(x=-1, y=2, z=-4)
         """
+        if type(value) is Vector3:
+            return _new_vector3(self.x - value.x, self.y - value.y, self.z - value.z)
         return self._calc(_op.sub, value)
 
     def __mul__(self, value) -> 'Vector3':
@@ -180,6 +189,14 @@ class Vector3(NamedTuple('Vector3', [('x', NT), ('y', NT), ('z', NT)]), Generic[
         return Vector3(x, self.y, z)
 
 
+_SCALAR_TYPES = (int, float)
+
+
+def _new_vector3(x, y, z) -> Vector3:
+    """Create Vector3 without the overhead of NamedTuple.__new__."""
+    return tuple.__new__(Vector3, (x, y, z))
+
+
 class Face(Enum):
     NONE = (-1, Vector3(0, 0, 0), None)
     BOTTOM = (0, Vector3(0, -1, 0), 270.0)
@@ -367,8 +384,13 @@ class ChunkPosition(NamedTuple('ChunkPosition', [('x', int), ('z', int)])):
         >>> v = Vector3(256.0, 57.625, 266.5)
         >>> ChunkPosition.at(v)
         ChunkPosition(x=16, z=16)
+        >>> ChunkPosition.at(Vector3(-1, 0, 16))
+        ChunkPosition(x=-1, z=1)
         """
-        return ChunkPosition(int(position.x // ChunkGeometry.SHAPE.x), int(position.z // ChunkGeometry.SHAPE.z))
+        x, _, z = position
+        if type(x) is int and type(z) is int:
+            return tuple.__new__(ChunkPosition, (x >> 4, z >> 4))
+        return ChunkPosition(int(x // ChunkGeometry.SHAPE.x), int(z // ChunkGeometry.SHAPE.z))
 
 
 ChunkPositionWithDistance = NamedTuple('ChunkPositionWithDistance', [('distance', int), ('position', ChunkPosition)])
@@ -376,6 +398,36 @@ ChunkPositionWithDistance = NamedTuple('ChunkPositionWithDistance', [('distance'
 _move = ((0, -1), (-1, 0), (0, 1), (1, 0))
 
 
+def chunk_distance(p1: ChunkPosition, p2: ChunkPosition) -> int:
+    """Distance in the sense of to_chunk_area, that is, the index of the ring.
+
+    >>> chunk_distance(ChunkPosition(0, 0), ChunkPosition(-2, 1))
+    2
+    """
+    return max(abs(p1.x - p2.x), abs(p1.z - p2.z))
+
+
+@functools.lru_cache(maxsize=16)
+def chunk_area_offsets(radius: int) -> Tuple[ChunkPositionWithDistance, ...]:
+    """Offsets of the chunks in to_chunk_area from the center, which are computed once for each radius.
+
+    Chunks within the smaller radius are the prefix of the offsets.
+
+    >>> len(chunk_area_offsets(2)), chunk_area_offsets(2)[:9] == chunk_area_offsets(1)
+    (25, True)
+    """
+    p = ChunkPosition(0, 0)
+    offsets = [ChunkPositionWithDistance(0, p)]
+    for distance in range(1, radius + 1):
+        p += (1, 1)
+        for m in _move:
+            for _ in range(2 * distance):
+                offsets.append(ChunkPositionWithDistance(distance, p))
+                p += m
+            # invariant: p is corner
+    return tuple(offsets)
+
+
 def to_chunk_area(center: Vector3, radius: int) -> Iterator[ChunkPositionWithDistance]:
     """
     Example:
@@ -412,14 +464,30 @@ def to_chunk_area(center: Vector3, radius: int) -> Iterator[ChunkPositionWithDis
     289
     """
     p = ChunkPosition.at(center)
-    yield ChunkPositionWithDistance(0, p)
-    for distance in range(1, radius + 1):
-        p += (1, 1)
-        for m in _move:
-            for _ in range(2 * distance):
-                yield ChunkPositionWithDistance(distance, p)
-                p += m
-            # invariant: p is corner
+    return iter(ChunkPositionWithDistance(distance, p + offset) for distance, offset in chunk_area_offsets(radius))
+
+
+def entering_chunk_area(
+        old_center: ChunkPosition,
+        new_center: ChunkPosition,
+        radius: int
+) -> Iterator[ChunkPositionWithDistance]:
+    """Chunks that are in the area around new_center, but not in the area around old_center.
+
+    >>> for p in entering_chunk_area(ChunkPosition(0, 0), ChunkPosition(1, 0), 1):
+    ...     print(p)
+    ChunkPositionWithDistance(distance=1, position=ChunkPosition(x=2, z=1))
+    ChunkPositionWithDistance(distance=1, position=ChunkPosition(x=2, z=0))
+    ChunkPositionWithDistance(distance=1, position=ChunkPosition(x=2, z=-1))
+    >>> len(list(entering_chunk_area(ChunkPosition(0, 0), ChunkPosition(3, 3), 1)))
+    9
+    """
+    dx = new_center.x - old_center.x
+    dz = new_center.z - old_center.z
+    return iter(
+        ChunkPositionWithDistance(distance, new_center + offset)
+        for distance, offset in chunk_area_offsets(radius)
+        if abs(offset.x + dx) > radius or abs(offset.z + dz) > radius)
 
 
 def to_local_position(position: Vector3) -> Vector3[int]:
@@ -427,11 +495,16 @@ def to_local_position(position: Vector3) -> Vector3[int]:
     >>> v = Vector3(256.0, 57.625, 266.5)
     >>> to_local_position(v)
     Vector3(x=0, y=57, z=10)
+    >>> to_local_position(Vector3(-1, 57, 16))
+    Vector3(x=15, y=57, z=0)
     """
-    return Vector3(
-        int(position.x % ChunkGeometry.SHAPE.x),
-        int(position.y),
-        int(position.z % ChunkGeometry.SHAPE.z))
+    x, y, z = position
+    if type(x) is int and type(y) is int and type(z) is int:
+        return _new_vector3(x & 0xf, y, z & 0xf)
+    return _new_vector3(
+        int(x % ChunkGeometry.SHAPE.x),
+        int(y),
+        int(z % ChunkGeometry.SHAPE.z))
 
 
 def revise_angle(value: float) -> float:
@@ -0,0 +1,77 @@
+import logging
+from typing import Optional, Sequence
+
+from pyminehub.mcpe.world.pregenerator import *
+
+__all__ = [
+    'run'
+]
+
+
+_logger = logging.getLogger(__name__)
+
+
+def _report(progress: GenerationProgress) -> None:
+    done = progress.generated + progress.skipped
+    _logger.info(
+        '%d/%d chunks (%.1f%%), %.1f chunks/sec',
+        done, progress.total, 100 * done / progress.total if progress.total else 100.0,
+        progress.generated / progress.elapsed_time if progress.elapsed_time else 0.0)
+
+
+def run(args: Optional[Sequence[str]]=None) -> None:
+    import argparse
+    from pyminehub.config import ConfigKey, get_value, set_config, print_config
+    from pyminehub.mcpe.datastore import create_data_store
+    from pyminehub.mcpe.plugin.loader import get_plugin_loader
+
+    parser = argparse.ArgumentParser(description='Pre-generate chunks into the data store.')
+    area_group = parser.add_mutually_exclusive_group()
+    area_group.add_argument(
+        '--rectangle', nargs=4, type=int, metavar=('X0', 'Z0', 'X1', 'Z1'),
+        help='chunk positions in [X0, X1) x [Z0, Z1) (default: area of INIT_SPACE)')
+    area_group.add_argument(
+        '--circle', nargs=3, type=int, metavar=('X', 'Z', 'RADIUS'),
+        help='chunk positions within RADIUS from (X, Z)')
+    parser.add_argument('--world-name', help='name of the world that decides the data store')
+    parser.add_argument('--seed', type=int, help='seed of the world that decides the data store')
+    parser.add_argument(
+        '--processes', type=int, default=None, help='number of worker processes (default: number of CPUs)')
+    parser.add_argument(
+        '--batch-size', type=int, default=64, help='number of chunks inserted in a transaction (default: 64)')
+    option = parser.parse_args(args)
+
+    if option.world_name is not None:
+        set_config(world_name=option.world_name)
+    if option.seed is not None:
+        set_config(seed=option.seed)
+    print_config(ConfigKey.WORLD_NAME, ConfigKey.SEED, ConfigKey.INIT_SPACE)
+
+    if option.circle is not None:
+        area = circle_area(*option.circle)
+    elif option.rectangle is not None:
+        area = rectangle_area(*option.rectangle)
+    elif get_value(ConfigKey.INIT_SPACE) is not None:
+        area = rectangle_area(0, 0, *get_value(ConfigKey.INIT_SPACE))
+    else:
+        parser.error('area is required if INIT_SPACE is None')
+    area = list(area)
+    space_size = get_value(ConfigKey.INIT_SPACE)
+    if space_size is not None:
+        outside_num = sum(1 for p in area if not (0 <= p.x < space_size[0] and 0 <= p.z < space_size[1]))
+        if outside_num > 0:
+            _logger.warning(
+                '%d of %d chunks are out of INIT_SPACE %s. The server repeats INIT_SPACE out of it, '
+                'so these chunks replace the repeated ones and make seams at their border.',
+                outside_num, len(area), space_size)
+
+    progress = pre_generate(
+        create_data_store(), get_plugin_loader().generator, area, option.processes, option.batch_size, _report)
+    _logger.info(
+        'Generated %d chunks and skipped %d chunks in %.3f seconds.',
+        progress.generated, progress.skipped, progress.elapsed_time)
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    run()
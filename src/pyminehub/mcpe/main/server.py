@@ -73,8 +73,10 @@ def run() -> None:
     from pyminehub.mcpe.world import run as run_world
     from pyminehub.raknet import raknet_server
     from pyminehub.tcp import tcp_server
+    from pyminehub.network.metrics import metrics_server
     from pyminehub.network.server import ServerProcess
-    from pyminehub.config import ConfigKey, print_config
+    from pyminehub.network.trace import packet_tracer
+    from pyminehub.config import ConfigKey, get_value, print_config
 
     print_config(
         ConfigKey.RAKNET_SERVER_PORT,
@@ -84,14 +86,20 @@ def run() -> None:
         ConfigKey.SPAWN_MOB,
         ConfigKey.INIT_SPACE,
         ConfigKey.PLAYER_SPAWN_POSITION,
+        ConfigKey.METRICS_PORT,
+        ConfigKey.METRICS_FILE,
+        ConfigKey.PACKET_TRACE_SIZE,
     )
 
+    if get_value(ConfigKey.PACKET_TRACE_SIZE) is not None:
+        packet_tracer.start(get_value(ConfigKey.PACKET_TRACE_SIZE), get_value(ConfigKey.PACKET_TRACE_SAMPLING))
+
     loop = asyncio.get_event_loop()
     store = create_data_store()
     command = CommandRegistry()
     proxy = run_world(store, get_plugin_loader(command))
     handler = MCPEServerHandler(proxy, command)
-    with ServerProcess(handler, raknet_server(handler), tcp_server(handler)):
+    with ServerProcess(handler, raknet_server(handler), tcp_server(handler), metrics_server()):
         pass
     loop.close()
 
@@ -0,0 +1,181 @@
+"""
+Admission of logins, which limits the number of logins in flight
+
+>>> from pyminehub.config import set_config, reset
+>>> set_config(login_concurrency=1)
+>>> now = 0.0
+>>> admission = LoginAdmission(lambda: now)
+>>> for addr in (('192.168.0.2', 19132), ('192.168.0.3', 19132)):
+...     admission.start(addr)
+>>> now = 0.5
+>>> for addr in (('192.168.0.2', 19132), ('192.168.0.3', 19132)):
+...     admission.request(addr)
+>>> admission.admit()
+(('192.168.0.2', 19132),)
+
+The next login waits until the login in flight is finished.
+
+>>> admission.admit()
+()
+>>> admission.waiting_num, admission.in_flight_num
+(1, 1)
+>>> now = 1.0
+>>> admission.passed(('192.168.0.2', 19132), LoginPhase.WORLD)
+>>> now = 3.0
+>>> admission.finish(('192.168.0.2', 19132))
+>>> admission.admit()
+(('192.168.0.3', 19132),)
+>>> admission.histograms[LoginPhase.ADMISSION].sum, admission.histograms[LoginPhase.TOTAL].sum
+(2.5, 3.0)
+
+The login of the disconnected client is dropped.
+
+>>> admission.cancel(('192.168.0.3', 19132))
+>>> admission.waiting_num, admission.in_flight_num
+(0, 0)
+
+The slot of the login that isn't finished within LOGIN_ADMISSION_TIMEOUT is released (e.g. the client is silent).
+
+>>> set_config(login_concurrency=1, login_admission_timeout=10.0)
+>>> for addr in (('192.168.0.4', 19132), ('192.168.0.5', 19132)):
+...     admission.start(addr)
+...     admission.request(addr)
+>>> admission.admit()
+(('192.168.0.4', 19132),)
+>>> now = 12.0
+>>> admission.admit()
+()
+>>> now = 14.0
+>>> admission.admit()
+(('192.168.0.5', 19132),)
+>>> admission.timeout_num, admission.in_flight_num
+(1, 1)
+>>> admission.finish(('192.168.0.4', 19132))  # finished too late
+>>> admission.in_flight_num
+1
+>>> reset()
+"""
+import time
+from collections import OrderedDict
+from enum import Enum
+from logging import getLogger
+from typing import Callable, Dict, Iterator, Tuple
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.metrics import Histogram, Sample, histogram_samples
+from pyminehub.network.address import Address
+
+__all__ = [
+    'LoginPhase',
+    'LoginAdmission'
+]
+
+
+class LoginPhase(Enum):
+    HANDSHAKE = 1  # LOGIN to the completion of resource packs
+    ADMISSION = 2  # waiting for the other logins in flight
+    WORLD = 3  # the player is logged in to the world
+    INVENTORY = 4  # inventory and equipment are loaded
+    CHUNKS = 5  # chunks around the player are sent, and the player is spawned
+    TOTAL = 6
+
+
+_logger = getLogger(__name__)
+
+
+_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)  # seconds
+
+
+class LoginAdmission:
+    """Let logins in one by one, up to LOGIN_CONCURRENCY at once, in order of request.
+
+    A login sends a burst of packets and chunks, so a wave of logins starves the players already playing.
+    Logins that wait are admitted as the logins in flight finish.
+    """
+
+    def __init__(self, clock: Callable[[], float]=time.monotonic) -> None:
+        self._clock = clock
+        self._start_time = {}  # type: Dict[Address, float]
+        self._phase_time = {}  # type: Dict[Address, float]  # time when the previous phase is passed
+        self._waiting = OrderedDict()  # type: OrderedDict  # Address to None, in order of request
+        self._in_flight = {}  # type: Dict[Address, float]  # time when the login is admitted
+        self._timeout_num = 0
+        self._histograms = dict((phase, Histogram(_LATENCY_BUCKETS)) for phase in LoginPhase)
+
+    @property
+    def waiting_num(self) -> int:
+        return len(self._waiting)
+
+    @property
+    def in_flight_num(self) -> int:
+        return len(self._in_flight)
+
+    @property
+    def timeout_num(self) -> int:
+        return self._timeout_num
+
+    @property
+    def histograms(self) -> Dict[LoginPhase, Histogram]:
+        return self._histograms
+
+    def start(self, addr: Address) -> None:
+        """Start measuring the login of the client."""
+        self._start_time[addr] = self._phase_time[addr] = self._clock()
+
+    def passed(self, addr: Address, phase: LoginPhase) -> None:
+        """Record time spent in the phase, which is finished now."""
+        if addr not in self._phase_time:
+            return
+        now = self._clock()
+        self._histograms[phase].observe(now - self._phase_time[addr])
+        self._phase_time[addr] = now
+
+    def request(self, addr: Address) -> None:
+        """Put the login in the queue, when the client is ready to log in."""
+        self.passed(addr, LoginPhase.HANDSHAKE)
+        self._waiting[addr] = None
+
+    def admit(self) -> Tuple[Address, ...]:
+        """Take out logins that can be started now, after releasing the slots of the logins timed out."""
+        self._release_timed_out()
+        admitted = []
+        while len(self._waiting) > 0 and len(self._in_flight) < get_value(ConfigKey.LOGIN_CONCURRENCY):
+            addr, _ = self._waiting.popitem(last=False)
+            self.passed(addr, LoginPhase.ADMISSION)
+            self._in_flight[addr] = self._clock()
+            admitted.append(addr)
+        return tuple(admitted)
+
+    def _release_timed_out(self) -> None:
+        deadline = self._clock() - get_value(ConfigKey.LOGIN_ADMISSION_TIMEOUT)
+        for addr, admitted_time in tuple(self._in_flight.items()):
+            if admitted_time < deadline:
+                _logger.info('Login of %s is timed out, its slot is released.', addr)
+                self._timeout_num += 1
+                self.cancel(addr)
+
+    def finish(self, addr: Address) -> None:
+        """Free the slot of the login, which is finished."""
+        self.passed(addr, LoginPhase.CHUNKS)
+        if addr in self._start_time:
+            self._histograms[LoginPhase.TOTAL].observe(self._clock() - self._start_time[addr])
+        self.cancel(addr)
+
+    def cancel(self, addr: Address) -> None:
+        """Drop the login, for example when the client is disconnected."""
+        self._waiting.pop(addr, None)
+        self._in_flight.pop(addr, None)
+        self._start_time.pop(addr, None)
+        self._phase_time.pop(addr, None)
+
+    def collect(self) -> Iterator[Sample]:
+        yield Sample('pmh_login_waiting', (), len(self._waiting))
+        yield Sample('pmh_login_in_flight', (), len(self._in_flight))
+        yield Sample('pmh_login_timeouts_total', (), self._timeout_num)
+        for phase, histogram in self._histograms.items():
+            yield from histogram_samples('pmh_login_duration_seconds', (('phase', phase.name.lower()), ), histogram)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
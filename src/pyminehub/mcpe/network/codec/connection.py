@@ -1,12 +1,28 @@
 """
 Codecs for connection packet
+
+>>> from pyminehub.config import set_config, reset
+>>> codec = _CompressedPacketList()
+>>> data = bytearray()
+>>> codec.write(data, (b'\\x01\\x02', b'', b'\\x03' * 300), DataCodecContext())
+>>> payloads = codec.read(data, DataCodecContext())
+>>> [len(payload) for payload in payloads]
+[2, 0, 300]
+>>> data = bytearray(zlib.compress(b'\\x00' * 1024))
+>>> set_config(batch_max_decompressed_size=1023)
+>>> codec.read(data, DataCodecContext())
+Traceback (most recent call last):
+  ...
+pyminehub.binutil.converter.BytesOperationError: Decompressed data exceeds 1023 bytes.
+>>> reset()
 """
 import zlib
 from typing import Tuple
 
-from pyminehub.binutil.converter import pop_first, DataCodecContext, DataCodec
+from pyminehub.binutil.converter import BytesOperationError, DataCodecContext, DataCodec
 from pyminehub.binutil.instance import *
-from pyminehub.config import get_value, ConfigKey
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.mcpe.network.compression import compression_policy
 from pyminehub.mcpe.network.packet import ConnectionPacketType, connection_packet_factory
 from pyminehub.network.address import AddressInPacket
 from pyminehub.network.codec import PacketCodec, ADDRESS_DATA
@@ -31,22 +47,46 @@ class _AddressList(DataCodec[Tuple[AddressInPacket, ...]]):
 
 class _CompressedPacketList(DataCodec[Tuple[bytes, ...]]):
 
-    _COMPRESS_LEVEL = 7
+    @staticmethod
+    def _decompress(data: bytes) -> bytes:
+        max_size = get_value(ConfigKey.BATCH_MAX_DECOMPRESSED_SIZE)
+        decompressor = zlib.decompressobj()
+        payload = decompressor.decompress(data, max_size)
+        if decompressor.unconsumed_tail or len(decompressor.flush(1)) > 0:
+            raise BytesOperationError('Decompressed data exceeds {} bytes.'.format(max_size))
+        if not decompressor.eof:
+            raise BytesOperationError('Compressed data is truncated.')
+        return payload
 
     @staticmethod
-    def _does_compress(payload: bytes) -> bool:
-        return len(payload) >= get_value(ConfigKey.BATCH_COMPRESS_THRESHOLD)
+    def _read_length(payload: bytes, offset: int) -> Tuple[int, int]:
+        """Read VarInt at offset and return the value and the next offset."""
+        value = 0
+        shift = 0
+        while True:
+            if offset >= len(payload):
+                raise BytesOperationError('Invalid data format. (offset = {})'.format(offset))
+            b = payload[offset]
+            offset += 1
+            value |= (b & 0x7f) << shift
+            if b & 0x80 == 0:
+                return value, offset
+            shift += 7
 
     def read(self, data: bytearray, context: DataCodecContext) -> Tuple[bytes, ...]:
-        payload = bytearray(zlib.decompress(data))
+        payload = self._decompress(data)
         context.length += len(data)
         del data[:]
-        local_context = DataCodecContext()
         payloads = []
-        while len(payload) > 0:
-            length = VAR_INT_DATA.read(payload, local_context)
-            d = pop_first(payload, length)
-            payloads.append(bytes(d))
+        offset = 0
+        while offset < len(payload):
+            length, offset = self._read_length(payload, offset)
+            end = offset + length
+            if end > len(payload):
+                raise BytesOperationError(
+                    'Data length is less than specified size. ({} < {})'.format(len(payload) - offset, length))
+            payloads.append(payload[offset:end])
+            offset = end
         return tuple(payloads)
 
     def write(self, data: bytearray, value: Tuple[bytes, ...], context: DataCodecContext) -> None:
@@ -55,7 +95,7 @@ class _CompressedPacketList(DataCodec[Tuple[bytes, ...]]):
         for v in value:
             VAR_INT_DATA.write(payload, len(v), local_context)
             payload += v
-        compressed_data = zlib.compress(payload, self._COMPRESS_LEVEL if self._does_compress(payload) else 0)
+        compressed_data = compression_policy.compress(payload, tuple(v[0] for v in value if len(v) > 0))
         data += compressed_data
         context.length += len(compressed_data)
 
@@ -0,0 +1,151 @@
+"""
+Adaptive compression for BATCH payloads
+
+>>> from pyminehub.config import set_config, reset
+>>> set_config(batch_compress_threshold=4, batch_compress_level=7, batch_compress_cpu_budget=0.1)
+>>> now = 0.0
+>>> policy = CompressionPolicy(lambda: now)
+>>> policy.choose_level(b'\\x01', (0x01, ))
+0
+>>> policy.choose_level(b'\\x3a' * 8, (GamePacketType.FULL_CHUNK_DATA.value, ))
+7
+>>> policy.choose_level(b'\\x13' * 8, (GamePacketType.MOVE_PLAYER.value, ))
+3
+
+When compression takes up the budget, the level is lowered.
+
+>>> now = 1.0
+>>> policy.account(100, 10, 0.08)
+>>> policy.cpu_usage
+0.08
+>>> policy.choose_level(b'\\x3a' * 8, (GamePacketType.FULL_CHUNK_DATA.value, ))
+3
+>>> now = 2.0
+>>> policy.account(100, 10, 0.1)
+>>> policy.choose_level(b'\\x3a' * 8, (GamePacketType.FULL_CHUNK_DATA.value, ))
+1
+>>> policy.stats
+CompressionStats(count=2, raw_bytes=200, compressed_bytes=20, time=0.18)
+>>> reset()
+"""
+import time
+import zlib
+from typing import Callable, NamedTuple, Sequence
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.mcpe.network.packet import GamePacketType
+
+__all__ = [
+    'CompressionStats',
+    'CompressionPolicy',
+    'compression_policy'
+]
+
+
+CompressionStats = NamedTuple('CompressionStats', [
+    ('count', int),
+    ('raw_bytes', int),
+    ('compressed_bytes', int),
+    ('time', float)
+])
+
+
+_NO_COMPRESSION = 0
+_FAST_COMPRESSION = 1
+
+_WINDOW_TIME = 1.0  # seconds, interval to measure the time spent compressing
+
+# payloads that are large, sent rarely and compressed well
+_BULKY_PACKET_IDS = frozenset(packet_type.value for packet_type in (
+    GamePacketType.FULL_CHUNK_DATA,
+    GamePacketType.CRAFTING_DATA,
+    GamePacketType.INVENTORY_CONTENT,
+    GamePacketType.AVAILABLE_COMMANDS
+))
+
+
+class CompressionPolicy:
+    """Choose zlib level from payload type, payload size and time spent compressing.
+
+    The BATCH payload is compressed in the event loop thread,
+    so the ratio of time spent compressing is the CPU headroom taken from the event loop.
+    """
+
+    def __init__(self, clock: Callable[[], float]=time.perf_counter) -> None:
+        self._clock = clock
+        self._window_start = clock()
+        self._window_time = 0.0
+        self._cpu_usage = 0.0
+        self._count = 0
+        self._raw_bytes = 0
+        self._compressed_bytes = 0
+        self._time = 0.0
+
+    @property
+    def cpu_usage(self) -> float:
+        """Ratio of time spent compressing in the last measured window."""
+        return self._cpu_usage
+
+    @property
+    def stats(self) -> CompressionStats:
+        return CompressionStats(self._count, self._raw_bytes, self._compressed_bytes, round(self._time, 6))
+
+    def reset_stats(self) -> None:
+        self._count = 0
+        self._raw_bytes = 0
+        self._compressed_bytes = 0
+        self._time = 0.0
+
+    def choose_level(self, payload: bytes, packet_ids: Sequence[int]) -> int:
+        """Choose zlib level.
+
+        :param payload: concatenated game packets
+        :param packet_ids: ID of game packets in the payload
+        :return: zlib level
+        """
+        if len(payload) < get_value(ConfigKey.BATCH_COMPRESS_THRESHOLD):
+            return _NO_COMPRESSION
+        level = get_value(ConfigKey.BATCH_COMPRESS_LEVEL)
+        if not any(packet_id in _BULKY_PACKET_IDS for packet_id in packet_ids):
+            level = max(_FAST_COMPRESSION, level // 2)
+        budget = get_value(ConfigKey.BATCH_COMPRESS_CPU_BUDGET)
+        if self._cpu_usage >= budget:
+            return _FAST_COMPRESSION
+        if self._cpu_usage > budget / 2:
+            headroom = (budget - self._cpu_usage) / (budget / 2)
+            level = _FAST_COMPRESSION + int((level - _FAST_COMPRESSION) * headroom)
+        return level
+
+    def compress(self, payload: bytes, packet_ids: Sequence[int]) -> bytes:
+        level = self.choose_level(payload, packet_ids)
+        start_time = self._clock()
+        data = zlib.compress(payload, level)
+        self.account(len(payload), len(data), self._clock() - start_time)
+        return data
+
+    def account(self, raw_length: int, compressed_length: int, spent_time: float) -> None:
+        """Record the result of compression.
+
+        :param raw_length: length of the payload before compression
+        :param compressed_length: length of the payload after compression
+        :param spent_time: seconds spent compressing
+        """
+        self._count += 1
+        self._raw_bytes += raw_length
+        self._compressed_bytes += compressed_length
+        self._time += spent_time
+        self._window_time += spent_time
+        now = self._clock()
+        elapsed_time = now - self._window_start
+        if elapsed_time >= _WINDOW_TIME:
+            self._cpu_usage = round(self._window_time / elapsed_time, 6)
+            self._window_start = now
+            self._window_time = 0.0
+
+
+compression_policy = CompressionPolicy()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
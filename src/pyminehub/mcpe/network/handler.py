@@ -1,11 +1,15 @@
 import time
-from logging import getLogger
-from typing import Dict, NamedTuple, Optional
+from contextlib import contextmanager
+from logging import DEBUG, getLogger
+from typing import Dict, Iterator, NamedTuple, Optional, Set
 
+from pyminehub.dispatch import DispatchTable
 from pyminehub.mcpe.network.codec import connection_packet_codec, game_packet_codec
-from pyminehub.mcpe.network.packet import ConnectionPacket, GamePacket, ConnectionPacketType, connection_packet_factory
+from pyminehub.mcpe.network.packet import ConnectionPacket, GamePacket, ConnectionPacketType, GamePacketType
+from pyminehub.mcpe.network.packet import connection_packet_factory
 from pyminehub.mcpe.network.queue import GamePacketQueue
 from pyminehub.mcpe.network.reliability import UNRELIABLE
+from pyminehub.mcpe.network.traffic import traffic_counter
 from pyminehub.network.address import Address, to_packet_format, get_unspecified_address
 from pyminehub.network.handler import GameDataHandler, SessionNotFound, Reliability, Protocol
 from pyminehub.value import LogString
@@ -17,6 +21,9 @@ __all__ = [
 
 _logger = getLogger(__name__)
 
+_CONNECTION_PACKET_HANDLERS = DispatchTable(ConnectionPacketType, '_process_')
+_GAME_PACKET_HANDLERS = DispatchTable(GamePacketType, '_process_')
+
 
 _ProtocolEntry = NamedTuple('ProtocolEntry', [
     ('protocol', Protocol),
@@ -33,6 +40,9 @@ class MCPEDataHandler(GameDataHandler):
         self.__ping_time = {}  # type: Dict[Address, int]
         self.__protocol_map = {}  # type: Dict[Address, _ProtocolEntry]
         self.__default_protocol = None
+        self.__connection_packet_handlers = _CONNECTION_PACKET_HANDLERS.of(type(self))
+        self.__game_packet_handlers = _GAME_PACKET_HANDLERS.of(type(self))
+        self.__deferred_queues = None  # type: Optional[Set[GamePacketQueue]]
 
     # GameDataHandler interface methods
 
@@ -52,8 +62,11 @@ class MCPEDataHandler(GameDataHandler):
 
     def data_received(self, data: bytes, addr: Address) -> None:
         packet = connection_packet_codec.decode(data)
-        _logger.debug('> %s', LogString(packet))
-        getattr(self, '_process_' + packet.type.name.lower())(packet, addr)
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug('> %s', LogString(packet))
+        if packet.type == ConnectionPacketType.BATCH:
+            traffic_counter.count(addr, 'in', packet.payloads, len(data))
+        self.__connection_packet_handlers[packet.type](self, packet, addr)
 
     async def update(self) -> None:
         raise NotImplementedError()
@@ -75,6 +88,9 @@ class MCPEDataHandler(GameDataHandler):
     def _get_queue(self, addr: Address) -> GamePacketQueue:
         return self.__protocol_map.get(addr, self.__default_protocol).queue
 
+    def get_send_queue_depth(self, addr: Address) -> int:
+        return self._get_protocol(addr).get_send_queue_depth(addr)
+
     def send_connection_packet(self, packet: ConnectionPacket, addr: Address, reliability: Reliability) -> None:
         """Send connection packet to specified address.
 
@@ -82,18 +98,47 @@ class MCPEDataHandler(GameDataHandler):
         :param addr: destination
         :param reliability: frame reliability
         """
-        _logger.debug('< %s', LogString(packet))
-        self._get_protocol(addr).game_data_received(
-            connection_packet_codec.encode(packet), addr, reliability)
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug('< %s', LogString(packet))
+        data = connection_packet_codec.encode(packet)
+        if packet.type == ConnectionPacketType.BATCH:
+            traffic_counter.count(addr, 'out', packet.payloads, len(data))
+        self._get_protocol(addr).game_data_received(data, addr, reliability)
 
     def send_game_packet(self, packet: GamePacket, addr: Address, immediately=True) -> None:
-        if immediately:
-            self._get_queue(addr).send_immediately(packet, addr)
+        queue = self._get_queue(addr)
+        if self.__deferred_queues is not None:
+            queue.append(packet, addr)
+            self.__deferred_queues.add(queue)
+        elif immediately:
+            queue.send_immediately(packet, addr)
         else:
-            self._get_queue(addr).append(packet, addr)
+            queue.append(packet, addr)
 
     def send_waiting_game_packet(self, addr: Address) -> None:
-        self._get_queue(addr).send()
+        queue = self._get_queue(addr)
+        if self.__deferred_queues is not None:
+            self.__deferred_queues.add(queue)
+        else:
+            queue.send()
+
+    @contextmanager
+    def deferring_game_packets(self) -> Iterator[None]:
+        """Put off sending game packets until the end of the block.
+
+        Packets to each address are accumulated and sent together, instead of a BATCH packet for each packet.
+        """
+        if self.__deferred_queues is not None:
+            yield
+            return
+        self.__deferred_queues = set()
+        try:
+            yield
+        finally:
+            queues = self.__deferred_queues
+            self.__deferred_queues = None
+            for queue in queues:
+                queue.send()
 
     def send_ping(self, addr: Address) -> None:
         self.__ping_time[addr] = self.get_current_time()
@@ -108,8 +153,9 @@ class MCPEDataHandler(GameDataHandler):
         for i, data in enumerate(packet.payloads):
             try:
                 packet = game_packet_codec.decode(data)
-                _logger.debug('> %s', LogString(packet))
-                getattr(self, '_process_' + packet.type.name.lower())(packet, addr)
+                if _logger.isEnabledFor(DEBUG):
+                    _logger.debug('> %s', LogString(packet))
+                self.__game_packet_handlers[packet.type](self, packet, addr)
             except SessionNotFound:
                 raise
             except Exception as exc:
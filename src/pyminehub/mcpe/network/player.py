@@ -1,12 +1,15 @@
+import itertools
 from typing import Generator, Optional, Set, Tuple
 
 from pyminehub.mcpe.const import PLAYER_EYE_HEIGHT, ItemType
 from pyminehub.mcpe.event import Event
-from pyminehub.mcpe.geometry import Vector3, ChunkPosition, ChunkPositionWithDistance, to_chunk_area
+from pyminehub.mcpe.geometry import Vector3, ChunkPosition, ChunkPositionWithDistance, chunk_area_offsets, \
+    chunk_distance, entering_chunk_area
 from pyminehub.mcpe.network.value import Skin, PlayerData, ClientData
 from pyminehub.mcpe.value import *
 
 __all__ = [
+    'PlayerObserver',
     'Player'
 ]
 
@@ -14,6 +17,29 @@ __all__ = [
 _NEAR_CHUNK_RADIUS = 2
 
 
+class PlayerObserver:
+    """Notified of the changes of the player, to keep the indexes of players up to date."""
+
+    def state_changed(self, player: 'Player') -> None:
+        """Called when has_identity, is_living or is_ready may be changed."""
+        pass
+
+    def chunk_loaded(self, player: 'Player', position: ChunkPosition) -> None:
+        pass
+
+    def chunk_unloaded(self, player: 'Player', position: ChunkPosition) -> None:
+        pass
+
+    def entity_monitored(self, player: 'Player', entity_runtime_id: EntityRuntimeID) -> None:
+        pass
+
+    def entity_unmonitored(self, player: 'Player', entity_runtime_id: EntityRuntimeID) -> None:
+        pass
+
+
+_NULL_OBSERVER = PlayerObserver()
+
+
 class Player:
 
     def __init__(self, protocol: int, player_data: PlayerData, client_data: ClientData) -> None:
@@ -27,9 +53,13 @@ class Player:
         self._equipped_item = Item(ItemType.AIR, None, None, None, None)
         self._metadata = None
         self._chunk_radius = 0
+        self._requested_chunk_radius = 0
         self._near_chunk_radius = _NEAR_CHUNK_RADIUS
+        self._chunk_center = None  # type: Optional[ChunkPosition]  # center of the last request
         self._requested_chunk_position = set()  # type: Set[ChunkPosition]
         self._near_chunk_position = set()  # type: Set[ChunkPosition]
+        self._loaded_chunk_position = set()  # type: Set[ChunkPosition]
+        self._observer = _NULL_OBSERVER
         self._is_living = False
         self._login_sequence = None
         self._monitored_entities = set()  # type: Set[EntityRuntimeID]
@@ -45,6 +75,10 @@ class Player:
     def set_identity(self, entity_unique_id: EntityUniqueID, entity_runtime_id: EntityRuntimeID):
         self._entity_unique_id = entity_unique_id
         self._entity_runtime_id = entity_runtime_id
+        self._observer.state_changed(self)
+
+    def set_observer(self, observer: Optional[PlayerObserver]) -> None:
+        self._observer = observer if observer is not None else _NULL_OBSERVER
 
     @property
     def id(self) -> PlayerID:
@@ -129,25 +163,81 @@ class Player:
         return self._is_living
 
     def next_required_chunk(self) -> Tuple[ChunkPositionWithDistance, ...]:
-        if ChunkPosition.at(self._position) not in self._near_chunk_position:
-            request = tuple(to_chunk_area(self._position, self._chunk_radius))
-            request_chunk_position = set(p.position for p in request) - self._requested_chunk_position
-            self._requested_chunk_position |= request_chunk_position
-            self._near_chunk_position = set(p.position for p in request if p.distance <= self._near_chunk_radius)
-            return tuple(p for p in request if p.position in request_chunk_position)
-        else:
+        """Return chunks around the player in order of distance, when the player moves away from near chunks.
+
+        The returned chunks replace the previous request,
+        so the chunks that are requested but no longer around the player are discarded.
+        Chunks that the client has are not requested again, and chunks out of the view distance are unloaded.
+        """
+        center = ChunkPosition.at(self._position)
+        if center in self._near_chunk_position:
             return tuple()
+        radius = self._chunk_radius
+        if self._chunk_center is None:
+            required = (ChunkPositionWithDistance(d, center + offset) for d, offset in chunk_area_offsets(radius))
+        else:
+            # only the ring difference is new, the rest of the area is already requested or loaded
+            pending = (
+                ChunkPositionWithDistance(chunk_distance(center, position), position)
+                for position in self._requested_chunk_position)
+            required = sorted(
+                itertools.chain(
+                    (p for p in pending if p.distance <= radius),
+                    entering_chunk_area(self._chunk_center, center, radius)),
+                key=lambda p: p.distance)
+        request = tuple(p for p in required if p.position not in self._loaded_chunk_position)
+        self._chunk_center = center
+        self._requested_chunk_position = set(p.position for p in request)
+        unloaded = tuple(p for p in self._loaded_chunk_position if chunk_distance(center, p) > radius)
+        for position in unloaded:
+            self._loaded_chunk_position.discard(position)
+            self._observer.chunk_unloaded(self, position)
+        self._near_chunk_position = set(
+            center + offset for _, offset in chunk_area_offsets(self._near_chunk_radius))
+        self._observer.state_changed(self)
+        return request
+
+    @property
+    def chunk_radius(self) -> int:
+        """Chunk radius given to the player by the server."""
+        return self._chunk_radius
+
+    @property
+    def requested_chunk_radius(self) -> int:
+        """Chunk radius requested by the client."""
+        return self._requested_chunk_radius
+
+    @requested_chunk_radius.setter
+    def requested_chunk_radius(self, value: int) -> None:
+        self._requested_chunk_radius = value
 
     def update_required_chunk(self, radius: int) -> None:
         self._chunk_radius = radius
         self._near_chunk_radius = min(radius, _NEAR_CHUNK_RADIUS)
         self._near_chunk_position = set()
+        self._chunk_center = None
+        self._observer.state_changed(self)
 
     def did_request_chunk(self, position: ChunkPosition) -> bool:
         return position in self._requested_chunk_position
 
     def discard_chunk_request(self, position: ChunkPosition) -> None:
         self._requested_chunk_position.discard(position)
+        self._observer.state_changed(self)
+
+    def add_loaded_chunk(self, position: ChunkPosition) -> None:
+        """Record the chunk that is sent to the client."""
+        if position in self._loaded_chunk_position:
+            return
+        self._loaded_chunk_position.add(position)
+        self._observer.chunk_loaded(self, position)
+
+    def has_loaded_chunk(self, position: ChunkPosition) -> bool:
+        return position in self._loaded_chunk_position
+
+    @property
+    def loaded_chunk_positions(self) -> Tuple[ChunkPosition, ...]:
+        return tuple(self._loaded_chunk_position)
 
     def next_login_sequence(self, event: Event) -> bool:
         """
@@ -162,10 +252,14 @@ class Player:
         except StopIteration:
             self._is_living = True
             self._login_sequence = None
+            self._observer.state_changed(self)
             return True
 
     def monitor_entity(self, entity_runtime_id: EntityRuntimeID) -> None:
+        if entity_runtime_id in self._monitored_entities:
+            return
         self._monitored_entities.add(entity_runtime_id)
+        self._observer.entity_monitored(self, entity_runtime_id)
 
     def does_monitor(self, entity_runtime_id: EntityRuntimeID, position: Optional[Vector3[float]]=None) -> bool:
         if entity_runtime_id in self._monitored_entities:
@@ -174,4 +268,11 @@ class Player:
             return False
 
     def removed_monitored(self, entity_runtime_id: EntityRuntimeID) -> None:
+        if entity_runtime_id not in self._monitored_entities:
+            return
         self._monitored_entities.discard(entity_runtime_id)
+        self._observer.entity_unmonitored(self, entity_runtime_id)
+
+    @property
+    def monitored_entities(self) -> Tuple[EntityRuntimeID, ...]:
+        return tuple(self._monitored_entities)
@@ -1,5 +1,5 @@
 from collections import defaultdict
-from logging import getLogger
+from logging import DEBUG, getLogger
 from typing import Callable, Dict, List, Tuple
 
 from pyminehub.mcpe.network.codec import game_packet_codec
@@ -27,7 +27,8 @@ class _BatchQueue:
 
         :param packet: game packet
         """
-        _logger.debug('< %s', LogString(packet))
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug('< %s', LogString(packet))
         self._packets.append((RELIABILITY_DICT[packet.type], packet))
 
     def send(self, sendto: Callable[[ConnectionPacket, Reliability], None]) -> None:
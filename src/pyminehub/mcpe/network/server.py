@@ -1,14 +1,18 @@
+import asyncio
+from collections import deque
 from logging import getLogger
-from typing import Callable, Dict, Optional, Tuple
+from typing import Dict, Iterable, Optional, Tuple
 
 from pyminehub.config import ConfigKey, get_value
+from pyminehub.dispatch import DispatchTable
 from pyminehub.mcpe.action import ActionType, action_factory
 from pyminehub.mcpe.command.api import GameEventType, CommandRegistry
 from pyminehub.mcpe.command.impl import CommandContextImpl
 from pyminehub.mcpe.const import *
 from pyminehub.mcpe.event import EventType, Event
-from pyminehub.mcpe.geometry import Vector3
+from pyminehub.mcpe.geometry import Vector3, ChunkPosition
 from pyminehub.mcpe.metadata import create_entity_metadata
+from pyminehub.mcpe.network.admission import LoginAdmission, LoginPhase
 from pyminehub.mcpe.network.const import *
 from pyminehub.mcpe.network.handler import MCPEDataHandler
 from pyminehub.mcpe.network.login import login_sequence
@@ -16,9 +20,12 @@ from pyminehub.mcpe.network.packet import *
 from pyminehub.mcpe.network.player import Player
 from pyminehub.mcpe.network.reliability import DEFAULT_CHANEL
 from pyminehub.mcpe.network.session import SessionManager
+from pyminehub.mcpe.network.traffic import traffic_counter
 from pyminehub.mcpe.network.value import PlayerListEntry
+from pyminehub.mcpe.network.viewdistance import ViewDistancePolicy
 from pyminehub.mcpe.value import EntityMetaData, EntityMetaDataFlagValue
 from pyminehub.mcpe.world import WorldProxy
+from pyminehub.metrics import register_collector, unregister_collector
 from pyminehub.network.address import Address, to_packet_format
 from pyminehub.network.handler import SessionNotFound
 
@@ -32,6 +39,8 @@ _logger = getLogger(__name__)
 
 _NONE_INVENTORY_SLOT = 255
 
+_EVENT_HANDLERS = DispatchTable(EventType, '_process_event_')
+
 _GAME_EVENT_TYPES = {
     GameEventType.SOUND: GamePacketType.SOUND_EVENT,
     GameEventType.SPACE: GamePacketType.SPACE_EVENT,
@@ -49,6 +58,11 @@ class MCPEServerHandler(MCPEDataHandler):
         self._accepted_time = {}  # type: Dict[Address, int]
         self._session_manager = SessionManager()
         self._is_interrupted = False
+        self._event_handlers = _EVENT_HANDLERS.of(type(self))
+        self._view_distance = ViewDistancePolicy()
+        self._lost_sessions = deque()  # type: deque  # SessionNotFound to be raised by update, one for each call
+        self._login_admission = LoginAdmission()
+        register_collector(self._login_admission.collect)
 
     # GameDataHandler interface methods
 
@@ -59,12 +73,41 @@ class MCPEServerHandler(MCPEDataHandler):
     async def update(self) -> None:
         if self._is_interrupted:
             raise KeyboardInterrupt()
-        event = await self._world.next_event()
-        getattr(self, '_process_event_' + event.type.name.lower())(event)
+        if len(self._lost_sessions) > 0:
+            raise self._lost_sessions.popleft()
+        if self._view_distance.is_due():
+            self._adapt_chunk_radius()
+        self._admit_logins()  # the slots of the logins timed out are released
+        try:
+            # wake up when chunk radius is due to be adapted, so that it recovers even if the world is idle
+            events = await asyncio.wait_for(self._world.next_events(), self._view_distance.time_until_due())
+        except asyncio.TimeoutError:
+            return
+        if len(events) == 1:
+            self._process_event(events[0])
+        else:
+            # packets for the events queued together are sent together, so that a storm of events makes few BATCHes
+            with self.deferring_game_packets():
+                for event in events:
+                    self._process_event(event)
+        if len(self._lost_sessions) > 0:
+            raise self._lost_sessions.popleft()
+
+    def _process_event(self, event: Event) -> None:
+        """Process the event, keeping the lost session to be raised by update after the other events are processed."""
+        try:
+            self._event_handlers[event.type](self, event)
+        except SessionNotFound as exc:
+            self._lost_sessions.append(exc)
+        except Exception as exc:
+            _logger.exception('%s', exc)
 
     def disconnect(self, addr: Address) -> None:
         player = self._session_manager[addr]
         del self._session_manager[addr]
+        traffic_counter.remove(addr)
+        self._login_admission.cancel(addr)
+        self._admit_logins()
 
         if not player.has_identity:
             return
@@ -96,7 +139,7 @@ class MCPEServerHandler(MCPEDataHandler):
             (PlayerListEntry(player.id, None, None, None, None), )
         )
 
-        for addr, other_player in self._session_manager.find(lambda p: p.does_monitor(player.entity_runtime_id)):
+        for addr, other_player in self._session_manager.watchers(player.entity_runtime_id):
             other_player.removed_monitored(player.entity_runtime_id)
             self.send_game_packet(text_packet, addr)
             self.send_game_packet(remove_entity_packet, addr)
@@ -106,6 +149,7 @@ class MCPEServerHandler(MCPEDataHandler):
         res_packet = connection_packet_factory.create(ConnectionPacketType.DISCONNECTION_NOTIFICATION)
         for addr in self._session_manager.addresses:
             self.send_connection_packet(res_packet, addr, DEFAULT_CHANEL)
+        unregister_collector(self._login_admission.collect)
         self._world.terminate()
 
     # local methods
@@ -113,14 +157,44 @@ class MCPEServerHandler(MCPEDataHandler):
     def update_status(self, addr: Address, is_connecting: bool) -> None:
         pass  # TODO implement
 
+    def _admit_logins(self) -> None:
+        for addr in self._login_admission.admit():
+            player = self._session_manager[addr]
+            self._world.perform(action_factory.create(ActionType.LOGIN_PLAYER, player.id, player.xuid == GUEST_XUID))
+
+    def _update_chunk_radius(self, player: Player, addr: Address, radius: int) -> None:
+        player.update_required_chunk(radius)
+        required_chunk = player.next_required_chunk()
+        if len(required_chunk) > 0:
+            self._world.perform(action_factory.create(
+                ActionType.REQUEST_CHUNK, required_chunk, player.entity_runtime_id))
+        res_packet = game_packet_factory.create(GamePacketType.CHUNK_RADIUS_UPDATED, EXTRA_DATA, radius)
+        self.send_game_packet(res_packet, addr)
+
+    def _adapt_chunk_radius(self) -> None:
+        """Change the chunk radius of players to keep the server within its capacity."""
+        players = tuple(self._session_manager.living())
+        cap = self._view_distance.cap
+        if self._view_distance.update(self._world.get_tick_histogram(), len(players)) != cap:
+            _logger.info('Chunk radius is capped to %d.', self._view_distance.cap)
+        for addr, player in players:
+            radius = self._view_distance.radius_of(
+                player.requested_chunk_radius, player.chunk_radius, self.get_send_queue_depth(addr))
+            if radius != player.chunk_radius:
+                self._update_chunk_radius(player, addr, radius)
+
     def _forward_packet_to_other_players(self, packet: GamePacket, addr: Address) -> None:
         player = self._session_manager[addr]
         for addr, p in self._session_manager.excluding(player):
             self.send_game_packet(packet, addr, immediately=False)
 
-    def _broadcast(self, packet: GamePacket, filter_func: Callable[[Player], bool]=None, immediately=True) -> None:
-        sessions = iter(self._session_manager) if filter_func is None else self._session_manager.find(filter_func)
-        for addr, _ in sessions:
+    def _broadcast(
+            self,
+            packet: GamePacket,
+            sessions: Optional[Iterable[Tuple[Address, Player]]]=None,
+            immediately=True
+    ) -> None:
+        for addr, _ in (sessions if sessions is not None else self._session_manager):
             self.send_game_packet(packet, addr, immediately)
 
     @staticmethod
@@ -170,6 +244,7 @@ class MCPEServerHandler(MCPEDataHandler):
         # TODO check the logged-in player and log out the same player
         player = Player(packet.protocol, player_data, client_data)
         self._session_manager.append(player, addr)
+        self._login_admission.start(addr)
 
         player.login(login_sequence(
             player, addr, self._session_manager, self._world, self._command, self.send_game_packet))
@@ -186,17 +261,13 @@ class MCPEServerHandler(MCPEDataHandler):
             res_packet = game_packet_factory.create(GamePacketType.RESOURCE_PACK_STACK, EXTRA_DATA, False, (), ())
             self.send_game_packet(res_packet, addr)
         elif packet.status == ResourcePackStatus.COMPLETED:
-            player = self._session_manager[addr]
-            self._world.perform(action_factory.create(ActionType.LOGIN_PLAYER, player.id, player.xuid == GUEST_XUID))
+            self._login_admission.request(addr)
+            self._admit_logins()
 
     def _process_request_chunk_radius(self, packet: GamePacket, addr: Address) -> None:
         player = self._session_manager[addr]
-        player.update_required_chunk(packet.radius)
-        required_chunk = player.next_required_chunk()
-        if len(required_chunk) > 0:
-            self._world.perform(action_factory.create(ActionType.REQUEST_CHUNK, required_chunk, None))
-        res_packet = game_packet_factory.create(GamePacketType.CHUNK_RADIUS_UPDATED, EXTRA_DATA, packet.radius)
-        self.send_game_packet(res_packet, addr)
+        player.requested_chunk_radius = packet.radius
+        self._update_chunk_radius(player, addr, min(packet.radius, self._view_distance.cap))
 
     def _process_move_player(self, packet: GamePacket, addr: Address) -> None:
         assert packet.entity_runtime_id == self._session_manager[addr].entity_runtime_id
@@ -311,7 +382,7 @@ class MCPEServerHandler(MCPEDataHandler):
 
         def generate_event(event_type: GameEventType, *args, **kwargs):
             event_packet = game_packet_factory.create(_GAME_EVENT_TYPES[event_type], EXTRA_DATA, *args, **kwargs)
-            self._broadcast(event_packet, lambda p: p.is_living)
+            self._broadcast(event_packet, self._session_manager.living())
 
         command_name, arg = packet.command[1:].partition(' ')[0:3:2]
         context = CommandContextImpl(self._command, send_text, generate_event, self._world.perform)
@@ -321,6 +392,7 @@ class MCPEServerHandler(MCPEDataHandler):
 
     def _process_event_player_logged_in(self, event: Event) -> None:
         player = self._session_manager[event.player_id]
+        self._login_admission.passed(self._session_manager.get_address(event.player_id), LoginPhase.WORLD)
         player.next_login_sequence(event)
 
     def _process_event_inventory_loaded(self, event: Event) -> None:
@@ -329,6 +401,7 @@ class MCPEServerHandler(MCPEDataHandler):
 
     def _process_event_slot_initialized(self, event: Event) -> None:
         player = self._session_manager[event.player_id]
+        self._login_admission.passed(self._session_manager.get_address(event.player_id), LoginPhase.INVENTORY)
         player.next_login_sequence(event)
 
     def _process_event_full_chunk_loaded(self, event: Event) -> None:
@@ -338,13 +411,23 @@ class MCPEServerHandler(MCPEDataHandler):
             if player.did_request_chunk(event.position):
                 self.send_game_packet(res_packet, addr)
                 player.discard_chunk_request(event.position)
+                player.add_loaded_chunk(event.position)
                 if player.next_login_sequence(event):
                     self._world.perform(action_factory.create(
                         ActionType.REQUEST_ENTITY,
                         player.entity_runtime_id
                     ))
-            elif player.entity_runtime_id == event.player_runtime_id:
+                    self._login_admission.finish(addr)
+                    self._admit_logins()
+            elif player.entity_runtime_id == event.player_runtime_id and not player.has_loaded_chunk(event.position):
                 self.send_game_packet(res_packet, addr)
+                player.add_loaded_chunk(event.position)
+
+    def _process_event_chunk_updated(self, event: Event) -> None:
+        res_packet = game_packet_factory.create(
+            GamePacketType.FULL_CHUNK_DATA, EXTRA_DATA, event.position, event.data)
+        for addr, _ in self._session_manager.subscribers(event.position):
+            self.send_game_packet(res_packet, addr)
 
     def _process_event_entity_loaded(self, event: Event) -> None:
         addr = self._session_manager.get_address(event.player_id)
@@ -396,29 +479,36 @@ class MCPEServerHandler(MCPEDataHandler):
             0 if event.mode is MoveMode.TELEPORT else None,  # TODO set value
             0 if event.mode is MoveMode.TELEPORT else None   # TODO set value
         )
-        for addr, player in self._session_manager.find(lambda p: p.is_living):
-            if player.entity_runtime_id != event.entity_runtime_id:
-                if player.does_monitor(event.entity_runtime_id, event.position):
-                    self.send_game_packet(res_packet, addr)
-            else:
-                if event.need_response:
-                    self.send_game_packet(res_packet, addr)
-                player.position = event.position
-                player.yaw = event.yaw
-                required_chunk = player.next_required_chunk()
-                if len(required_chunk) > 0:
-                    self._world.perform(action_factory.create(ActionType.REQUEST_CHUNK, required_chunk, None))
+        for addr, player in self._session_manager.watchers(event.entity_runtime_id):
+            if player.is_living and player.does_monitor(event.entity_runtime_id, event.position):
+                self.send_game_packet(res_packet, addr)
+        session = self._session_manager.find_by_entity(event.entity_runtime_id)
+        if session is not None and session[1].is_living:
+            addr, player = session
+            if event.need_response:
+                self.send_game_packet(res_packet, addr)
+            player.position = event.position
+            player.yaw = event.yaw
+            required_chunk = player.next_required_chunk()
+            if len(required_chunk) > 0:
+                self._world.perform(action_factory.create(
+                    ActionType.REQUEST_CHUNK, required_chunk, player.entity_runtime_id))
 
     def _process_event_block_updated(self, event: Event) -> None:
-        for updated in event.updated:
-            res_packet = game_packet_factory.create(
+        res_packets = tuple(
+            (ChunkPosition.at(updated.position), game_packet_factory.create(
                 GamePacketType.UPDATE_BLOCK,
                 EXTRA_DATA,
                 updated.position,
                 updated.block.copy(neighbors=True, network=True, priority=True)
-            )
-            self._broadcast(res_packet, lambda p: p.is_ready, immediately=False)
-        for addr, _ in self._session_manager.find(lambda p: p.is_ready):
+            )) for updated in event.updated)
+        destinations = set()
+        for position, res_packet in res_packets:
+            for addr, player in self._session_manager.subscribers(position):
+                if player.is_ready:
+                    self.send_game_packet(res_packet, addr, immediately=False)
+                    destinations.add(addr)
+        for addr in destinations:
             self.send_waiting_game_packet(addr)
 
     def _process_event_item_spawned(self, event: Event) -> None:
@@ -432,7 +522,7 @@ class MCPEServerHandler(MCPEDataHandler):
             event.motion,
             event.metadata
         )
-        for addr, player in self._session_manager.find(lambda p: p.is_living):
+        for addr, player in self._session_manager.living():
             player.monitor_entity(event.entity_runtime_id)
             self.send_game_packet(res_packet, addr)
 
@@ -443,7 +533,7 @@ class MCPEServerHandler(MCPEDataHandler):
             event.item_runtime_id,
             event.player_runtime_id
         )
-        self._broadcast(res_packet, lambda p: p.is_living)
+        self._broadcast(res_packet, self._session_manager.living())
 
     def _process_event_inventory_updated(self, event: Event) -> None:
         addr = self._session_manager.get_address(event.player_id)
@@ -462,7 +552,7 @@ class MCPEServerHandler(MCPEDataHandler):
             EXTRA_DATA,
             event.entity_runtime_id
         )
-        for addr, player in self._session_manager.find(lambda p: p.does_monitor(event.entity_runtime_id)):
+        for addr, player in self._session_manager.watchers(event.entity_runtime_id):
             player.removed_monitored(event.entity_runtime_id)
             self.send_game_packet(res_packet, addr)
 
@@ -476,10 +566,10 @@ class MCPEServerHandler(MCPEDataHandler):
             event.hotbar_slot,
             WindowType.INVENTORY
         )
-        for addr, player in self._session_manager:
-            if player.entity_runtime_id == event.entity_runtime_id:
-                player.equipped_item = event.equipped_item
-            self.send_game_packet(res_packet, addr)
+        session = self._session_manager.find_by_entity(event.entity_runtime_id)
+        if session is not None:
+            session[1].equipped_item = event.equipped_item
+        self._broadcast(res_packet)
 
     def _process_event_mob_spawned(self, event: Event) -> None:
         res_packet = game_packet_factory.create(
@@ -496,7 +586,7 @@ class MCPEServerHandler(MCPEDataHandler):
             self._mob_spawned_event_to_metadata(event),
             tuple()
         )
-        for addr, player in self._session_manager.find(lambda p: p.is_living):
+        for addr, player in self._session_manager.living():
             player.monitor_entity(event.entity_runtime_id)
             self.send_game_packet(res_packet, addr)
 
@@ -512,7 +602,9 @@ class MCPEServerHandler(MCPEDataHandler):
             event.on_ground,
             False
         )
-        self._broadcast(res_packet, lambda p: p.does_monitor(event.entity_runtime_id, event.position))
+        for addr, player in self._session_manager.watchers(event.entity_runtime_id):
+            if player.does_monitor(event.entity_runtime_id, event.position):
+                self.send_game_packet(res_packet, addr)
 
     def _process_event_time_updated(self, event: Event) -> None:
         res_packet = game_packet_factory.create(
@@ -520,7 +612,7 @@ class MCPEServerHandler(MCPEDataHandler):
             EXTRA_DATA,
             event.time
         )
-        self._broadcast(res_packet, lambda p: p.is_living)
+        self._broadcast(res_packet, self._session_manager.living())
 
     # noinspection PyUnusedLocal
     def _process_event_world_terminated(self, event: Event) -> None:
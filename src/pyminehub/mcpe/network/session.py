@@ -1,7 +1,8 @@
-from typing import Callable, Dict, Iterator, Tuple, Union
+from typing import Callable, Dict, Hashable, Iterator, Optional, Tuple, Union
 
-from pyminehub.mcpe.network.player import Player
-from pyminehub.mcpe.value import PlayerID
+from pyminehub.mcpe.geometry import ChunkPosition
+from pyminehub.mcpe.network.player import Player, PlayerObserver
+from pyminehub.mcpe.value import EntityRuntimeID, PlayerID
 from pyminehub.network.address import Address
 from pyminehub.network.handler import SessionNotFound
 
@@ -10,11 +11,46 @@ __all__ = [
 ]
 
 
-class SessionManager:
+_Sessions = Dict[Address, Player]
+
+
+def _add_to_index(index: Dict[Hashable, _Sessions], key: Hashable, addr: Address, player: Player) -> None:
+    sessions = index.get(key)
+    if sessions is None:
+        sessions = index[key] = {}
+    sessions[addr] = player
+
+
+def _discard_from_index(index: Dict[Hashable, _Sessions], key: Hashable, addr: Address) -> None:
+    sessions = index.get(key)
+    if sessions is None:
+        return
+    sessions.pop(addr, None)
+    if len(sessions) == 0:
+        del index[key]
+
+
+def _iter_sessions(sessions: Optional[_Sessions]) -> Iterator[Tuple[Address, Player]]:
+    # iterate over the copy, because the players may be changed by the caller during iteration
+    return iter(()) if sessions is None else iter(tuple(sessions.items()))
+
+
+class SessionManager(PlayerObserver):
+    """Sessions of players, indexed by the state of the player.
+
+    The indexes are kept up to date by observing players,
+    so that the cost of finding the receivers of a packet depends on the number of them.
+    """
 
     def __init__(self) -> None:
-        self._players = {}  # type: Dict[Address, Player]
+        self._players = {}  # type: _Sessions
         self._address = {}  # type: Dict[PlayerID, Address]
+        self._identified = {}  # type: _Sessions  # players that have identity
+        self._living = {}  # type: _Sessions
+        self._ready = {}  # type: _Sessions
+        self._entity_address = {}  # type: Dict[EntityRuntimeID, Address]
+        self._subscribers = {}  # type: Dict[ChunkPosition, _Sessions]  # players that loaded the chunk
+        self._watchers = {}  # type: Dict[EntityRuntimeID, _Sessions]  # players that monitor the entity
 
     def __str__(self) -> str:
         return '\n'.join(
@@ -25,19 +61,69 @@ class SessionManager:
     def append(self, player: Player, addr: Address) -> None:
         self._players[addr] = player
         self._address[player.id] = addr
+        player.set_observer(self)
+        self.state_changed(player)
+
+    # methods of PlayerObserver
+
+    def state_changed(self, player: Player) -> None:
+        addr = self._address[player.id]
+        if player.has_identity:
+            self._identified[addr] = player
+            self._entity_address[player.entity_runtime_id] = addr
+        for index, is_member in ((self._living, player.is_living), (self._ready, player.is_ready)):
+            if is_member:
+                index[addr] = player
+            else:
+                index.pop(addr, None)
+
+    def chunk_loaded(self, player: Player, position: ChunkPosition) -> None:
+        _add_to_index(self._subscribers, position, self._address[player.id], player)
+
+    def chunk_unloaded(self, player: Player, position: ChunkPosition) -> None:
+        _discard_from_index(self._subscribers, position, self._address[player.id])
+
+    def entity_monitored(self, player: Player, entity_runtime_id: EntityRuntimeID) -> None:
+        _add_to_index(self._watchers, entity_runtime_id, self._address[player.id], player)
+
+    def entity_unmonitored(self, player: Player, entity_runtime_id: EntityRuntimeID) -> None:
+        _discard_from_index(self._watchers, entity_runtime_id, self._address[player.id])
+
+    # queries
 
     @property
     def addresses(self) -> Iterator[Address]:
         return iter(self._players.keys())
 
     def __iter__(self) -> Iterator[Tuple[Address, Player]]:
-        return iter((addr, player) for addr, player in self._players.items() if player.has_identity)
+        """Players that have identity."""
+        return _iter_sessions(self._identified)
 
     def excluding(self, player: Player) -> Iterator[Tuple[Address, Player]]:
-        return iter((addr, p) for addr, p in self._players.items() if p.has_identity and p != player)
+        return iter((addr, p) for addr, p in _iter_sessions(self._identified) if p != player)
 
     def find(self, func: Callable[[Player], bool]) -> Iterator[Tuple[Address, Player]]:
-        return iter((addr, p) for addr, p in self._players.items() if p.has_identity and func(p))
+        return iter((addr, p) for addr, p in _iter_sessions(self._identified) if func(p))
+
+    def living(self) -> Iterator[Tuple[Address, Player]]:
+        """Players that finished the login sequence."""
+        return _iter_sessions(self._living)
+
+    def ready(self) -> Iterator[Tuple[Address, Player]]:
+        """Players whose surrounding chunks are complete."""
+        return _iter_sessions(self._ready)
+
+    def subscribers(self, position: ChunkPosition) -> Iterator[Tuple[Address, Player]]:
+        """Players that have loaded the chunk at the position."""
+        return _iter_sessions(self._subscribers.get(position))
+
+    def watchers(self, entity_runtime_id: EntityRuntimeID) -> Iterator[Tuple[Address, Player]]:
+        """Players that monitor the entity."""
+        return _iter_sessions(self._watchers.get(entity_runtime_id))
+
+    def find_by_entity(self, entity_runtime_id: EntityRuntimeID) -> Optional[Tuple[Address, Player]]:
+        addr = self._entity_address.get(entity_runtime_id)
+        return (addr, self._players[addr]) if addr is not None else None
 
     def __contains__(self, key: Union[PlayerID, Address]) -> bool:
         if isinstance(key, PlayerID):
@@ -59,5 +145,14 @@ class SessionManager:
     def __delitem__(self, key: Address) -> None:
         if key in self._players:
             player = self._players[key]
+            player.set_observer(None)
+            for position in player.loaded_chunk_positions:
+                _discard_from_index(self._subscribers, position, key)
+            for entity_runtime_id in player.monitored_entities:
+                _discard_from_index(self._watchers, entity_runtime_id, key)
+            if player.has_identity:
+                self._entity_address.pop(player.entity_runtime_id, None)
+            for index in (self._identified, self._living, self._ready):
+                index.pop(key, None)
             del self._players[key]
             del self._address[player.id]
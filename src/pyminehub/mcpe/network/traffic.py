@@ -0,0 +1,144 @@
+"""
+Traffic of game packets for each packet type and direction
+
+>>> counter = TrafficCounter()
+>>> addr = ('192.168.0.2', 19132)
+>>> move = bytes((GamePacketType.MOVE_PLAYER.value, )) + b'\\x00' * 39
+>>> chunk = bytes((GamePacketType.FULL_CHUNK_DATA.value, )) + b'\\x00' * 159
+>>> counter.count(addr, 'out', (move, chunk), 50)
+>>> counter.count(addr, 'out', (move, ), 20)
+>>> counter.count(addr, 'in', (move, ), 25)
+>>> for entry in counter.top_talkers(addr):
+...     print(entry)
+TrafficEntry(type='full_chunk_data', direction='out', packets=1, raw_bytes=160, compressed_bytes=40)
+TrafficEntry(type='move_player', direction='out', packets=2, raw_bytes=80, compressed_bytes=30)
+TrafficEntry(type='move_player', direction='in', packets=1, raw_bytes=40, compressed_bytes=25)
+>>> counter.top_talkers(addr, 1)[0].type
+'full_chunk_data'
+
+Traffic of the address is forgotten when the player leaves, but it is kept in the totals.
+
+>>> counter.remove(addr)
+>>> counter.addresses
+()
+>>> counter.totals[0]
+TrafficEntry(type='full_chunk_data', direction='out', packets=1, raw_bytes=160, compressed_bytes=40)
+"""
+from collections import defaultdict
+from typing import Dict, Iterator, List, NamedTuple, Sequence, Tuple
+
+from pyminehub.mcpe.network.packet import GamePacketType
+from pyminehub.metrics import Sample, register_collector
+from pyminehub.network.address import Address
+
+__all__ = [
+    'TrafficEntry',
+    'TrafficCounter',
+    'traffic_counter'
+]
+
+
+TrafficEntry = NamedTuple('TrafficEntry', [
+    ('type', str),
+    ('direction', str),
+    ('packets', int),
+    ('raw_bytes', int),
+    ('compressed_bytes', int)
+])
+
+_Key = Tuple[int, str]  # packet ID and direction ('in' or 'out')
+
+
+def _new_counter() -> List[float]:
+    return [0, 0, 0.0]  # packets, raw bytes, compressed bytes
+
+
+def _type_name(packet_id: int) -> str:
+    try:
+        return GamePacketType(packet_id).name.lower()
+    except ValueError:
+        return 'unknown_0x{:02x}'.format(packet_id)
+
+
+def _to_entries(counters: Dict[_Key, List[float]]) -> List[TrafficEntry]:
+    """Convert counters to entries in descending order of compressed bytes."""
+    result = list(
+        TrafficEntry(_type_name(packet_id), direction, counter[0], counter[1], int(round(counter[2])))
+        for (packet_id, direction), counter in counters.items())
+    result.sort(key=lambda e: (-e.compressed_bytes, e.type, e.direction))
+    return result
+
+
+class TrafficCounter:
+    """Count game packets and bytes for each packet type and direction, per address and in total.
+
+    Game packets are compressed together in a BATCH packet,
+    so the compressed bytes of the BATCH are shared among its payloads in proportion to their raw bytes.
+    """
+
+    def __init__(self) -> None:
+        self._counters = {}  # type: Dict[Address, Dict[_Key, List[float]]]
+        self._totals = defaultdict(_new_counter)  # type: Dict[_Key, List[float]]
+
+    def count(self, addr: Address, direction: str, payloads: Sequence[bytes], compressed_length: int) -> None:
+        """Count the payloads of a BATCH packet.
+
+        :param addr: address of the player
+        :param direction: 'in' or 'out'
+        :param payloads: encoded game packets
+        :param compressed_length: length of the encoded BATCH packet
+        """
+        raw_length = sum(len(payload) for payload in payloads)
+        if raw_length == 0:
+            return
+        ratio = compressed_length / raw_length
+        counters = self._counters.get(addr)
+        if counters is None:
+            counters = self._counters.setdefault(addr, defaultdict(_new_counter))
+        for payload in payloads:
+            if len(payload) == 0:
+                continue
+            key = (payload[0], direction)
+            length = len(payload)
+            for counter in (counters[key], self._totals[key]):
+                counter[0] += 1
+                counter[1] += length
+                counter[2] += length * ratio
+
+    def remove(self, addr: Address) -> None:
+        """Forget the traffic of the address, keeping it in the totals."""
+        self._counters.pop(addr, None)
+
+    @property
+    def addresses(self) -> Tuple[Address, ...]:
+        return tuple(self._counters)
+
+    def top_talkers(self, addr: Address, num: int=None) -> List[TrafficEntry]:
+        """Traffic of the address in descending order of compressed bytes.
+
+        :param addr: address of the player
+        :param num: maximum number of entries, or all entries if it is None
+        """
+        entries = _to_entries(self._counters.get(addr, {}))
+        return entries if num is None else entries[:num]
+
+    @property
+    def totals(self) -> List[TrafficEntry]:
+        """Traffic of all addresses in descending order of compressed bytes."""
+        return _to_entries(self._totals)
+
+    def collect(self) -> Iterator[Sample]:
+        for entry in self.totals:
+            labels = (('type', entry.type), ('direction', entry.direction))
+            yield Sample('pmh_game_packets_total', labels, entry.packets)
+            yield Sample('pmh_game_bytes_total', labels + (('stage', 'raw'), ), entry.raw_bytes)
+            yield Sample('pmh_game_bytes_total', labels + (('stage', 'compressed'), ), entry.compressed_bytes)
+
+
+traffic_counter = TrafficCounter()
+register_collector(traffic_counter.collect)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
@@ -0,0 +1,139 @@
+"""
+Chunk radius of players adapted to the load of the server
+
+>>> from pyminehub.config import set_config, reset
+>>> set_config(
+...     world_tick_time=0.1, chunk_radius_max=8, chunk_radius_min=2, chunk_view_budget=300, send_queue_threshold=100)
+>>> now = 0.0
+>>> ticks = Histogram((0.05, 0.1))
+>>> policy = ViewDistancePolicy(lambda: now)
+>>> policy.cap
+8
+>>> policy.radius_of(12, 8, send_queue_depth=0)
+8
+
+The cap is lowered while ticks overrun, and the total number of chunks in view is bounded.
+
+>>> policy.is_due(), policy.time_until_due()
+(False, 5.0)
+>>> now = 5.0
+>>> for _ in range(10):
+...     ticks.observe(0.12)
+>>> policy.is_due(), policy.update(ticks, player_num=1)
+(True, 7)
+>>> policy.update(ticks, player_num=3)
+4
+>>> policy.radius_of(12, 7, send_queue_depth=0)
+4
+
+The radius of the player is lowered step by step while the sending queue is deep, and raised when it is drained.
+
+>>> policy.radius_of(3, 3, send_queue_depth=150)
+2
+>>> policy.radius_of(3, 2, send_queue_depth=10)
+3
+>>> for _ in range(100):
+...     ticks.observe(0.01)
+>>> policy.update(ticks, player_num=1)
+8
+>>> reset()
+"""
+import time
+from typing import Callable, Optional
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.metrics import Histogram
+
+__all__ = [
+    'ViewDistancePolicy'
+]
+
+
+_OVERLOADED_RATIO = 1.0  # ratio of tick time, ticks overrun if exceeded
+_RELAXED_RATIO = 0.5  # ratio of tick time, the cap is raised if below
+
+
+def _radius_within_budget(player_num: int) -> int:
+    budget = get_value(ConfigKey.CHUNK_VIEW_BUDGET)
+    radius = get_value(ConfigKey.CHUNK_RADIUS_MAX)
+    while radius > 0 and player_num * (2 * radius + 1) ** 2 > budget:
+        radius -= 1
+    return radius
+
+
+class ViewDistancePolicy:
+    """Decide the chunk radius given to players from the tick time, the sending queues and the number of players.
+
+    The radius requested by the client is an upper limit, and the server lowers it while it is loaded.
+    Generating and sending chunks is the heaviest work of the server,
+    so bounding the chunks in view bounds the CPU and the bandwidth used for them.
+    """
+
+    def __init__(self, clock: Callable[[], float]=time.monotonic) -> None:
+        self._clock = clock
+        self._next_update_time = clock() + get_value(ConfigKey.VIEW_DISTANCE_INTERVAL)
+        self._load_cap = get_value(ConfigKey.CHUNK_RADIUS_MAX)
+        self._cap = self._load_cap
+        self._last_tick_count = 0
+        self._last_tick_sum = 0.0
+
+    @property
+    def cap(self) -> int:
+        """Upper limit of the chunk radius of every player."""
+        return self._cap
+
+    def is_due(self) -> bool:
+        """Return True if it is time to update the cap."""
+        return self._clock() >= self._next_update_time
+
+    def time_until_due(self) -> float:
+        """Seconds until it is time to update the cap."""
+        return max(0.0, self._next_update_time - self._clock())
+
+    def update(self, tick_histogram: Optional[Histogram], player_num: int) -> int:
+        """Update the cap from the ticks run since the last update and the number of players.
+
+        :param tick_histogram: histogram of the time spent running ticks, or None if it is not measured
+        :param player_num: number of players that are given chunks
+        :return: the new cap
+        """
+        self._next_update_time = self._clock() + get_value(ConfigKey.VIEW_DISTANCE_INTERVAL)
+        if tick_histogram is not None:
+            self._update_load_cap(tick_histogram)
+        min_radius = get_value(ConfigKey.CHUNK_RADIUS_MIN)
+        max_radius = get_value(ConfigKey.CHUNK_RADIUS_MAX)
+        self._load_cap = max(min_radius, min(self._load_cap, max_radius))
+        self._cap = max(min_radius, min(self._load_cap, _radius_within_budget(player_num)))
+        return self._cap
+
+    def _update_load_cap(self, tick_histogram: Histogram) -> None:
+        tick_count = tick_histogram.count - self._last_tick_count
+        tick_sum = tick_histogram.sum - self._last_tick_sum
+        self._last_tick_count = tick_histogram.count
+        self._last_tick_sum = tick_histogram.sum
+        if tick_count > 0:
+            ratio = tick_sum / tick_count / get_value(ConfigKey.WORLD_TICK_TIME)
+            if ratio >= _OVERLOADED_RATIO:
+                self._load_cap -= 1
+            elif ratio < _RELAXED_RATIO:
+                self._load_cap += 1
+
+    def radius_of(self, requested: int, current: int, send_queue_depth: int) -> int:
+        """Decide the chunk radius of the player.
+
+        :param requested: radius requested by the client
+        :param current: radius given to the player now
+        :param send_queue_depth: number of frames sent to the player and not yet acknowledged
+        """
+        limit = min(requested, self._cap)
+        threshold = get_value(ConfigKey.SEND_QUEUE_THRESHOLD)
+        if send_queue_depth > threshold:
+            return min(limit, max(get_value(ConfigKey.CHUNK_RADIUS_MIN), current - 1))
+        if send_queue_depth < threshold // 2:
+            return min(limit, current + 1)
+        return min(limit, current)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
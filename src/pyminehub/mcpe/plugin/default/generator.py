@@ -1,4 +1,5 @@
 from logging import getLogger
+from typing import Callable, Optional
 
 from pyminehub.mcpe.chunk import Chunk, create_empty_chunk, foreach_xz
 from pyminehub.mcpe.const import BlockType, BiomeType
@@ -17,27 +18,19 @@ _logger = getLogger(__name__)
 class DefaultChunkGenerator(ChunkGeneratorPlugin):
 
     def __init__(self) -> None:
-        def set_data(x: int, z: int) -> None:
-            y = 0
-            chunk.set_block(Vector3(x, y, z), Block.create(BlockType.BEDROCK, 0))
-            y += 1
-            while y < height - 6:
-                chunk.set_block(Vector3(x, y, z), Block.create(BlockType.STONE, 0))
-                y += 1
-            while y < height - 1:
-                chunk.set_block(Vector3(x, y, z), Block.create(BlockType.STONE, 0))
-                y += 1
-            chunk.set_block(Vector3(x, y, z), Block.create(BlockType.GRASS, 0))
-            y += 1
-            assert y == height
-            chunk.set_height(x, z, height)
-            chunk.set_biome_id(x, z, BiomeType.PLAINS)
-
         height = 63
         chunk = create_empty_chunk()
-        foreach_xz(set_data)
+        chunk.fill(Vector3(0, 0, 0), Vector3(15, 0, 15), Block.create(BlockType.BEDROCK, 0))
+        chunk.fill(Vector3(0, 1, 0), Vector3(15, height - 2, 15), Block.create(BlockType.STONE, 0))
+        chunk.fill(Vector3(0, height - 1, 0), Vector3(15, height - 1, 15), Block.create(BlockType.GRASS, 0))
+        foreach_xz(lambda x, z: chunk.set_biome_id(x, z, BiomeType.PLAINS))
+        assert chunk.get_height(0, 0) == height
         self._default_chunk = chunk
 
     def create(self, position: ChunkPosition) -> Chunk:
         _logger.debug('Create chunk at %s', position)
         return self._default_chunk.copy()
+
+    @property
+    def worker_factory(self) -> Optional[Callable[[], ChunkGeneratorPlugin]]:
+        return DefaultChunkGenerator
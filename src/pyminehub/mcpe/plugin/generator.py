@@ -1,3 +1,5 @@
+from typing import Callable, Optional
+
 from pyminehub.mcpe.chunk import Chunk
 from pyminehub.mcpe.geometry import ChunkPosition
 
@@ -16,3 +18,12 @@ class ChunkGeneratorPlugin:
         :return: see `pyminehub.mcpe.chunk`
         """
         raise NotImplementedError()
+
+    @property
+    def worker_factory(self) -> Optional[Callable[[], 'ChunkGeneratorPlugin']]:
+        """Picklable callable that creates an equivalent plugin in a worker process.
+
+        Chunks are generated in worker processes only if it is not None.
+        Keep it None if the plugin holds a resource that can't be opened twice (e.g. a locked database).
+        """
+        return None
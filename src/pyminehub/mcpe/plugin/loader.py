@@ -2,7 +2,7 @@ import importlib
 import sys
 from logging import getLogger
 from pathlib import Path
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
 from pyminehub.mcpe.action import Action
 from pyminehub.mcpe.command.api import CommandRegistry
@@ -12,6 +12,7 @@ from pyminehub.mcpe.plugin.default import *
 from pyminehub.mcpe.plugin.generator import ChunkGeneratorPlugin
 from pyminehub.mcpe.plugin.mob import MobProcessorPlugin
 from pyminehub.mcpe.plugin.player import PlayerConfigPlugin
+from pyminehub.mcpe.plugin.profiler import plugin_profiler
 from pyminehub.mcpe.plugin.world import WorldExtensionPlugin, PerformAction
 
 __all__ = [
@@ -35,35 +36,46 @@ _PLUGIN_INTERFACES = (
 )
 
 
+_Extension = NamedTuple('Extension', [
+    ('plugin', WorldExtensionPlugin),
+    ('update_name', str),
+    ('filter_action_name', str),
+    ('filter_event_name', str)
+])
+
+
 class WorldExtensionRegistry:
+    """Call the registered plugins, and measure the time spent in each of them with plugin_profiler."""
 
     def __init__(self) -> None:
-        self._extensions = []  # type: List[WorldExtensionPlugin]
+        self._extensions = []  # type: List[_Extension]
 
     def register(self, plugin: WorldExtensionPlugin) -> None:
-        self._extensions.append(plugin)
+        name = type(plugin).__name__
+        self._extensions.append(_Extension(
+            plugin, name + '.update', name + '.filter_action', name + '.filter_event'))
 
     def update(self, perform_action: PerformAction) -> None:
         for extension in self._extensions:
-            extension.update(perform_action)
+            plugin_profiler.measure(extension.update_name, extension.plugin.update, perform_action)
 
     def filter_action(self, action: Action) -> Optional[Action]:
         for extension in self._extensions:
-            action = extension.filter_action(action)
+            action = plugin_profiler.measure(extension.filter_action_name, extension.plugin.filter_action, action)
             if action is None:
                 break
         return action
 
     def filter_event(self, event: Event) -> Optional[Event]:
         for extension in self._extensions:
-            event = extension.filter_event(event)
+            event = plugin_profiler.measure(extension.filter_event_name, extension.plugin.filter_event, event)
             if event is None:
                 break
         return event
 
     def terminate(self) -> None:
         for extension in self._extensions:
-            extension.terminate()
+            extension.plugin.terminate()
 
 
 class PluginLoader:
@@ -0,0 +1,165 @@
+"""
+Timing of plugin calls and profiles of slow ticks
+
+>>> from pyminehub.config import set_config, reset
+>>> set_config(plugin_slow_time=0.05, tick_profile_threshold=0.0)
+>>> now = 0.0
+>>> def heavy_update(spent_time):
+...     global now
+...     now += spent_time
+...     return spent_time
+>>> profiler = PluginProfiler(lambda: now)
+>>> for spent_time in (0.001, 0.002, 0.003, 0.1):
+...     _ = profiler.measure('Heavy.update', heavy_update, spent_time)
+>>> _ = profiler.measure('Light.filter_event', heavy_update, 0.0)
+>>> for timing in profiler.timings:
+...     print(timing)
+PluginTiming(name='Heavy.update', count=4, p50=0.002, p90=0.1, p99=0.1, max=0.1, slow=1)
+PluginTiming(name='Light.filter_event', count=1, p50=0.0, p90=0.0, p99=0.0, max=0.0, slow=0)
+
+Ticks are profiled if TICK_PROFILE_THRESHOLD is not None, and the profiles of slow ticks are kept.
+
+>>> profile = profiler.start_tick_profile()
+>>> profiler.end_tick_profile(profile, run_time=0.5)
+>>> 'function calls' in profiler.slow_tick_profiles[-1]
+True
+>>> reset()
+>>> profiler.start_tick_profile() is None
+True
+"""
+import cProfile
+import io
+import pstats
+import time
+from collections import deque
+from logging import getLogger
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, TypeVar
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.metrics import RollingPercentile, Sample, register_collector
+
+__all__ = [
+    'PluginTiming',
+    'PluginProfiler',
+    'plugin_profiler'
+]
+
+
+_logger = getLogger(__name__)
+
+_R = TypeVar('R')
+
+_SLOW_TICK_PROFILE_NUM = 4  # number of profiles kept
+_PROFILE_LINE_NUM = 20  # number of functions reported in a profile
+
+
+PluginTiming = NamedTuple('PluginTiming', [
+    ('name', str),
+    ('count', int),
+    ('p50', float),
+    ('p90', float),
+    ('p99', float),
+    ('max', float),
+    ('slow', int)
+])
+
+
+class _Timing:
+
+    def __init__(self) -> None:
+        self.percentile = RollingPercentile()
+        self.max = 0.0
+        self.slow = 0
+
+
+class PluginProfiler:
+    """Measure time spent in each plugin call, and capture profiles of slow ticks with cProfile."""
+
+    def __init__(self, clock: Callable[[], float]=time.perf_counter) -> None:
+        self._clock = clock
+        self._timing = {}  # type: Dict[str, _Timing]
+        self._slow_tick_profiles = deque(maxlen=_SLOW_TICK_PROFILE_NUM)
+
+    def measure(self, name: str, func: Callable[..., _R], *args) -> _R:
+        """Call the function and record the time spent in it.
+
+        :param name: name of the plugin call, e.g. 'PluginClass.update'
+        """
+        start_time = self._clock()
+        try:
+            return func(*args)
+        finally:
+            self._record(name, self._clock() - start_time)
+
+    def _record(self, name: str, spent_time: float) -> None:
+        timing = self._timing.get(name)
+        if timing is None:
+            timing = self._timing.setdefault(name, _Timing())
+        timing.percentile.observe(spent_time)
+        if spent_time > timing.max:
+            timing.max = spent_time
+        if spent_time > get_value(ConfigKey.PLUGIN_SLOW_TIME):
+            timing.slow += 1
+            _logger.warning('%s is too heavy. (time=%f)', name, round(spent_time, 3))
+
+    @property
+    def timings(self) -> List[PluginTiming]:
+        """Timing of plugin calls in descending order of the 99th percentile."""
+        result = list(
+            PluginTiming(
+                name,
+                timing.percentile.count,
+                round(timing.percentile.get(50), 6),
+                round(timing.percentile.get(90), 6),
+                round(timing.percentile.get(99), 6),
+                round(timing.max, 6),
+                timing.slow)
+            for name, timing in self._timing.items())
+        result.sort(key=lambda t: (-t.p99, t.name))
+        return result
+
+    @property
+    def slow_tick_profiles(self) -> Tuple[str, ...]:
+        """Reports of the latest slow ticks, in order of time."""
+        return tuple(self._slow_tick_profiles)
+
+    @staticmethod
+    def start_tick_profile() -> Optional[cProfile.Profile]:
+        """Start profiling a tick if TICK_PROFILE_THRESHOLD is not None."""
+        if get_value(ConfigKey.TICK_PROFILE_THRESHOLD) is None:
+            return None
+        profile = cProfile.Profile()
+        profile.enable()
+        return profile
+
+    def end_tick_profile(self, profile: Optional[cProfile.Profile], run_time: float) -> None:
+        """Stop profiling the tick and keep the report if the tick is slower than TICK_PROFILE_THRESHOLD."""
+        if profile is None:
+            return
+        profile.disable()
+        threshold = get_value(ConfigKey.TICK_PROFILE_THRESHOLD)
+        if threshold is None or run_time <= threshold:
+            return
+        stream = io.StringIO()
+        stream.write('tick time={}\n'.format(round(run_time, 6)))
+        pstats.Stats(profile, stream=stream).sort_stats('cumulative').print_stats(_PROFILE_LINE_NUM)
+        self._slow_tick_profiles.append(stream.getvalue())
+
+    def collect(self) -> Iterator[Sample]:
+        for timing in self.timings:
+            labels = (('plugin', timing.name), )
+            yield Sample('pmh_plugin_calls_total', labels, timing.count)
+            yield Sample('pmh_plugin_slow_calls_total', labels, timing.slow)
+            for quantile in ('p50', 'p90', 'p99'):
+                yield Sample(
+                    'pmh_plugin_call_seconds', labels + (('quantile', '0.' + quantile[1:]), ), getattr(timing, quantile))
+            yield Sample('pmh_plugin_call_seconds_max', labels, timing.max)
+
+
+plugin_profiler = PluginProfiler()
+register_collector(plugin_profiler.collect)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
@@ -1,4 +1,4 @@
-from typing import Dict, NamedTuple, Optional, Tuple, Union
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
 from uuid import UUID
 
 from pyminehub.binutil.converter import dict_to_flags, flags_to_dict
@@ -214,9 +214,29 @@ class Block(NamedTuple('Block', [
         """
         >>> Block.create(BlockType.DIRT, 1, neighbors=True, network=True, priority=True)
         Block(type=<BlockType.DIRT: 3>, aux_value=177)
+
+        Blocks without flags are interned.
+
+        >>> Block.create(BlockType.DIRT, 1) is Block.create(BlockType.DIRT, 1)
+        True
         """
         assert data <= 0xf
-        return Block(block_type, dict_to_flags(BlockFlag, **flags) << 4 | data)
+        aux_value = dict_to_flags(BlockFlag, **flags) << 4 | data if flags else data
+        if aux_value <= 0xf:
+            return _INTERNED_BLOCKS[block_type.value << 4 | aux_value]
+        return Block(block_type, aux_value)
+
+    @staticmethod
+    def from_id(block_id: int, data: int) -> 'Block':
+        """Return the interned block without converting block ID to BlockType.
+
+        >>> Block.from_id(BlockType.DIRT.value, 1)
+        Block(type=<BlockType.DIRT: 3>, aux_value=1)
+        >>> Block.from_id(BlockType.DIRT.value, 1) is Block.create(BlockType.DIRT, 1)
+        True
+        """
+        block = _INTERNED_BLOCKS[block_id << 4 | data]
+        return block if block is not None else Block(BlockType(block_id), data)
 
     @property
     def data(self) -> int:
@@ -252,6 +272,13 @@ class Block(NamedTuple('Block', [
         return Block.create(block_type, data, **new_flags)
 
 
+# Block without flags for (block ID << 4 | block data), None if the block ID is unknown
+_INTERNED_BLOCKS = [None] * (256 << 4)  # type: List[Optional[Block]]
+for _block_type in BlockType:
+    for _data in range(0x10):
+        _INTERNED_BLOCKS[_block_type.value << 4 | _data] = Block(_block_type, _data)
+
+
 PlacedBlock = NamedTuple('PlacedBlock', [
     ('position', Vector3[int]),
     ('block', Block)
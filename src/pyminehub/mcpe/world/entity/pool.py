@@ -16,6 +16,7 @@ class EntityPool:
     def __init__(self, store: DataStore) -> None:
         self._store = store
         self._players = {}  # type: Dict[EntityRuntimeID, PlayerEntity]
+        self._player_runtime_ids = {}  # type: Dict[PlayerID, EntityRuntimeID]
         self._items = {}  # type: Dict[EntityRuntimeID, ItemEntity]
         self._mobs = {}  # type: Dict[EntityRuntimeID, MobEntity]
         self._last_entity_id = 0
@@ -37,9 +38,8 @@ class EntityPool:
         return self._last_entity_id, self._last_entity_id
 
     def load_player(self, player_id: PlayerID, is_guest: bool) -> EntityRuntimeID:
-        for entity_runtime_id, entity in self._players.items():
-            if entity.player_id == player_id:
-                return entity_runtime_id
+        if player_id in self._player_runtime_ids:
+            return self._player_runtime_ids[player_id]
         entity_unique_id, entity_runtime_id = self._next_entity_id()
         entity = PlayerEntity(player_id, entity_unique_id, entity_runtime_id, is_guest)
         player = self._store.load_player(str(player_id)) if not is_guest else None
@@ -54,6 +54,7 @@ class EntityPool:
             entity.set_inventory(WindowType.ARMOR, player.armor)
             entity.hotbar = player.hotbar
         self._players[entity_runtime_id] = entity
+        self._player_runtime_ids[player_id] = entity_runtime_id
         return entity_runtime_id
 
     def _save_player(self, entity_runtime_id: EntityRuntimeID) -> None:
@@ -103,6 +104,7 @@ class EntityPool:
             del self._items[entity_runtime_id]
         if entity_runtime_id in self._players:
             self._save_player(entity_runtime_id)
+            del self._player_runtime_ids[self._players[entity_runtime_id].player_id]
             del self._players[entity_runtime_id]
 
     def detect_collision(self, player_runtime_id: EntityRuntimeID) -> List[Collision]:
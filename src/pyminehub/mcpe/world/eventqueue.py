@@ -0,0 +1,207 @@
+"""
+Bounded queue of events sent from the world to the network
+
+>>> from pyminehub.mcpe.const import MoveMode
+>>> from pyminehub.mcpe.geometry import Vector3
+>>> def moved(x, need_response=False):
+...     return event_factory.create(
+...         EventType.PLAYER_MOVED, 1, Vector3(x, 0.0, 0.0), 0.0, 0.0, 0.0, MoveMode.NORMAL, True, 0, need_response)
+>>> queue = EventQueue(max_size=2)
+>>> queue.put_nowait(moved(1.0, need_response=True))
+>>> queue.put_nowait(event_factory.create(EventType.TIME_UPDATED, 100))
+>>> queue.put_nowait(moved(2.0))
+>>> queue.full(), queue.qsize()
+(True, 2)
+
+Chunks are not loaded while the queue is full, but events that must not be dropped are kept.
+
+>>> queue.accepts(EventType.FULL_CHUNK_LOADED), queue.accepts(EventType.INVENTORY_UPDATED)
+(False, True)
+
+The waiting move of the same entity is replaced by the latest one, keeping its place in the queue.
+
+>>> event = queue.get_nowait()
+>>> event.position.x, event.need_response
+(2.0, True)
+
+Events without a policy are kept, even if the queue is full.
+
+>>> queue.put_nowait(event_factory.create(EventType.INVENTORY_UPDATED, None, 0, None))
+>>> queue.put_nowait(event_factory.create(EventType.ITEM_TAKEN, 1, 2))
+>>> queue.qsize(), queue.stats
+(3, EventQueueStats(depth=3, max_depth=3, coalesced=1, over_capacity=1))
+>>> queue.depth_by_type == {'time_updated': 1, 'inventory_updated': 1, 'item_taken': 1}
+True
+>>> loop = asyncio.get_event_loop()
+>>> [loop.run_until_complete(queue.get()).type for _ in range(3)]
+[<EventType.TIME_UPDATED: 16>, <EventType.INVENTORY_UPDATED: 10>, <EventType.ITEM_TAKEN: 8>]
+>>> queue.empty()
+True
+
+The waiting chunk is replaced by the latest one at the tail,
+so that the whole chunk doesn't overtake the updates and the loading of it that are queued after the waiting one.
+
+>>> from pyminehub.mcpe.geometry import ChunkPosition
+>>> from pyminehub.mcpe.value import Block, PlacedBlock
+>>> from pyminehub.mcpe.const import BlockType
+>>> placed_block = PlacedBlock(Vector3(0, 62, 0), Block.create(BlockType.STONE, 0))
+>>> queue.put_nowait(event_factory.create(EventType.CHUNK_UPDATED, ChunkPosition(0, 0), b'S1'))
+>>> queue.put_nowait(event_factory.create(EventType.BLOCK_UPDATED, (placed_block, )))
+>>> queue.put_nowait(event_factory.create(EventType.FULL_CHUNK_LOADED, ChunkPosition(0, 0), b'S2', 1))
+>>> queue.put_nowait(event_factory.create(EventType.CHUNK_UPDATED, ChunkPosition(0, 0), b'S3'))
+>>> queue.qsize(), queue.depth_by_type == {'block_updated': 1, 'full_chunk_loaded': 1, 'chunk_updated': 1}
+(3, True)
+>>> [(event.type.name, getattr(event, 'data', None)) for event in (queue.get_nowait() for _ in range(3))]
+[('BLOCK_UPDATED', None), ('FULL_CHUNK_LOADED', b'S2'), ('CHUNK_UPDATED', b'S3')]
+>>> queue.empty()
+True
+"""
+import asyncio
+from collections import Counter, deque
+from enum import Enum
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from pyminehub.mcpe.const import MoveMode
+from pyminehub.mcpe.event import Event, EventType, event_factory
+
+__all__ = [
+    'EventPolicy',
+    'EventQueueStats',
+    'EventQueue'
+]
+
+
+class EventPolicy(Enum):
+    KEEP = 1  # never dropped, even if the queue is full
+    COALESCE = 2  # replaces the waiting event with the same key
+    DEFER = 3  # the world stops producing them while the queue is full
+
+
+_POLICIES = {
+    EventType.PLAYER_MOVED: EventPolicy.COALESCE,
+    EventType.MOB_MOVED: EventPolicy.COALESCE,
+    EventType.CHUNK_UPDATED: EventPolicy.COALESCE,
+    EventType.TIME_UPDATED: EventPolicy.COALESCE,
+    EventType.FULL_CHUNK_LOADED: EventPolicy.DEFER
+}  # other events are kept
+
+_COALESCING_KEYS = {
+    EventType.PLAYER_MOVED: lambda event: event.entity_runtime_id,
+    EventType.MOB_MOVED: lambda event: event.entity_runtime_id,
+    EventType.CHUNK_UPDATED: lambda event: event.position,
+    EventType.TIME_UPDATED: lambda event: None
+}  # type: Dict[EventType, Callable[[Event], Any]]
+
+
+def _merge_player_moved(waiting: Event, latest: Event) -> Event:
+    # the response and the teleport must not be lost by merging
+    mode = MoveMode.TELEPORT if waiting.mode is MoveMode.TELEPORT else latest.mode
+    return latest._replace(mode=mode, need_response=waiting.need_response or latest.need_response)
+
+
+_MERGE_FUNCTIONS = {
+    EventType.PLAYER_MOVED: _merge_player_moved
+}  # type: Dict[EventType, Callable[[Event, Event], Event]]
+
+# events that carry the whole state, which must not overtake the events queued after the waiting one
+_REQUEUED_ON_COALESCING = frozenset((
+    EventType.CHUNK_UPDATED,
+))
+
+
+EventQueueStats = NamedTuple('EventQueueStats', [
+    ('depth', int),
+    ('max_depth', int),
+    ('coalesced', int),  # number of events merged into the waiting events
+    ('over_capacity', int)  # number of events kept when the queue is full
+])
+
+
+class EventQueue:
+    """Queue of events that has the same interface as asyncio.Queue, with a policy for each event type.
+
+    Events are put even if the queue is full, so the queue doesn't lose events that must be sent.
+    Its size is kept bounded by coalescing events with the same key and by holding back the producers
+    of deferred events, which ask accepts() before producing them.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._slots = deque()  # type: deque  # each slot is a list that has an event, to replace it in place
+        self._dropped_num = 0  # number of slots whose event is moved to the tail, they are skipped
+        self._coalescing_slots = {}  # type: Dict[Tuple[EventType, Any], List[Event]]
+        self._not_empty = asyncio.Event()
+        self._max_depth = 0
+        self._coalesced_num = 0
+        self._over_capacity_num = 0
+
+    def qsize(self) -> int:
+        return len(self._slots) - self._dropped_num
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        return self.qsize() >= self._max_size
+
+    def accepts(self, event_type: EventType) -> bool:
+        """Return False if the producer should put off producing the event for now."""
+        return _POLICIES.get(event_type, EventPolicy.KEEP) is not EventPolicy.DEFER or not self.full()
+
+    @property
+    def stats(self) -> EventQueueStats:
+        return EventQueueStats(self.qsize(), self._max_depth, self._coalesced_num, self._over_capacity_num)
+
+    @property
+    def depth_by_type(self) -> Dict[str, int]:
+        return dict(Counter(slot[0].type.name.lower() for slot in self._slots if slot[0] is not None))
+
+    def put_nowait(self, event: Event) -> None:
+        key_func = _COALESCING_KEYS.get(event.type)
+        if key_func is not None:
+            key = (event.type, key_func(event))
+            slot = self._coalescing_slots.get(key)
+            if slot is not None:
+                merge = _MERGE_FUNCTIONS.get(event.type)
+                merged_event = event if merge is None else merge(slot[0], event)
+                self._coalesced_num += 1
+                if event.type not in _REQUEUED_ON_COALESCING:
+                    slot[0] = merged_event
+                    return
+                slot[0] = None
+                self._dropped_num += 1
+                event = merged_event
+            slot = self._coalescing_slots[key] = [event]
+        else:
+            slot = [event]
+        if self.full():
+            self._over_capacity_num += 1
+        self._slots.append(slot)
+        if self.qsize() > self._max_depth:
+            self._max_depth = self.qsize()
+        self._not_empty.set()
+
+    def get_nowait(self) -> Event:
+        if self.empty():
+            raise asyncio.QueueEmpty()
+        slot = self._slots.popleft()
+        while slot[0] is None:
+            self._dropped_num -= 1
+            slot = self._slots.popleft()
+        if self.empty():
+            self._not_empty.clear()
+        event = slot[0]
+        key_func = _COALESCING_KEYS.get(event.type)
+        if key_func is not None:
+            del self._coalescing_slots[(event.type, key_func(event))]
+        return event
+
+    async def get(self) -> Event:
+        while self.empty():
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
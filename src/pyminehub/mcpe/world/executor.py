@@ -0,0 +1,134 @@
+"""
+Executor to generate chunks out of the event loop thread
+
+>>> from pyminehub.config import set_config, reset
+>>> from pyminehub.mcpe.chunk import decode_chunk
+>>> from pyminehub.mcpe.plugin.default import DefaultChunkGenerator
+>>> set_config(chunk_executor='thread', chunk_executor_workers=2)
+>>> executor = create_chunk_executor(DefaultChunkGenerator())
+>>> loop = asyncio.get_event_loop()
+>>> data = loop.run_until_complete(executor.create_encoded_chunk(DefaultChunkGenerator(), ChunkPosition(0, 0)))
+>>> decode_chunk(data).get_height(0, 0)
+63
+>>> executor.shutdown()
+
+The process pool transfers chunks as encoded bytes, which are given to the caller as they are.
+
+>>> set_config(chunk_executor='process')
+>>> executor = create_chunk_executor(DefaultChunkGenerator())
+>>> data = loop.run_until_complete(executor.create_encoded_chunk(DefaultChunkGenerator(), ChunkPosition(0, 0)))
+>>> decode_chunk(data).get_height(0, 0)
+63
+>>> executor.shutdown()
+
+The plugin that can't be created in worker processes is run in threads instead (e.g. it opens a locked database).
+
+>>> from leveldbgen import LevelDBChunkGeneratorPlugin
+>>> plugin = LevelDBChunkGeneratorPlugin()
+>>> executor = create_chunk_executor(plugin)
+>>> executor.uses_process
+False
+>>> data = loop.run_until_complete(executor.create_encoded_chunk(plugin, ChunkPosition(0, 0)))
+>>> decode_chunk(data).get_height(0, 0)
+2
+>>> executor.shutdown()
+>>> reset()
+"""
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from logging import getLogger
+from typing import Callable, Dict, Optional
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.mcpe.chunk import encode_chunk
+from pyminehub.mcpe.geometry import ChunkPosition
+from pyminehub.mcpe.plugin.generator import ChunkGeneratorPlugin
+
+__all__ = [
+    'ChunkExecutor',
+    'create_chunk_executor',
+    'create_encoded_chunk_in_worker'
+]
+
+
+_logger = getLogger(__name__)
+
+
+_PluginFactory = Callable[[], ChunkGeneratorPlugin]
+
+
+_plugin_instances = {}  # type: Dict[_PluginFactory, ChunkGeneratorPlugin]
+
+
+def create_encoded_chunk_in_worker(plugin_factory: _PluginFactory, position: ChunkPosition) -> bytes:
+    """Generate chunk in the worker process, which is called by the process pool.
+
+    Plugin holds resources that can't be pickled (e.g. database handle),
+    so the worker process creates its own plugin instance by ChunkGeneratorPlugin.worker_factory.
+    """
+    plugin = _plugin_instances.get(plugin_factory)
+    if plugin is None:
+        plugin = _plugin_instances.setdefault(plugin_factory, plugin_factory())
+    return encode_chunk(plugin.create(position))
+
+
+def _create_and_encode_chunk(plugin: ChunkGeneratorPlugin, position: ChunkPosition) -> bytes:
+    return encode_chunk(plugin.create(position))
+
+
+class ChunkExecutor:
+    """Run ChunkGeneratorPlugin.create and encode the chunk in the executor,
+    or in the event loop thread if the executor is None.
+    """
+
+    def __init__(self, executor: Optional[Executor]) -> None:
+        self._executor = executor
+
+    @property
+    def uses_process(self) -> bool:
+        return isinstance(self._executor, ProcessPoolExecutor)
+
+    async def create_encoded_chunk(self, plugin: ChunkGeneratorPlugin, position: ChunkPosition) -> bytes:
+        """Create chunk, which is encoded by `pyminehub.mcpe.chunk.encode_chunk`."""
+        if self._executor is None:
+            return _create_and_encode_chunk(plugin, position)
+        loop = asyncio.get_event_loop()
+        if self.uses_process:
+            if plugin.worker_factory is None:
+                raise ValueError('{} can not be created in worker processes'.format(type(plugin).__name__))
+            return await loop.run_in_executor(
+                self._executor, create_encoded_chunk_in_worker, plugin.worker_factory, position)
+        return await loop.run_in_executor(self._executor, _create_and_encode_chunk, plugin, position)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+def create_chunk_executor(plugin: ChunkGeneratorPlugin) -> ChunkExecutor:
+    """Create the executor of CHUNK_EXECUTOR for the plugin.
+
+    The plugin is run in threads instead of processes, if it has no ChunkGeneratorPlugin.worker_factory.
+    """
+    executor_type = get_value(ConfigKey.CHUNK_EXECUTOR)
+    max_workers = get_value(ConfigKey.CHUNK_EXECUTOR_WORKERS)
+    if executor_type is None:
+        return ChunkExecutor(None)
+    if executor_type == 'process' and plugin.worker_factory is None:
+        _logger.warning(
+            '%s can not be created in worker processes (it has no worker_factory), '
+            'so chunks are generated in threads instead.', type(plugin).__name__)
+        executor_type = 'thread'
+    if executor_type == 'thread':
+        return ChunkExecutor(ThreadPoolExecutor(max_workers))
+    if executor_type == 'process':
+        return ChunkExecutor(ProcessPoolExecutor(max_workers))
+    raise ValueError('Unknown executor type: {}'.format(executor_type))
+
+
+if __name__ == '__main__':
+    import sys
+    from pathlib import Path
+    sys.path.append(str(Path(__file__).resolve().parents[4] / 'plugin'))  # to import leveldbgen
+    import doctest
+    doctest_result = doctest.testmod()
@@ -1,9 +1,10 @@
-from typing import Iterator, Tuple
+from typing import Iterable, Iterator, Tuple
 
-from pyminehub.mcpe.chunk import Chunk
+from pyminehub.mcpe.chunk import Chunk, encode_chunk
 from pyminehub.mcpe.datastore import DataStore
 from pyminehub.mcpe.geometry import ChunkPosition, ChunkPositionWithDistance
 from pyminehub.mcpe.plugin.generator import ChunkGeneratorPlugin
+from pyminehub.mcpe.world.executor import ChunkExecutor
 
 __all__ = [
     'SpaceGenerator',
@@ -20,8 +21,16 @@ class SpaceGenerator:
     def generate_chunk(self, position: ChunkPositionWithDistance) -> Chunk:
         raise NotImplementedError()
 
+    async def generate_encoded_chunk_in(self, executor: ChunkExecutor, request: ChunkPositionWithDistance) -> bytes:
+        """Generate chunk encoded by `pyminehub.mcpe.chunk.encode_chunk`, running heavy part in the executor."""
+        return encode_chunk(self.generate_chunk(request))
+
 
 class BatchSpaceGenerator(SpaceGenerator):
+    """Generate all chunks of the space in generate_space, and load them from the store after that.
+
+    ChunkExecutor isn't used, because no chunk is generated after generate_space.
+    """
 
     def __init__(self, generator_plugin: ChunkGeneratorPlugin, store: DataStore, size_x: int, size_z: int) -> None:
         self._store = store
@@ -30,15 +39,17 @@ class BatchSpaceGenerator(SpaceGenerator):
         self._generator_plugin = generator_plugin
 
     def generate_space(self) -> None:
-        if self._store.count_chunk() != self._size_x * self._size_z:
-            for position, chunk in self._create_chunks(self._size_x, self._size_z):
-                self._store.save_chunk(position, chunk, insert_only=True)
-
-    def _create_chunks(self, size_x: int, size_z: int) -> Iterator[Tuple[ChunkPosition, Chunk]]:
-        for x in range(size_x):
-            for z in range(size_z):
-                position = ChunkPosition(x, z)
-                yield position, self._generator_plugin.create(position)
+        # the store may have chunks out of the space, which are pre-generated by mcpe.main.generator
+        existing_positions = frozenset(self._store.load_chunk_positions())
+        positions = tuple(
+            ChunkPosition(x, z) for x in range(self._size_x) for z in range(self._size_z)
+            if ChunkPosition(x, z) not in existing_positions)
+        if len(positions) > 0:
+            self._store.save_chunks(self._create_chunks(positions), insert_only=True)
+
+    def _create_chunks(self, positions: Iterable[ChunkPosition]) -> Iterator[Tuple[ChunkPosition, Chunk]]:
+        for position in positions:
+            yield position, self._generator_plugin.create(position)
 
     def generate_chunk(self, request: ChunkPositionWithDistance) -> Chunk:
         chunk = self._store.load_chunk(request.position)
@@ -48,6 +59,14 @@ class BatchSpaceGenerator(SpaceGenerator):
         else:
             return chunk
 
+    async def generate_encoded_chunk_in(self, executor: ChunkExecutor, request: ChunkPositionWithDistance) -> bytes:
+        data = self._store.load_encoded_chunk(request.position)
+        if data is None:
+            position = request.position % (self._size_x, self._size_z)
+            return self._store.load_encoded_chunk(position)
+        else:
+            return data
+
 
 class OnDemandSpaceGenerator(SpaceGenerator):
 
@@ -59,9 +78,15 @@ class OnDemandSpaceGenerator(SpaceGenerator):
         pass
 
     def generate_chunk(self, request: ChunkPositionWithDistance) -> Chunk:
-        # TODO generate Chunk with a closer distance first
         chunk = self._store.load_chunk(request.position)
         if chunk is None:
             return self._generator_plugin.create(request.position)
         else:
             return chunk
+
+    async def generate_encoded_chunk_in(self, executor: ChunkExecutor, request: ChunkPositionWithDistance) -> bytes:
+        data = self._store.load_encoded_chunk(request.position)
+        if data is None:
+            return await executor.create_encoded_chunk(self._generator_plugin, request.position)
+        else:
+            return data
@@ -0,0 +1,103 @@
+"""
+Inbox of actions performed in a tick
+
+>>> from pyminehub.mcpe.const import MoveMode
+>>> from pyminehub.mcpe.geometry import Vector3
+>>> def moved(entity_runtime_id, x, need_response=False):
+...     return action_factory.create(
+...         ActionType.MOVE_PLAYER,
+...         entity_runtime_id, Vector3(x, 0.0, 0.0), 0.0, 0.0, 0.0, MoveMode.NORMAL, True, 0, need_response)
+>>> inbox = ActionInbox()
+>>> inbox.put(moved(1, 1.0, need_response=True))
+>>> inbox.put(moved(2, 1.0))
+>>> inbox.put(action_factory.create(ActionType.BREAK_BLOCK, 1, Vector3(0, 60, 0)))
+>>> inbox.put(action_factory.create(ActionType.BREAK_BLOCK, 2, Vector3(1, 60, 0)))
+>>> inbox.put(moved(1, 2.0))
+>>> len(inbox)
+4
+
+Actions are taken out in order of arrival, grouped by type.
+The move replaces the waiting move of the same entity, keeping its place.
+
+>>> groups = inbox.take()
+>>> [(action_type.name, len(actions)) for action_type, actions in groups]
+[('MOVE_PLAYER', 2), ('BREAK_BLOCK', 2)]
+>>> move = groups[0][1][0]
+>>> move.position.x, move.need_response
+(2.0, True)
+>>> len(inbox), inbox.stats
+(0, InboxStats(received=5, superseded=1))
+"""
+from typing import Dict, List, NamedTuple, Tuple
+
+from pyminehub.mcpe.action import Action, ActionType, action_factory
+from pyminehub.mcpe.const import MoveMode
+from pyminehub.mcpe.value import EntityRuntimeID
+
+__all__ = [
+    'InboxStats',
+    'ActionInbox'
+]
+
+
+_MOVE_ACTION_TYPES = frozenset((ActionType.MOVE_PLAYER, ActionType.MOVE_MOB))
+
+
+def _merge_move(waiting: Action, latest: Action) -> Action:
+    if latest.type is not ActionType.MOVE_PLAYER:
+        return latest
+    # the response and the teleport must not be lost by merging
+    mode = MoveMode.TELEPORT if waiting.mode is MoveMode.TELEPORT else latest.mode
+    return latest._replace(mode=mode, need_response=waiting.need_response or latest.need_response)
+
+
+InboxStats = NamedTuple('InboxStats', [
+    ('received', int),
+    ('superseded', int)  # number of moves replaced by the later moves of the same entity
+])
+
+
+class ActionInbox:
+    """Collect actions performed in a tick, so that they are processed in a batch."""
+
+    def __init__(self) -> None:
+        self._actions = []  # type: List[Action]
+        self._move_index = {}  # type: Dict[Tuple[ActionType, EntityRuntimeID], int]
+        self._received_num = 0
+        self._superseded_num = 0
+
+    def __len__(self) -> int:
+        return len(self._actions)
+
+    @property
+    def stats(self) -> InboxStats:
+        return InboxStats(self._received_num, self._superseded_num)
+
+    def put(self, action: Action) -> None:
+        self._received_num += 1
+        if action.type in _MOVE_ACTION_TYPES:
+            key = (action.type, action.entity_runtime_id)
+            index = self._move_index.get(key)
+            if index is not None:
+                self._actions[index] = _merge_move(self._actions[index], action)
+                self._superseded_num += 1
+                return
+            self._move_index[key] = len(self._actions)
+        self._actions.append(action)
+
+    def take(self) -> List[Tuple[ActionType, List[Action]]]:
+        """Take out all actions, grouping consecutive actions of the same type."""
+        groups = []
+        for action in self._actions:
+            if len(groups) > 0 and groups[-1][0] is action.type:
+                groups[-1][1].append(action)
+            else:
+                groups.append((action.type, [action]))
+        self._actions = []
+        self._move_index.clear()
+        return groups
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
@@ -0,0 +1,147 @@
+"""
+Pre-generation of chunks in DataStore before the server goes live
+
+>>> import os, tempfile
+>>> from pyminehub.mcpe.datastore import create_data_store
+>>> from pyminehub.mcpe.plugin.default import DefaultChunkGenerator
+>>> working_dir = os.getcwd()
+>>> temp_dir = tempfile.TemporaryDirectory()
+>>> os.chdir(temp_dir.name)
+>>> store = create_data_store()
+>>> pre_generate(store, DefaultChunkGenerator(), rectangle_area(0, 0, 4, 2), processes=1, batch_size=3)  # doctest: +ELLIPSIS
+GenerationProgress(generated=8, skipped=0, total=8, elapsed_time=...)
+
+Chunks that exist already are skipped, so it can be resumed after it is interrupted.
+
+>>> pre_generate(store, DefaultChunkGenerator(), circle_area(0, 0, 2), processes=2)  # doctest: +ELLIPSIS
+GenerationProgress(generated=8, skipped=5, total=13, elapsed_time=...)
+>>> store.count_chunk()
+16
+
+The plugin that can't be created in worker processes generates chunks in this process.
+
+>>> from leveldbgen import LevelDBChunkGeneratorPlugin
+>>> pre_generate(store, LevelDBChunkGeneratorPlugin(), rectangle_area(4, 0, 5, 2), processes=2)  # doctest: +ELLIPSIS
+GenerationProgress(generated=2, skipped=0, total=2, elapsed_time=...)
+>>> store.load_chunk(ChunkPosition(4, 1)).get_height(0, 0)
+2
+>>> os.chdir(working_dir)
+>>> temp_dir.cleanup()
+"""
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+from logging import getLogger
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from pyminehub.mcpe.chunk import encode_chunk
+from pyminehub.mcpe.datastore import DataStore
+from pyminehub.mcpe.geometry import ChunkPosition
+from pyminehub.mcpe.plugin.generator import ChunkGeneratorPlugin
+from pyminehub.mcpe.world.executor import create_encoded_chunk_in_worker
+
+__all__ = [
+    'GenerationProgress',
+    'rectangle_area',
+    'circle_area',
+    'pre_generate'
+]
+
+
+_logger = getLogger(__name__)
+
+
+GenerationProgress = NamedTuple('GenerationProgress', [
+    ('generated', int),
+    ('skipped', int),
+    ('total', int),
+    ('elapsed_time', float)
+])
+
+
+def rectangle_area(x0: int, z0: int, x1: int, z1: int) -> Iterator[ChunkPosition]:
+    """Chunk positions in [x0, x1) x [z0, z1).
+
+    >>> list(rectangle_area(0, 0, 2, 2))
+    [ChunkPosition(x=0, z=0), ChunkPosition(x=0, z=1), ChunkPosition(x=1, z=0), ChunkPosition(x=1, z=1)]
+    """
+    for x in range(x0, x1):
+        for z in range(z0, z1):
+            yield ChunkPosition(x, z)
+
+
+def circle_area(center_x: int, center_z: int, radius: int) -> Iterator[ChunkPosition]:
+    """Chunk positions within the radius from the center.
+
+    >>> len(list(circle_area(0, 0, 1)))
+    5
+    """
+    for x in range(-radius, radius + 1):
+        for z in range(-radius, radius + 1):
+            if x * x + z * z <= radius * radius:
+                yield ChunkPosition(center_x + x, center_z + z)
+
+
+def _batches(items: Iterable[Tuple[ChunkPosition, bytes]], size: int) -> Iterator[List[Tuple[ChunkPosition, bytes]]]:
+    iterator = iter(items)
+    batch = list(islice(iterator, size))
+    while len(batch) > 0:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+def pre_generate(
+        store: DataStore,
+        plugin: ChunkGeneratorPlugin,
+        area: Iterable[ChunkPosition],
+        processes: Optional[int]=None,
+        batch_size: int=64,
+        report: Callable[[GenerationProgress], None]=lambda progress: None
+) -> GenerationProgress:
+    """Generate chunks that are not in the store yet.
+
+    :param store: chunks are inserted into it by each batch
+    :param plugin: if processes is not 1, each worker process creates the plugin by its worker_factory,
+        and chunks are generated in this process if the plugin has no worker_factory
+    :param area: positions of chunks to generate
+    :param processes: number of worker processes, None is number of CPUs and 1 is generating in this process
+    :param batch_size: number of chunks that are generated by a task and inserted in a transaction
+    :param report: called whenever a batch is inserted
+    """
+    existing_positions = frozenset(store.load_chunk_positions())
+    positions = list(area)
+    targets = list(position for position in positions if position not in existing_positions)
+    start_time = time.perf_counter()
+    skipped = len(positions) - len(targets)
+    generated = 0
+
+    def progress() -> GenerationProgress:
+        return GenerationProgress(generated, skipped, len(positions), round(time.perf_counter() - start_time, 3))
+
+    def save(encoded_chunks: Iterable[bytes]) -> None:
+        nonlocal generated
+        for chunks in _batches(zip(targets, encoded_chunks), batch_size):
+            store.save_encoded_chunks(chunks, insert_only=True)
+            generated += len(chunks)
+            report(progress())
+
+    if processes != 1 and plugin.worker_factory is None:
+        _logger.warning(
+            '%s can not be created in worker processes (it has no worker_factory), '
+            'so chunks are generated in this process.', type(plugin).__name__)
+        processes = 1
+    if processes == 1:
+        save(encode_chunk(plugin.create(position)) for position in targets)
+    else:
+        with ProcessPoolExecutor(processes) as executor:
+            save(executor.map(
+                create_encoded_chunk_in_worker, repeat(plugin.worker_factory), targets, chunksize=batch_size))
+    return progress()
+
+
+if __name__ == '__main__':
+    import sys
+    from pathlib import Path
+    sys.path.append(str(Path(__file__).resolve().parents[4] / 'plugin'))  # to import leveldbgen
+    import doctest
+    doctest_result = doctest.testmod()
@@ -1,10 +1,12 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 from pyminehub.mcpe.action import Action
 from pyminehub.mcpe.const import GameMode, Difficulty
 from pyminehub.mcpe.event import Event
 from pyminehub.mcpe.resource import CRAFTING_DATA_RECIPE
 from pyminehub.mcpe.value import AdventureSettings
+from pyminehub.mcpe.world.tick import TickStats
+from pyminehub.metrics import Histogram
 
 __all__ = [
     'WorldProxy'
@@ -26,6 +28,10 @@ class WorldProxy:
     async def next_event(self) -> Optional[Event]:
         raise NotImplementedError()
 
+    async def next_events(self) -> Tuple[Event, ...]:
+        """Wait for an event, and return it with the events queued behind it."""
+        return (await self.next_event(), )
+
     def get_seed(self) -> int:
         raise NotImplementedError()
 
@@ -46,3 +52,10 @@ class WorldProxy:
 
     def get_adventure_settings(self) -> AdventureSettings:
         raise NotImplementedError()
+
+    def get_tick_stats(self) -> TickStats:
+        raise NotImplementedError()
+
+    def get_tick_histogram(self) -> Optional[Histogram]:
+        """Return the histogram of time spent running ticks, or None if the world doesn't run ticks."""
+        return None
@@ -1,28 +1,35 @@
 import asyncio
 import re
-import time
-from logging import getLogger
-from typing import Dict, Optional, Tuple
+from logging import DEBUG, getLogger
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 from pyminehub.config import ConfigKey, get_value
+from pyminehub.dispatch import DispatchTable
 from pyminehub.mcpe.action import Action, ActionType, action_factory
 from pyminehub.mcpe.attribute import create_attribute
 from pyminehub.mcpe.chunk import encode_chunk
 from pyminehub.mcpe.const import *
 from pyminehub.mcpe.datastore import DataStore
 from pyminehub.mcpe.event import *
-from pyminehub.mcpe.geometry import Vector3, revise_angle
+from pyminehub.mcpe.geometry import ChunkPosition, ChunkPositionWithDistance, Vector3, revise_angle
 from pyminehub.mcpe.item import get_item_spec
 from pyminehub.mcpe.plugin.loader import PluginLoader, WorldExtensionRegistry
 from pyminehub.mcpe.plugin.mob import *
 from pyminehub.mcpe.plugin.player import PlayerConfigPlugin
+from pyminehub.mcpe.plugin.profiler import plugin_profiler
 from pyminehub.mcpe.value import *
 from pyminehub.mcpe.world.clock import Clock
 from pyminehub.mcpe.world.entity import EntityPool, PlayerEntity
+from pyminehub.mcpe.world.eventqueue import EventQueue
+from pyminehub.mcpe.world.executor import ChunkExecutor, create_chunk_executor
 from pyminehub.mcpe.world.generator import SpaceGenerator
+from pyminehub.mcpe.world.inbox import ActionInbox
 from pyminehub.mcpe.world.interface import WorldEditor
 from pyminehub.mcpe.world.proxy import WorldProxy
 from pyminehub.mcpe.world.space import Space
+from pyminehub.mcpe.world.streaming import ChunkRequestQueue
+from pyminehub.mcpe.world.tick import TickPhase, TickScheduler, TickStats
+from pyminehub.metrics import Histogram, Sample, histogram_samples, register_collector, unregister_collector
 from pyminehub.value import LogString
 
 __all__ = [
@@ -37,12 +44,17 @@ def _camel_to_snake(s: str) -> str:
     return re.sub(r'([A-Z])', r'_\1', s).lower().lstrip('_')
 
 
+_ACTION_HANDLERS = DispatchTable(ActionType, '_process_')
+_MOB_ACTION_HANDLERS = DispatchTable((MobSpawn, MobMove), '_process_', lambda cls: _camel_to_snake(cls.__name__))
+
+
 class _World(WorldEditor):
 
     def __init__(
             self,
             game_mode: GameMode,
             generator: SpaceGenerator,
+            chunk_executor: ChunkExecutor,
             store: DataStore,
             world_extension: WorldExtensionRegistry,
             mob_processor: MobProcessorPlugin,
@@ -53,13 +65,32 @@ class _World(WorldEditor):
         self._entity = EntityPool(store)
         self._world_extension = world_extension
         self._mob_processor = mob_processor
+        self._mob_processor_name = type(mob_processor).__name__ + '.update'
+        self._action_handlers = _ACTION_HANDLERS.of(type(self))
+        self._mob_action_handlers = _MOB_ACTION_HANDLERS.of(type(self))
         self._player_config = player_config
-        self._event_queue = asyncio.Queue()
+        self._event_queue = EventQueue(get_value(ConfigKey.WORLD_EVENT_QUEUE_SIZE))
+        self._inbox = ActionInbox()
+        self._outbound_events = []  # type: List[Event]
+        self._chunk_requests = ChunkRequestQueue()
+        self._chunk_executor = chunk_executor
+        self._loading_chunks = set()  # type: Set[asyncio.Task]
         self._mob_id_to_entity_id = {}  # type: Dict[MobID, EntityRuntimeID]
         asyncio.get_event_loop().call_soon(self._space.init_space)
         self._clock = Clock(self._notify_time)
+        self._scheduler = self._create_scheduler()
         self._update_task = self._start_loop_to_update()
         self._clock_task = self._start_clock()
+        register_collector(self._collect)
+
+    def _create_scheduler(self) -> TickScheduler:
+        scheduler = TickScheduler()
+        scheduler.add_task(TickPhase.INPUT, self._take_actions)
+        scheduler.add_task(TickPhase.MOB, self._update_mob)
+        scheduler.add_task(TickPhase.EXTENSION, self._update_extension)
+        scheduler.add_task(TickPhase.FLUSH, self._load_requested_chunk)
+        scheduler.add_task(TickPhase.FLUSH, self._flush_event)
+        return scheduler
 
     def _start_loop_to_update(self) -> asyncio.Task:
         async def loop_to_update():
@@ -84,9 +115,13 @@ class _World(WorldEditor):
     # WorldProxy methods
 
     def terminate(self) -> None:
+        unregister_collector(self._collect)
         self._world_extension.terminate()
         self._clock_task.cancel()
         self._update_task.cancel()
+        for task in self._loading_chunks:
+            task.cancel()
+        self._chunk_executor.shutdown()
         self._space.save()
 
     def perform(self, action: Action) -> None:
@@ -94,15 +129,55 @@ class _World(WorldEditor):
         if action is None:
             _logger.info('%s was filtered.', action)
             return
-        _logger.debug('>> %s', LogString(action))
-        asyncio.get_event_loop().call_soon(
-            getattr(self, '_process_' + action.type.name.lower()), action)
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug('>> %s', LogString(action))
+        self._inbox.put(action)
 
     async def next_event(self) -> Optional[Event]:
         event = await self._event_queue.get()
         _logger.debug('<< %s', LogString(event))
         return event
 
+    async def next_events(self) -> Tuple[Event, ...]:
+        events = [await self._event_queue.get()]
+        while not self._event_queue.empty():
+            events.append(self._event_queue.get_nowait())
+        if _logger.isEnabledFor(DEBUG):
+            for event in events:
+                _logger.debug('<< %s', LogString(event))
+        return tuple(events)
+
+    def get_tick_stats(self) -> TickStats:
+        return self._scheduler.stats
+
+    def _collect(self) -> Iterator[Sample]:
+        queue_stats = self._event_queue.stats
+        yield Sample('pmh_world_event_queue_length', (), queue_stats.depth)
+        yield Sample('pmh_world_event_queue_max_length', (), queue_stats.max_depth)
+        yield Sample('pmh_world_events_coalesced_total', (), queue_stats.coalesced)
+        yield Sample('pmh_world_events_over_capacity_total', (), queue_stats.over_capacity)
+        for name, depth in self._event_queue.depth_by_type.items():
+            yield Sample('pmh_world_event_queue_length_by_type', (('type', name), ), depth)
+        yield Sample('pmh_world_outbound_events', (), len(self._outbound_events))
+        inbox_stats = self._inbox.stats
+        yield Sample('pmh_world_actions_total', (), inbox_stats.received)
+        yield Sample('pmh_world_moves_superseded_total', (), inbox_stats.superseded)
+        yield Sample('pmh_world_loading_chunks', (), len(self._loading_chunks))
+        yield Sample('pmh_world_chunk_requests', (), len(self._chunk_requests))
+        yield Sample('pmh_chunk_cache_size', (), self._space.cache_size)
+        yield Sample('pmh_chunk_cache_hits_total', (), self._space.cache_hit_num)
+        yield Sample('pmh_chunk_cache_misses_total', (), self._space.cache_miss_num)
+        access_num = self._space.cache_hit_num + self._space.cache_miss_num
+        if access_num > 0:
+            yield Sample('pmh_chunk_cache_hit_ratio', (), round(self._space.cache_hit_num / access_num, 6))
+        stats = self._scheduler.stats
+        for name, histogram in stats.histograms.items():
+            yield from histogram_samples('pmh_tick_duration_seconds', (('phase', name), ), histogram)
+        for name, backlog in stats.backlog.items():
+            yield Sample('pmh_tick_backlog', (('phase', name), ), backlog)
+        for name, carried_over in stats.carried_over.items():
+            yield Sample('pmh_tick_carried_over_total', (('phase', name), ), carried_over)
+
     # WorldEditor methods
 
     def remove_entity(self, entity_runtime_id: EntityRuntimeID) -> None:
@@ -130,7 +205,12 @@ class _World(WorldEditor):
         if event is None:
             _logger.info('%s was filtered.', event)
             return
-        self._event_queue.put_nowait(event)
+        self._outbound_events.append(event)
+
+    def _flush_event(self) -> None:
+        for event in self._outbound_events:
+            self._event_queue.put_nowait(event)
+        self._outbound_events.clear()
 
     def _notify_time(self, mc_time: int) -> None:
         self._notify_event(event_factory.create(EventType.TIME_UPDATED, mc_time))
@@ -139,24 +219,61 @@ class _World(WorldEditor):
         self.perform(action_factory.create(action_type, *args, **kwargs))
 
     async def _next_moment(self) -> None:
-        start_time = time.time()
+        await self._scheduler.next_tick()
+
+    def _take_actions(self) -> None:
+        for action_type, actions in self._inbox.take():
+            self._scheduler.call_in(TickPhase.INPUT, self._process_actions, self._action_handlers[action_type], actions)
+
+    def _process_actions(self, handler: Callable[..., None], actions: List[Action]) -> None:
+        for action in actions:
+            try:
+                handler(self, action)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                _logger.exception(exc)
+
+    def _update_extension(self) -> None:
         self._world_extension.update(self._perform_action)
-        if get_value(ConfigKey.SPAWN_MOB):
-            self._update_mob()
-        run_time = time.time() - start_time
-        tick_time = get_value(ConfigKey.WORLD_TICK_TIME)
-        if run_time < tick_time:
-            await asyncio.sleep(tick_time - run_time)
-        else:
-            _logger.warning('Either plugin is too heavy. (time=%f)', round(run_time, 3))
 
     def _update_mob(self) -> None:
-        actions = self._mob_processor.update(
+        if not get_value(ConfigKey.SPAWN_MOB):
+            return
+        actions = plugin_profiler.measure(
+            self._mob_processor_name,
+            self._mob_processor.update,
             self._get_player_info(),
             self._get_mob_info()
         )
         for action in actions:
-            getattr(self, '_process_' + _camel_to_snake(action.__class__.__name__))(action)
+            self._mob_action_handlers[type(action)](self, action)
+
+    def _load_requested_chunk(self) -> None:
+        if not self._event_queue.accepts(EventType.FULL_CHUNK_LOADED):
+            return
+        requests = self._chunk_requests.pop(
+            get_value(ConfigKey.CHUNK_LOADING_BUDGET) - len(self._loading_chunks),
+            get_value(ConfigKey.CHUNK_LOADING_BUDGET_PER_PLAYER))
+        for player_runtime_id, request in requests:
+            task = asyncio.ensure_future(self._load_chunk(player_runtime_id, request))
+            self._loading_chunks.add(task)
+            task.add_done_callback(self._loading_chunks.discard)
+
+    async def _load_chunk(
+            self,
+            player_runtime_id: Optional[EntityRuntimeID],
+            request: ChunkPositionWithDistance
+    ) -> None:
+        try:
+            data = await self._space.load_encoded_chunk(self._chunk_executor, request)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            _logger.exception(exc)
+            return
+        self._notify_event(event_factory.create(
+            EventType.FULL_CHUNK_LOADED, request.position, data, player_runtime_id))
 
     def _get_player_info(self) -> Tuple[PlayerInfo, ...]:
         def to_plugin_id(player: PlayerEntity):
@@ -295,13 +412,11 @@ class _World(WorldEditor):
         ))
 
     def _process_logout_player(self, action: Action) -> None:
+        self._chunk_requests.cancel(action.entity_runtime_id)
         self._entity.remove(action.entity_runtime_id)
 
     def _process_request_chunk(self, action: Action) -> None:
-        for request in action.positions:
-            chunk = self._space.get_chunk(request)
-            self._notify_event(event_factory.create(
-                EventType.FULL_CHUNK_LOADED, request.position, encode_chunk(chunk), action.player_runtime_id))
+        self._chunk_requests.request(action.player_runtime_id, action.positions)
 
     def _process_request_entity(self, action: Action) -> None:
         player = self._entity.get_player(action.player_runtime_id)
@@ -335,17 +450,12 @@ class _World(WorldEditor):
     def _process_move_player(self, action: Action) -> None:
         player = self._entity.get_player(action.entity_runtime_id)
         if not player.has_move_action:
-            asyncio.get_event_loop().call_later(
-                get_value(ConfigKey.WORLD_TICK_TIME), self._move_player, action.entity_runtime_id)
+            self._scheduler.call_in(TickPhase.MOVEMENT, self._move_player, action.entity_runtime_id)
         player.push_move_action(action)
 
     def _process_break_block(self, action: Action) -> None:
         updated_blocks, items = self._space.break_block(action.position)
-        if len(updated_blocks) > 0:
-            self._notify_event(event_factory.create(
-                EventType.BLOCK_UPDATED,
-                tuple(updated_blocks)
-            ))
+        self._notify_updated_blocks(updated_blocks)
         if self._game_mode == GameMode.CREATIVE:
             return
         for item in items:
@@ -364,6 +474,30 @@ class _World(WorldEditor):
                 tuple()
             ))
 
+    def _process_fill_blocks(self, action: Action) -> None:
+        self._notify_updated_blocks(self._space.fill(action.start, action.end, action.block))
+
+    def _process_set_blocks(self, action: Action) -> None:
+        self._notify_updated_blocks(self._space.set_blocks(action.blocks))
+
+    def _notify_updated_blocks(self, updated_blocks: List[PlacedBlock]) -> None:
+        """Notify the updated blocks, or the updated chunk instead of many blocks in it."""
+        blocks_in_chunk = {}  # type: Dict[ChunkPosition, List[PlacedBlock]]
+        for placed_block in updated_blocks:
+            blocks_in_chunk.setdefault(ChunkPosition.at(placed_block.position), []).append(placed_block)
+        small_updates = []
+        for position, blocks in blocks_in_chunk.items():
+            if len(blocks) > get_value(ConfigKey.CHUNK_RESEND_THRESHOLD):
+                chunk = self._space.get_chunk(ChunkPositionWithDistance(0, position))
+                self._notify_event(event_factory.create(EventType.CHUNK_UPDATED, position, encode_chunk(chunk)))
+            else:
+                small_updates.extend(blocks)
+        if len(small_updates) > 0:
+            self._notify_event(event_factory.create(
+                EventType.BLOCK_UPDATED,
+                tuple(small_updates)
+            ))
+
     def _process_set_inventory(self, action: Action) -> None:
         player = self._entity.get_player(action.entity_runtime_id)
         inventory_slot = action.inventory_slot
@@ -403,12 +537,7 @@ class _World(WorldEditor):
         block = get_item_spec(old_slot.type).to_block(
             old_slot.data, action.face, player.yaw, action.click_position)
         if block is not None:
-            updated = self._space.put_block(action.position, action.face, block)
-            if len(updated) > 0:
-                self._notify_event(event_factory.create(
-                    EventType.BLOCK_UPDATED,
-                    tuple(updated)
-                ))
+            self._notify_updated_blocks(self._space.put_block(action.position, action.face, block))
         self._notify_event(event_factory.create(
             EventType.INVENTORY_UPDATED,
             player.player_id,
@@ -446,8 +575,7 @@ class _World(WorldEditor):
     def _process_move_mob(self, action: Action) -> None:
         mob = self._entity.get_mob(action.entity_runtime_id)
         if not mob.has_move_action:
-            asyncio.get_event_loop().call_later(
-                get_value(ConfigKey.WORLD_TICK_TIME), self._move_mob, action.entity_runtime_id)
+            self._scheduler.call_in(TickPhase.MOVEMENT, self._move_mob, action.entity_runtime_id)
         mob.push_move_action(action)
 
     def _process_remove_mob(self, action: Action) -> None:
@@ -494,12 +622,14 @@ class _WorldProxyImpl(WorldProxy):
     def __init__(
             self,
             generator: SpaceGenerator,
+            chunk_executor: ChunkExecutor,
             store: DataStore,
             world_extension: WorldExtensionRegistry,
             mob_processor: MobProcessorPlugin,
             player_config: PlayerConfigPlugin
     ) -> None:
-        self._world = _World(self.get_game_mode(), generator, store, world_extension, mob_processor, player_config)
+        self._world = _World(
+            self.get_game_mode(), generator, chunk_executor, store, world_extension, mob_processor, player_config)
 
     def terminate(self) -> None:
         self._world.terminate()
@@ -510,6 +640,15 @@ class _WorldProxyImpl(WorldProxy):
     async def next_event(self) -> Optional[Event]:
         return await self._world.next_event()
 
+    async def next_events(self) -> Tuple[Event, ...]:
+        return await self._world.next_events()
+
+    def get_tick_stats(self) -> TickStats:
+        return self._world.get_tick_stats()
+
+    def get_tick_histogram(self) -> Optional[Histogram]:
+        return self._world.get_tick_stats().histograms['tick']
+
     def get_seed(self) -> int:
         return get_value(ConfigKey.SEED)
 
@@ -539,6 +678,7 @@ def run(store: DataStore, plugin: PluginLoader) -> WorldProxy:
         else BatchSpaceGenerator(plugin.generator, store, *space_size)
     world = _WorldProxyImpl(
         generator,
+        create_chunk_executor(plugin.generator),
         store,
         plugin.world_extension,
         plugin.mob_processor,
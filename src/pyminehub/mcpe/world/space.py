@@ -1,12 +1,14 @@
 from functools import partial
-from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 
 from pyminehub.mcpe.block import FunctionalBlock
-from pyminehub.mcpe.chunk import Chunk
+from pyminehub.mcpe.block.property import *
+from pyminehub.mcpe.chunk import Chunk, encode_chunk, decode_chunk
 from pyminehub.mcpe.const import BlockType
 from pyminehub.mcpe.datastore import DataStore
 from pyminehub.mcpe.geometry import *
 from pyminehub.mcpe.value import Item, Block, PlacedBlock
+from pyminehub.mcpe.world.executor import ChunkExecutor
 from pyminehub.mcpe.world.generator import SpaceGenerator
 
 __all__ = [
@@ -67,12 +69,60 @@ class _BlockCache:
         self._block = block
 
 
+class _PassabilityMap:
+    """Passability of blocks in a chunk, which is made for each sub-chunk when it is required."""
+
+    _Y_UNIT = ChunkGeometry.Sub.SHAPE.y
+
+    def __init__(self, chunk: Chunk) -> None:
+        self._chunk = chunk
+        self._sub_chunk_map = {}  # type: Dict[int, bytes]
+
+    def get_column(self, x: int, z: int) -> bytes:
+        """Return passability of the column in order of y."""
+        index = (x * ChunkGeometry.SHAPE.x + z) * self._Y_UNIT
+        return b''.join(
+            self._get_sub_chunk_map(i)[index:index + self._Y_UNIT] for i in range(self._chunk.sub_chunk_num))
+
+    def _get_sub_chunk_map(self, sub_chunk_index: int) -> bytes:
+        if sub_chunk_index not in self._sub_chunk_map:
+            block_id = self._chunk.get_sub_chunk_block_id(sub_chunk_index)
+            passability = bytearray(block_id.translate(PASSABLE_TABLE))
+            for block_type in DATA_DEPENDENT_PASSABILITY:
+                index = block_id.find(block_type)
+                while index != -1:
+                    position = Vector3(
+                        index // ChunkGeometry.Sub.SHAPE.area,
+                        sub_chunk_index * self._Y_UNIT + index % self._Y_UNIT,
+                        index // self._Y_UNIT % ChunkGeometry.SHAPE.z)
+                    passability[index] = get_properties(self._chunk.get_block(position)) & CAN_PASS
+                    index = block_id.find(block_type, index + 1)
+            self._sub_chunk_map[sub_chunk_index] = bytes(passability)
+        return self._sub_chunk_map[sub_chunk_index]
+
+
 class Space:
 
     def __init__(self, generator: SpaceGenerator, store: DataStore) -> None:
         self._store = store
         self._generator = generator
         self._cache = {}  # type: Dict[ChunkPosition, Chunk]
+        self._encoded_cache = {}  # type: Dict[ChunkPosition, bytes]  # chunks that are not decoded yet
+        self._cache_hit_num = 0
+        self._cache_miss_num = 0
+        self._passability = {}  # type: Dict[ChunkPosition, _PassabilityMap]
+
+    @property
+    def cache_size(self) -> int:
+        return len(self._cache) + len(self._encoded_cache)
+
+    @property
+    def cache_hit_num(self) -> int:
+        return self._cache_hit_num
+
+    @property
+    def cache_miss_num(self) -> int:
+        return self._cache_miss_num
 
     def init_space(self) -> None:
         self._generator.generate_space()
@@ -85,12 +135,38 @@ class Space:
 
     def get_chunk(self, request: ChunkPositionWithDistance) -> Chunk:
         if request.position in self._cache:
+            self._cache_hit_num += 1
             return self._cache[request.position]
+        if request.position in self._encoded_cache:
+            self._cache_hit_num += 1
+            chunk = decode_chunk(self._encoded_cache.pop(request.position))
+            self._cache[request.position] = chunk
+            return chunk
+        self._cache_miss_num += 1
         chunk = self._generator.generate_chunk(request)
         # TODO save when cache is full
         self._cache[request.position] = chunk
         return chunk
 
+    async def load_encoded_chunk(self, executor: ChunkExecutor, request: ChunkPositionWithDistance) -> bytes:
+        """Get chunk encoded by `pyminehub.mcpe.chunk.encode_chunk`, generating it in the executor if not cached.
+
+        The chunk is decoded when its blocks are accessed at first,
+        so that the chunk that is only sent to players is never decoded.
+        """
+        if request.position in self._cache:
+            self._cache_hit_num += 1
+            return encode_chunk(self._cache[request.position])
+        if request.position in self._encoded_cache:
+            self._cache_hit_num += 1
+            return self._encoded_cache[request.position]
+        self._cache_miss_num += 1
+        data = await self._generator.generate_encoded_chunk_in(executor, request)
+        # chunk may be cached by get_chunk while generating
+        if request.position in self._cache:
+            return encode_chunk(self._cache[request.position])
+        return self._encoded_cache.setdefault(request.position, data)
+
     def _to_local(self, position: Vector3) -> Tuple[Chunk, Vector3]:
         chunk_position = ChunkPosition.at(position)
         chunk = self.get_chunk(ChunkPositionWithDistance(0, chunk_position))
@@ -100,6 +176,47 @@ class Space:
     def _get_cache(self, position: Vector3[int]) -> _BlockCache:
         return _BlockCache(position, self._to_local)
 
+    def fill(self, start: Vector3[int], end: Vector3[int], block: Block) -> List[PlacedBlock]:
+        """Set the block in the box from start to end, including both ends.
+
+        Unlike put_block, blocks are replaced without the function of blocks (e.g. drop items and linked blocks).
+        """
+        start, end = (
+            Vector3(min(start.x, end.x), max(min(start.y, end.y), 0), min(start.z, end.z)),
+            Vector3(max(start.x, end.x), min(max(start.y, end.y), ChunkGeometry.SHAPE.y - 1), max(start.z, end.z)))
+        if start.y > end.y:
+            return []
+        start_chunk, end_chunk = ChunkPosition.at(start), ChunkPosition.at(end)
+        for chunk_x in range(start_chunk.x, end_chunk.x + 1):
+            for chunk_z in range(start_chunk.z, end_chunk.z + 1):
+                chunk = self.get_chunk(ChunkPositionWithDistance(0, ChunkPosition(chunk_x, chunk_z)))
+                origin = Vector3(chunk_x * ChunkGeometry.SHAPE.x, 0, chunk_z * ChunkGeometry.SHAPE.z)
+                chunk.fill(
+                    Vector3(max(start.x - origin.x, 0), start.y, max(start.z - origin.z, 0)),
+                    Vector3(
+                        min(end.x - origin.x, ChunkGeometry.SHAPE.x - 1),
+                        end.y,
+                        min(end.z - origin.z, ChunkGeometry.SHAPE.z - 1)),
+                    block)
+                self._passability.pop(ChunkPosition(chunk_x, chunk_z), None)
+        return list(
+            PlacedBlock(Vector3(x, y, z), block)
+            for x in range(start.x, end.x + 1)
+            for y in range(start.y, end.y + 1)
+            for z in range(start.z, end.z + 1))
+
+    def set_blocks(self, blocks: Iterable[PlacedBlock]) -> List[PlacedBlock]:
+        """Set the blocks at the positions, without the function of blocks as fill does."""
+        placed_blocks = list(block for block in blocks if 0 <= block.position.y < ChunkGeometry.SHAPE.y)
+        blocks_in_chunk = {}  # type: Dict[ChunkPosition, List[PlacedBlock]]
+        for placed_block in placed_blocks:
+            blocks_in_chunk.setdefault(ChunkPosition.at(placed_block.position), []).append(
+                PlacedBlock(to_local_position(placed_block.position), placed_block.block))
+        for chunk_position, local_blocks in blocks_in_chunk.items():
+            self.get_chunk(ChunkPositionWithDistance(0, chunk_position)).set_blocks(local_blocks)
+            self._passability.pop(chunk_position, None)
+        return placed_blocks
+
     def get_height(self, position: Vector3) -> int:
         """Get height by block position"""
         chunk, position_in_chunk = self._to_local(position)
@@ -114,12 +231,9 @@ class Space:
         """
         chunk, position_in_chunk = self._to_local(position)
         height = chunk.get_height(position_in_chunk.x, position_in_chunk.z)
-        y = position_in_chunk.y
-        while y < height:
-            if not FunctionalBlock(chunk.get_block(position_in_chunk.copy(y=y))).can_pass:
-                return y
-            y += 1
-        return None
+        column = self._get_passable_column(position)
+        y = column.find(0, max(position_in_chunk.y, 0), height)
+        return y if y != -1 else None
 
     def get_floor(self, position: Vector3) -> float:
         """Get floor height by coordinate
@@ -127,13 +241,24 @@ class Space:
         It search in the upward direction, when block can not be passed through.
         It search in the downward direction, when block can be passed through.
         """
+        column = self._get_passable_column(position)
+        y = max(int(position.y), 0)
+        if y < len(column) and column[y] == 0:
+            y = column.find(1, y)
+            if y == -1:
+                y = len(column)  # blocks above sub-chunks are AIR
+        return column.rfind(0, 0, y + 1) + 1
+
+    def _get_passable_column(self, position: Vector3) -> bytes:
         chunk, position_in_chunk = self._to_local(position)
-        y = position_in_chunk.y
-        while not FunctionalBlock(chunk.get_block(position_in_chunk.copy(y=y))).can_pass:
-            y += 1
-        while FunctionalBlock(chunk.get_block(position_in_chunk.copy(y=y))).can_pass:
-            y -= 1
-        return y + 1
+        chunk_position = ChunkPosition.at(position)
+        if chunk_position not in self._passability:
+            self._passability[chunk_position] = _PassabilityMap(chunk)
+        return self._passability[chunk_position].get_column(position_in_chunk.x, position_in_chunk.z)
+
+    def _invalidate_passability(self, updated_blocks: Iterable[PlacedBlock]) -> None:
+        for chunk_position in set(ChunkPosition.at(placed_block.position) for placed_block in updated_blocks):
+            self._passability.pop(chunk_position, None)
 
     def break_block(self, position: Vector3[int]) -> Tuple[List[PlacedBlock], List[Item]]:
         """
@@ -141,13 +266,15 @@ class Space:
         :return: updated position and block | spawned item list
         """
         block_cache = self._get_cache(position)
-        broken_block = block_cache.give_function()
-        if not broken_block.can_be_broken:
+        if not has_property(block_cache.value, CAN_BE_BROKEN):
             return [], []
+        broken_block = block_cache.give_function()
         transaction = _Transaction()
         for break_target in broken_block.break_target:
             self._get_cache(position + break_target).put(BLOCK_AIR, transaction)
-        return list(transaction.commit()), broken_block.to_item()
+        updated_blocks = list(transaction.commit())
+        self._invalidate_passability(updated_blocks)
+        return updated_blocks, broken_block.to_item()
 
     def put_block(
             self,
@@ -164,7 +291,9 @@ class Space:
         """
         transaction = _Transaction()
         self._put_block(transaction, position, face, FunctionalBlock(block), on_ground=False)
-        return list(transaction.commit())
+        updated_blocks = list(transaction.commit())
+        self._invalidate_passability(updated_blocks)
+        return updated_blocks
 
     def _put_block(
             self,
@@ -213,13 +342,14 @@ class Space:
             attached_block: FunctionalBlock,
             on_ground: bool
     ) -> None:
-        current_block = self._get_cache(position).give_function()
-        if not on_ground and current_block.is_switchable:
+        current_block_cache = self._get_cache(position)
+        if not on_ground and has_property(current_block_cache.value, IS_SWITCHABLE):
+            current_block = current_block_cache.give_function()
             switch_block_cache = self._get_cache(position + current_block.switch_position)
             new_block = switch_block_cache.give_function().switch()
             switch_block_cache.put(new_block, transaction)
             return
-        if not attached_block.can_be_attached_on(current_block.value, face):
+        if not attached_block.can_be_attached_on(current_block_cache.value, face):
             if not on_ground and attached_block.can_be_attached_on_ground:
                 position += face.direction
                 self._put_block(transaction, position - (0, 1, 0), Face.TOP, attached_block, on_ground=True)
@@ -0,0 +1,111 @@
+from queue import Empty
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from pyminehub.mcpe.geometry import ChunkPosition, ChunkPositionWithDistance
+from pyminehub.mcpe.value import EntityRuntimeID
+from pyminehub.queue import UpdatablePriorityQueue
+
+__all__ = [
+    'ChunkRequestQueue'
+]
+
+
+_RequestQueue = UpdatablePriorityQueue[int, ChunkPosition, ChunkPositionWithDistance]
+
+
+def _create_request_queue() -> _RequestQueue:
+    return UpdatablePriorityQueue(lambda request: request.position)
+
+
+class ChunkRequestQueue:
+    """Queue of chunk requests for each player, which is taken out in order of distance.
+
+    >>> queue = ChunkRequestQueue()
+    >>> queue.request(1, (ChunkPositionWithDistance(1, ChunkPosition(1, 0)), \
+                          ChunkPositionWithDistance(0, ChunkPosition(0, 0))))
+    >>> queue.request(2, (ChunkPositionWithDistance(2, ChunkPosition(2, 0)), ))
+    >>> list(queue.pop(budget=2, budget_per_player=1))
+    [(1, ChunkPositionWithDistance(distance=0, position=ChunkPosition(x=0, z=0))), \
+(2, ChunkPositionWithDistance(distance=2, position=ChunkPosition(x=2, z=0)))]
+
+    Requests of the player are replaced, so requests that are no longer required are dropped.
+
+    >>> queue.request(1, (ChunkPositionWithDistance(0, ChunkPosition(5, 0)), ))
+    >>> list(queue.pop(budget=2, budget_per_player=2))
+    [(1, ChunkPositionWithDistance(distance=0, position=ChunkPosition(x=5, z=0)))]
+    >>> len(queue)
+    0
+
+    Requests of unknown player are merged.
+
+    >>> queue.request(None, (ChunkPositionWithDistance(1, ChunkPosition(1, 0)), ))
+    >>> queue.request(None, (ChunkPositionWithDistance(0, ChunkPosition(0, 0)), ))
+    >>> list(queue.pop(budget=2, budget_per_player=2))
+    [(None, ChunkPositionWithDistance(distance=0, position=ChunkPosition(x=0, z=0))), \
+(None, ChunkPositionWithDistance(distance=1, position=ChunkPosition(x=1, z=0)))]
+    """
+
+    def __init__(self) -> None:
+        self._queues = {}  # type: Dict[Optional[EntityRuntimeID], _RequestQueue]
+        self._num = {}  # type: Dict[Optional[EntityRuntimeID], int]
+
+    def __len__(self) -> int:
+        return sum(self._num.values())
+
+    def request(
+            self,
+            player_runtime_id: Optional[EntityRuntimeID],
+            positions: Iterable[ChunkPositionWithDistance]
+    ) -> None:
+        """Register requests.
+
+        :param player_runtime_id: requests of the player replace the previous requests, if it is not None
+        :param positions: requested positions
+        """
+        if player_runtime_id is not None or player_runtime_id not in self._queues:
+            self._queues[player_runtime_id] = _create_request_queue()
+            self._num[player_runtime_id] = 0
+        queue = self._queues[player_runtime_id]
+        num = self._num[player_runtime_id]
+        for request in positions:
+            try:
+                queue.pop(request.position)
+                num -= 1
+            except KeyError:
+                pass
+            queue.put(request.distance, request)
+            num += 1
+        self._num[player_runtime_id] = num
+
+    def cancel(self, player_runtime_id: EntityRuntimeID) -> None:
+        """Drop requests of the player."""
+        self._queues.pop(player_runtime_id, None)
+        self._num.pop(player_runtime_id, None)
+
+    def pop(
+            self,
+            budget: int,
+            budget_per_player: int
+    ) -> Iterator[Tuple[Optional[EntityRuntimeID], ChunkPositionWithDistance]]:
+        """Take out the closest requests of each player by turns.
+
+        :param budget: maximum number of requests in total
+        :param budget_per_player: maximum number of requests for each player
+        """
+        for _ in range(budget_per_player):
+            for player_runtime_id in tuple(self._queues):
+                if budget <= 0:
+                    return
+                try:
+                    _, request = self._queues[player_runtime_id].get()
+                except Empty:
+                    self.cancel(player_runtime_id)
+                    continue
+                self._num[player_runtime_id] -= 1
+                budget -= 1
+                yield player_runtime_id, request
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
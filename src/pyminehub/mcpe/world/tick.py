@@ -0,0 +1,180 @@
+"""
+Scheduler that runs the work of the world in phases at a fixed timestep
+
+>>> from pyminehub.config import set_config, reset
+>>> set_config(world_tick_time=0.1, tick_phase_budget=dict(input=0.2, movement=0.2, mob=0.2, extension=0.2, flush=0.2))
+>>> now = 0.0
+>>> def work(name, spent_time):
+...     global now
+...     now += spent_time
+...     print(name)
+>>> scheduler = TickScheduler(lambda: now)
+>>> scheduler.add_task(TickPhase.FLUSH, lambda: work('flush', 0.001))
+>>> scheduler.call_in(TickPhase.MOVEMENT, work, 'move', 0.001)
+>>> for i in range(3):
+...     scheduler.call_in(TickPhase.INPUT, work, 'action {}'.format(i), 0.015)
+>>> run_time = scheduler.run_tick()
+action 0
+action 1
+move
+flush
+
+Work that overruns the budget of the phase is carried over to the next tick.
+
+>>> scheduler.backlog['input']
+1
+>>> run_time = scheduler.run_tick()
+action 2
+flush
+>>> scheduler.backlog['input'], scheduler.carried_over['input']
+(0, 1)
+>>> scheduler.histograms['input'].buckets[3:6]
+((0.01, 0), (0.025, 1), (0.05, 2))
+>>> scheduler.histograms['tick'].count
+2
+>>> reset()
+"""
+import asyncio
+import time
+from collections import deque
+from enum import Enum
+from logging import getLogger
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.mcpe.plugin.profiler import plugin_profiler
+from pyminehub.metrics import Histogram
+
+__all__ = [
+    'TickPhase',
+    'TickStats',
+    'TickScheduler'
+]
+
+
+_logger = getLogger(__name__)
+
+
+class TickPhase(Enum):
+    INPUT = 1
+    MOVEMENT = 2
+    MOB = 3
+    EXTENSION = 4
+    FLUSH = 5
+
+
+_DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)  # seconds
+
+_Work = Tuple[Callable[..., None], Tuple[Any, ...]]
+
+TickStats = NamedTuple('TickStats', [
+    ('histograms', Dict[str, Histogram]),
+    ('backlog', Dict[str, int]),
+    ('carried_over', Dict[str, int])
+])
+
+
+class TickScheduler:
+    """Run the phases of a tick in order, each of them within its share of WORLD_TICK_TIME.
+
+    Tasks added by add_task run every tick.
+    Work given by call_in runs once in the phase, and the rest is carried over to the next tick
+    when the phase uses up its budget. At least one piece of work runs in each phase, so it is never starved.
+    """
+
+    def __init__(self, clock: Callable[[], float]=time.perf_counter) -> None:
+        self._clock = clock
+        self._tasks = dict((phase, []) for phase in TickPhase)  # type: Dict[TickPhase, List[Callable[[], None]]]
+        self._work = dict((phase, deque()) for phase in TickPhase)  # type: Dict[TickPhase, deque]
+        self._carried_over = dict((phase, 0) for phase in TickPhase)  # type: Dict[TickPhase, int]
+        self._histograms = dict(
+            (phase.name.lower(), Histogram(_DURATION_BUCKETS)) for phase in TickPhase)  # type: Dict[str, Histogram]
+        self._histograms['tick'] = Histogram(_DURATION_BUCKETS)
+        self._next_tick_time = None
+
+    @property
+    def histograms(self) -> Dict[str, Histogram]:
+        """Histograms of time spent in each phase and in the whole tick."""
+        return self._histograms
+
+    @property
+    def backlog(self) -> Dict[str, int]:
+        """Number of pieces of work waiting in each phase."""
+        return dict((phase.name.lower(), len(self._work[phase])) for phase in TickPhase)
+
+    @property
+    def carried_over(self) -> Dict[str, int]:
+        """Number of times that the work was carried over to the next tick in each phase."""
+        return dict((phase.name.lower(), self._carried_over[phase]) for phase in TickPhase)
+
+    @property
+    def stats(self) -> TickStats:
+        return TickStats(self.histograms, self.backlog, self.carried_over)
+
+    def add_task(self, phase: TickPhase, task: Callable[[], None]) -> None:
+        self._tasks[phase].append(task)
+
+    def call_in(self, phase: TickPhase, callback: Callable[..., None], *args) -> None:
+        self._work[phase].append((callback, args))
+
+    def run_tick(self) -> float:
+        """Run all phases once.
+
+        :return: seconds spent running the tick
+        """
+        tick_time = get_value(ConfigKey.WORLD_TICK_TIME)
+        budget = get_value(ConfigKey.TICK_PHASE_BUDGET)
+        tick_start_time = self._clock()
+        for phase in TickPhase:
+            name = phase.name.lower()
+            start_time = self._clock()
+            deadline = start_time + tick_time * budget[name]
+            for task in self._tasks[phase]:
+                self._run(task, ())
+            work = self._work[phase]
+            for _ in range(len(work)):
+                self._run(*work.popleft())
+                if self._clock() >= deadline:
+                    break
+            if len(work) > 0:
+                self._carried_over[phase] += len(work)
+            self._histograms[name].observe(self._clock() - start_time)
+        run_time = self._clock() - tick_start_time
+        self._histograms['tick'].observe(run_time)
+        return run_time
+
+    @staticmethod
+    def _run(callback: Callable[..., None], args: Tuple[Any, ...]) -> None:
+        try:
+            callback(*args)
+        except asyncio.CancelledError:
+            raise
+        except KeyboardInterrupt:
+            raise
+        except Exception as exc:
+            _logger.exception(exc)
+
+    async def next_tick(self) -> None:
+        """Run a tick and wait for the start of the next tick.
+
+        Ticks start at a fixed interval. If a tick runs over the interval, the next tick starts at once
+        and the schedule is restarted from there, rather than running ticks in a burst to catch up.
+        """
+        tick_time = get_value(ConfigKey.WORLD_TICK_TIME)
+        if self._next_tick_time is None:
+            self._next_tick_time = self._clock()
+        profile = plugin_profiler.start_tick_profile()
+        run_time = self.run_tick()
+        plugin_profiler.end_tick_profile(profile, run_time)
+        self._next_tick_time += tick_time
+        wait_time = self._next_tick_time - self._clock()
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        else:
+            _logger.warning('Tick is overrun. (time=%f)', round(run_time, 3))
+            self._next_tick_time = self._clock()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
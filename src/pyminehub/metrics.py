@@ -0,0 +1,193 @@
+"""
+Metrics collected while the server is running
+
+>>> histogram = Histogram((0.01, 0.05, 0.1))
+>>> for value in (0.002, 0.02, 0.03, 0.2):
+...     histogram.observe(value)
+>>> histogram.count
+4
+>>> round(histogram.sum, 3)
+0.252
+>>> histogram.buckets
+((0.01, 1), (0.05, 3), (0.1, 3), (inf, 4))
+>>> histogram.max
+0.2
+>>> histogram.reset()
+>>> histogram.buckets
+((0.01, 0), (0.05, 0), (0.1, 0), (inf, 0))
+
+Percentiles are taken from the latest values.
+
+>>> percentile = RollingPercentile(window=4)
+>>> for value in (9.0, 1.0, 2.0, 3.0, 4.0):
+...     percentile.observe(value)
+>>> percentile.count
+5
+>>> percentile.get(50), percentile.get(100)
+(2.0, 4.0)
+
+Collectors give samples to be exported.
+
+>>> def example_collector():
+...     yield Sample('pmh_example', (('name', 'a'), ), 1)
+...     histogram.observe(0.02)
+...     yield from histogram_samples('pmh_example_seconds', (), histogram)
+>>> register_collector(example_collector)
+>>> print(render(collect()), end='')
+pmh_example{name="a"} 1
+pmh_example_seconds_bucket{le="0.01"} 0
+pmh_example_seconds_bucket{le="0.05"} 1
+pmh_example_seconds_bucket{le="0.1"} 1
+pmh_example_seconds_bucket{le="+Inf"} 1
+pmh_example_seconds_sum 0.02
+pmh_example_seconds_count 1
+>>> unregister_collector(example_collector)
+>>> collect()
+[]
+"""
+from bisect import bisect_left
+from collections import deque
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Sequence, Tuple
+
+__all__ = [
+    'Histogram',
+    'RollingPercentile',
+    'Sample',
+    'histogram_samples',
+    'register_collector',
+    'unregister_collector',
+    'collect',
+    'render'
+]
+
+
+_INF = float('inf')
+
+
+class Histogram:
+    """Count observed values in buckets with upper bounds, as Prometheus does."""
+
+    def __init__(self, bounds: Sequence[float]) -> None:
+        self._bounds = tuple(sorted(bounds)) + (_INF, )
+        self._counts = [0] * len(self._bounds)
+        self._sum = 0.0
+        self._max = 0.0
+
+    def observe(self, value: float) -> None:
+        self._counts[bisect_left(self._bounds, value)] += 1
+        self._sum += value
+        if value > self._max:
+            self._max = value
+
+    def reset(self) -> None:
+        self._counts = [0] * len(self._bounds)
+        self._sum = 0.0
+        self._max = 0.0
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def buckets(self) -> Tuple[Tuple[float, int], ...]:
+        """Cumulative count of values less than or equal to each upper bound."""
+        result = []
+        total = 0
+        for bound, count in zip(self._bounds, self._counts):
+            total += count
+            result.append((bound, total))
+        return tuple(result)
+
+
+class RollingPercentile:
+    """Percentiles of the latest values in the window."""
+
+    def __init__(self, window: int=1000) -> None:
+        self._values = deque(maxlen=window)
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+        self._values.append(value)
+        self._count += 1
+
+    @property
+    def count(self) -> int:
+        """Number of values observed, including the values out of the window."""
+        return self._count
+
+    def get(self, percent: float) -> float:
+        """Return the value below which the given percent of values in the window fall (nearest-rank method)."""
+        if len(self._values) == 0:
+            return 0.0
+        values = sorted(self._values)
+        rank = max(1, -(-len(values) * percent // 100))
+        return values[int(rank) - 1]
+
+
+Sample = NamedTuple('Sample', [
+    ('name', str),
+    ('labels', Tuple[Tuple[str, str], ...]),
+    ('value', float)
+])
+
+_Labels = Tuple[Tuple[str, str], ...]
+
+_Collector = Callable[[], Iterable[Sample]]
+
+
+def histogram_samples(name: str, labels: _Labels, histogram: Histogram) -> Iterator[Sample]:
+    """Give samples of the histogram as Prometheus does, that is, '_bucket', '_sum' and '_count'."""
+    for bound, count in histogram.buckets:
+        yield Sample(name + '_bucket', labels + (('le', _format_value(bound)), ), count)
+    yield Sample(name + '_sum', labels, histogram.sum)
+    yield Sample(name + '_count', labels, histogram.count)
+
+_collectors = []  # type: List[_Collector]
+
+
+def register_collector(collector: _Collector) -> None:
+    """Register the function that gives current samples when metrics are exported."""
+    _collectors.append(collector)
+
+
+def unregister_collector(collector: _Collector) -> None:
+    _collectors.remove(collector)
+
+
+def collect() -> List[Sample]:
+    return list(sample for collector in _collectors for sample in collector())
+
+
+def _format_value(value: float) -> str:
+    if value == _INF:
+        return '+Inf'
+    return repr(round(value, 9)) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render(samples: Iterable[Sample]) -> str:
+    """Format samples in the Prometheus text exposition format."""
+    lines = []
+    for sample in samples:
+        if sample.labels:
+            labels = ','.join('{}="{}"'.format(key, _escape(value)) for key, value in sample.labels)
+            lines.append('{}{{{}}} {}\n'.format(sample.name, labels, _format_value(sample.value)))
+        else:
+            lines.append('{} {}\n'.format(sample.name, _format_value(sample.value)))
+    return ''.join(lines)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
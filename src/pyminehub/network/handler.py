@@ -28,6 +28,10 @@ class Protocol:
     def game_data_received(self, data: bytes, addr: Address, reliability: Reliability) -> None:
         raise NotImplementedError()
 
+    def get_send_queue_depth(self, addr: Address) -> int:
+        """Return the number of frames that are waiting to be sent to the address or are not yet acknowledged."""
+        return 0
+
 
 class GameDataHandler:
 
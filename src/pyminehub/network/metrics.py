@@ -0,0 +1,158 @@
+"""
+Exporter of metrics in the Prometheus text format, over local HTTP and/or into a text file
+
+The packet trace is also served on the path '/trace', if it is enabled with PACKET_TRACE_SIZE.
+
+>>> import tempfile, os
+>>> from pyminehub.config import set_config, reset
+>>> from pyminehub.metrics import Sample, register_collector, unregister_collector
+>>> def collector():
+...     yield Sample('pmh_example', (), 1)
+>>> register_collector(collector)
+>>> packet_tracer.start(size=8)
+>>> packet_tracer.trace(('192.168.0.2', 19132), 'in', b'\\x84\\x00')
+>>> loop = asyncio.get_event_loop()
+>>> with tempfile.TemporaryDirectory() as directory:
+...     set_config(metrics_port=0, metrics_file=os.path.join(directory, 'pyminehub.prom'))
+...     server = metrics_server()
+...     server.start()
+...     response = loop.run_until_complete(_get(server.port))
+...     trace_response = loop.run_until_complete(_get(server.port, '/trace'))
+...     loop.run_until_complete(asyncio.sleep(0.01))
+...     server.terminate()
+...     loop.run_until_complete(server.close())
+...     with open(os.path.join(directory, 'pyminehub.prom')) as file:
+...         print(file.read(), end='')
+pmh_example 1
+>>> print(response.decode())
+HTTP/1.0 200 OK
+Content-Type: text/plain; version=0.0.4
+Content-Length: 14
+<BLANKLINE>
+pmh_example 1
+<BLANKLINE>
+>>> trace_response.decode().endswith(' 192.168.0.2:19132 in 8400\\n')
+True
+>>> packet_tracer.stop()
+>>> packet_tracer.clear()
+>>> unregister_collector(collector)
+>>> reset()
+"""
+import asyncio
+import os
+from logging import getLogger
+from typing import Optional
+
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.metrics import collect, render
+from pyminehub.network.address import Address
+from pyminehub.network.server import Server
+from pyminehub.network.trace import packet_tracer
+
+__all__ = [
+    'metrics_server'
+]
+
+
+_logger = getLogger(__name__)
+
+_LOOPBACK_ADDRESSES = {
+    4: '127.0.0.1',
+    6: '::1'
+}
+
+_CONTENT_TYPE = 'text/plain; version=0.0.4'
+
+_TRACE_PATH = b'/trace'
+
+
+class _MetricsServer(Server):
+    """Serve metrics to GET requests on the loopback address, and write them into the file periodically."""
+
+    def __init__(self, port: Optional[int], file_path: Optional[str]) -> None:
+        self._port = port
+        self._file_path = file_path
+        self._server = None
+        self._write_task = None
+
+    @property
+    def port(self) -> Optional[int]:
+        """Port number that is listened, which is decided by OS if METRICS_PORT is 0."""
+        if self._server is None:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    def start(self) -> None:
+        loop = asyncio.get_event_loop()
+        if self._port is not None:
+            host = _LOOPBACK_ADDRESSES[get_value(ConfigKey.IP_VERSION)]
+            self._server = loop.run_until_complete(asyncio.start_server(self._respond, host=host, port=self._port))
+            _logger.info('Metrics are served on http://%s:%d/metrics', host, self.port)
+        if self._file_path is not None:
+            self._write_task = asyncio.ensure_future(self._loop_to_write())
+
+    def terminate(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        if self._write_task is not None:
+            self._write_task.cancel()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def remove_session(self, addr: Address) -> bool:
+        return False
+
+    @staticmethod
+    async def _respond(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            line = request_line
+            while line not in (b'\r\n', b'\n', b''):
+                line = await reader.readline()
+            words = request_line.split()
+            if len(words) > 1 and words[1] == _TRACE_PATH:
+                body = packet_tracer.dump().encode()
+            else:
+                body = render(collect()).encode()
+            writer.write('HTTP/1.0 200 OK\r\nContent-Type: {}\r\nContent-Length: {}\r\n\r\n'.format(
+                _CONTENT_TYPE, len(body)).encode())
+            writer.write(body)
+            await writer.drain()
+        except ConnectionError as exc:
+            _logger.info('Metrics request failed. (exception=%s)', exc)
+        finally:
+            writer.close()
+
+    async def _loop_to_write(self) -> None:
+        try:
+            while True:
+                self._write_file()
+                await asyncio.sleep(get_value(ConfigKey.METRICS_FILE_INTERVAL))
+        except asyncio.CancelledError:
+            self._write_file()
+
+    def _write_file(self) -> None:
+        # replace the file at once, so that a reader never gets the half written file
+        temp_path = self._file_path + '.tmp'
+        with open(temp_path, 'w') as file:
+            file.write(render(collect()))
+        os.replace(temp_path, self._file_path)
+
+
+async def _get(port: int, path: str='/metrics') -> bytes:
+    reader, writer = await asyncio.open_connection(_LOOPBACK_ADDRESSES[get_value(ConfigKey.IP_VERSION)], port)
+    writer.write('GET {} HTTP/1.0\r\n\r\n'.format(path).encode())
+    response = await reader.read()
+    writer.close()
+    return response.replace(b'\r\n', b'\n')
+
+
+def metrics_server() -> Server:
+    return _MetricsServer(get_value(ConfigKey.METRICS_PORT), get_value(ConfigKey.METRICS_FILE))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
@@ -0,0 +1,106 @@
+"""
+Trace of raw datagrams kept in a ring buffer
+
+>>> now = 0.0
+>>> tracer = PacketTracer(lambda: now)
+>>> tracer.enabled
+False
+>>> tracer.start(size=2, sampling=2)
+>>> for i in range(6):
+...     now += 0.5
+...     tracer.trace(('192.168.0.2', 19132), 'in', bytes((0x84, i)))
+>>> print(tracer.dump(), end='')
+2.000000 192.168.0.2:19132 in 8403
+3.000000 192.168.0.2:19132 in 8405
+
+Records are kept after the trace is stopped, until they are cleared.
+
+>>> tracer.stop()
+>>> len(tracer.records)
+2
+>>> tracer.clear()
+>>> tracer.dump()
+''
+"""
+import time
+from collections import deque
+from typing import Callable, NamedTuple, Tuple
+
+from pyminehub.network.address import Address
+
+__all__ = [
+    'TraceRecord',
+    'PacketTracer',
+    'packet_tracer'
+]
+
+
+TraceRecord = NamedTuple('TraceRecord', [
+    ('time', float),
+    ('addr', Address),
+    ('direction', str),
+    ('data', bytes)
+])
+
+
+class PacketTracer:
+    """Sample raw datagrams into a fixed-size ring buffer.
+
+    Callers check enabled before calling trace, so that tracing costs only an attribute lookup when it is off.
+    """
+
+    def __init__(self, clock: Callable[[], float]=time.time) -> None:
+        self.enabled = False
+        self._clock = clock
+        self._records = deque(maxlen=0)  # type: deque
+        self._sampling = 1
+        self._skipped = 0
+
+    def start(self, size: int, sampling: int=1) -> None:
+        """Start tracing.
+
+        :param size: number of datagrams kept, older ones are dropped
+        :param sampling: trace one of every sampling datagrams
+        """
+        self._records = deque(self._records, maxlen=size)
+        self._sampling = sampling
+        self._skipped = 0
+        self.enabled = True
+
+    def stop(self) -> None:
+        self.enabled = False
+
+    def clear(self) -> None:
+        self._records.clear()
+
+    def trace(self, addr: Address, direction: str, data: bytes) -> None:
+        """Record the datagram if it is sampled.
+
+        :param addr: address of the remote
+        :param direction: 'in' or 'out'
+        :param data: raw datagram
+        """
+        self._skipped += 1
+        if self._skipped < self._sampling:
+            return
+        self._skipped = 0
+        self._records.append(TraceRecord(self._clock(), addr, direction, bytes(data)))
+
+    @property
+    def records(self) -> Tuple[TraceRecord, ...]:
+        return tuple(self._records)
+
+    def dump(self) -> str:
+        """Format records in order of time, a line for each datagram."""
+        return ''.join(
+            '{:.6f} {}:{} {} {}\n'.format(
+                record.time, record.addr[0], record.addr[1], record.direction, record.data.hex())
+            for record in self._records)
+
+
+packet_tracer = PacketTracer()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest_result = doctest.testmod()
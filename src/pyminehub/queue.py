@@ -21,18 +21,26 @@ class UpdatablePriorityQueue(Generic[_UPPT, _UPKT, _UPTT]):
         self._heap_queue = []  # type: List[List[_UPPT, int, _UPTT]]
         self._entry_finder = {}  # type: Dict[_UPKT, _UPTT]
         self._counter = itertools.count()
+        self._num = 0
         self._max_num = 0
 
     def __str__(self) -> str:
-        num = len(self._entry_finder)
-        self._max_num = max(self._max_num, num)
-        return '{}(num={}, max={})'.format(type(self), num, self._max_num)
+        return '{}(num={}, max={})'.format(type(self), self._num, self._max_num)
+
+    def __len__(self) -> int:
+        return self._num
+
+    @property
+    def max_size(self) -> int:
+        """Maximum number of tasks that have been in this queue at the same time."""
+        return self._max_num
 
     def pop(self, key: _UPKT) -> _UPTT:
         """Remove a task of the specified key from this queue and get the task."""
         entry = self._entry_finder.pop(key)
         task = entry[-1]
         entry[-1] = None
+        self._num -= 1
         return task
 
     def remove(self, task: _UPTT) -> None:
@@ -50,6 +58,9 @@ class UpdatablePriorityQueue(Generic[_UPPT, _UPKT, _UPTT]):
             if key in self._entry_finder:
                 self.remove(task)
             self._entry_finder[key] = entry
+        self._num += 1
+        if self._num > self._max_num:
+            self._max_num = self._num
 
     def get(self) -> Tuple[_UPPT, _UPTT]:
         """Get a minimum priority task from this queue or raise Empty when queue is empty."""
@@ -60,5 +71,6 @@ class UpdatablePriorityQueue(Generic[_UPPT, _UPKT, _UPTT]):
             key = self._key_producer(task)
             if key is not None:
                 del self._entry_finder[key]
+            self._num -= 1
             return priority, task
         raise Empty()
@@ -1,10 +1,14 @@
 import asyncio
-from logging import getLogger
+from collections import defaultdict
+from logging import DEBUG, getLogger
+from typing import Dict, List, Tuple
 
+from pyminehub.dispatch import DispatchTable
 from pyminehub.network.address import Address
 from pyminehub.network.handler import GameDataHandler, Protocol, SessionNotFound, Reliability
+from pyminehub.network.trace import packet_tracer
 from pyminehub.raknet.codec import raknet_packet_codec, split_frame_set
-from pyminehub.raknet.packet import RakNetPacket
+from pyminehub.raknet.packet import RakNetPacketType, RakNetPacket
 from pyminehub.raknet.session import Session
 from pyminehub.value import LogString
 
@@ -15,6 +19,8 @@ __all__ = [
 
 _logger = getLogger(__name__)
 
+_PACKET_HANDLERS = DispatchTable(RakNetPacketType, '_process_')
+
 
 class AbstractRakNetProtocol(asyncio.DatagramProtocol, Protocol):
 
@@ -25,6 +31,13 @@ class AbstractRakNetProtocol(asyncio.DatagramProtocol, Protocol):
         handler.register_protocol(self)
         self.__handler = handler
         self.__transport = None
+        self.__packet_handlers = _PACKET_HANDLERS.of(type(self))
+        self.__traffic = defaultdict(lambda: [0, 0])  # type: Dict[Tuple[RakNetPacketType, str], List[int]]
+
+    @property
+    def traffic(self) -> Dict[Tuple[RakNetPacketType, str], Tuple[int, int]]:
+        """Number of packets and bytes for each packet type and direction ('in' or 'out')."""
+        return dict((key, tuple(value)) for key, value in self.__traffic.items())
 
     @property
     def guid(self) -> int:
@@ -41,11 +54,14 @@ class AbstractRakNetProtocol(asyncio.DatagramProtocol, Protocol):
         self.__transport = None
 
     def datagram_received(self, data: bytes, addr: Address) -> None:
-        _logger.debug('%s > %s', addr, data.hex())
+        if packet_tracer.enabled:
+            packet_tracer.trace(addr, 'in', data)
         packet = raknet_packet_codec.decode(data)
-        _logger.debug('> %s', LogString(packet))
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug('> %s', LogString(packet))
+        self.__count(packet.type, 'in', len(data))
         try:
-            getattr(self, '_process_' + packet.type.name.lower())(packet, addr)
+            self.__packet_handlers[packet.type](self, packet, addr)
         except SessionNotFound as exc:
             assert exc.addr == addr, '{} != {}'.format(exc.addr, addr)
             _logger.info('%s session is not found.', addr)
@@ -55,12 +71,26 @@ class AbstractRakNetProtocol(asyncio.DatagramProtocol, Protocol):
         session = self.get_session(addr)
         session.send_frame(data, reliability)
 
+    def get_send_queue_depth(self, addr: Address) -> int:
+        try:
+            return self.get_session(addr).stats.send_queue_depth
+        except SessionNotFound:
+            return 0
+
     def send_to_remote(self, packet: RakNetPacket, addr: Address) -> None:
-        _logger.debug('< %s', LogString(packet))
+        if _logger.isEnabledFor(DEBUG):
+            _logger.debug('< %s', LogString(packet))
         data = raknet_packet_codec.encode(packet)
-        _logger.debug('%s < %s', addr, data.hex())
+        if packet_tracer.enabled:
+            packet_tracer.trace(addr, 'out', data)
+        self.__count(packet.type, 'out', len(data))
         self.__transport.sendto(data, addr)
 
+    def __count(self, packet_type: RakNetPacketType, direction: str, length: int) -> None:
+        counter = self.__traffic[(packet_type, direction)]
+        counter[0] += 1
+        counter[1] += length
+
     def create_session(self, mtu_size: int, addr: Address) -> Session:
         return Session(
             mtu_size,
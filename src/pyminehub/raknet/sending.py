@@ -1,9 +1,9 @@
 import math
 import time
 from collections import defaultdict
-from logging import getLogger
+from logging import DEBUG, getLogger
 from queue import Empty
-from typing import Callable, Dict, Generator, Tuple
+from typing import Callable, Dict, Generator, Set, Tuple
 
 from pyminehub.config import ConfigKey, get_value
 from pyminehub.network.handler import Reliability
@@ -70,6 +70,20 @@ class SendQueue:
         self._message_num = 0  # type: int  # for send reliable packet
         self._ordering_index = defaultdict(lambda: 0)  # type: Dict[int, int]  # for send reliable ordered packet
         self._split_packet_id = 0  # next split_packet_id
+        self._sent_message_num = set()  # type: Set[int]  # reliable_message_num sent at least once
+        self._resend_num = 0
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    @property
+    def max_size(self) -> int:
+        return self._queue.max_size
+
+    @property
+    def resend_num(self) -> int:
+        """Number of reliable frames sent again, either by NCK or by timeout of ACK."""
+        return self._resend_num
 
     def __str__(self) -> str:
         return '{}(queue={}, message={}, ordering={}, split={})'.format(
@@ -85,11 +99,13 @@ class SendQueue:
 
     def push(self, payload: bytes, reliability: Reliability, send_time_in_future=0) -> None:
         for frame in self._create_frame(payload, reliability):
-            _logger.debug('< %s', LogString(frame))
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug('< %s', LogString(frame))
             self._queue.put(self._get_current_time() + send_time_in_future, frame)
 
     def discard(self, reliable_message_num: int) -> None:
         self._queue.pop(reliable_message_num)
+        self._sent_message_num.discard(reliable_message_num)
 
     def resend(self, reliable_message_num: int) -> None:
         frame = self._queue.pop(reliable_message_num)
@@ -110,6 +126,10 @@ class SendQueue:
 
             if _is_reliable(frame):
                 self._queue.put(self._get_resend_time_in_future(), frame)
+                if frame.reliable_message_num in self._sent_message_num:
+                    self._resend_num += 1
+                else:
+                    self._sent_message_num.add(frame.reliable_message_num)
 
             frame_size = _get_encoded_size(frame.payload, frame.type)
             assert frame_size <= self._max_payload_size
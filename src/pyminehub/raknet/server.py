@@ -1,6 +1,8 @@
 import asyncio
+from typing import Iterator
 
 from pyminehub.config import ConfigKey, get_value
+from pyminehub.metrics import Sample, register_collector, unregister_collector
 from pyminehub.network.address import Address, get_unspecified_address, to_packet_format
 from pyminehub.network.handler import GameDataHandler, SessionNotFound
 from pyminehub.network.server import Server
@@ -23,12 +25,31 @@ class _RakNetServerProtocol(AbstractRakNetProtocol, asyncio.DatagramProtocol):
             get_value(ConfigKey.WORLD_NAME),
             get_value(ConfigKey.GAME_MODE).title()
         )
+        register_collector(self.collect)
 
     def terminate(self) -> None:
         super().terminate()
+        unregister_collector(self.collect)
         for session in self._sessions.values():
             session.close()
 
+    def collect(self) -> Iterator[Sample]:
+        yield Sample('pmh_raknet_sessions', (), len(self._sessions))
+        for addr, session in self._sessions.items():
+            labels = (('address', '{}:{}'.format(*addr[:2])), )
+            stats = session.stats
+            if stats.rtt is not None:
+                yield Sample('pmh_raknet_rtt_seconds', labels, stats.rtt)
+            yield Sample('pmh_raknet_resends_total', labels, stats.resends)
+            yield Sample('pmh_raknet_ncks_received_total', labels, stats.ncks_received)
+            yield Sample('pmh_raknet_ncks_sent_total', labels, stats.ncks_sent)
+            yield Sample('pmh_raknet_send_queue_depth', labels, stats.send_queue_depth)
+            yield Sample('pmh_raknet_send_queue_max_depth', labels, stats.send_queue_max_depth)
+        for (packet_type, direction), (packets, length) in self.traffic.items():
+            labels = (('type', packet_type.name.lower()), ('direction', direction))
+            yield Sample('pmh_raknet_packets_total', labels, packets)
+            yield Sample('pmh_raknet_bytes_total', labels, length)
+
     def remove_session(self, addr: Address) -> bool:
         if addr in self._sessions:
             self._sessions[addr].close()
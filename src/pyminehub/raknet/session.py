@@ -1,25 +1,31 @@
 import asyncio
-from collections import defaultdict
-from logging import getLogger
-from typing import Callable, Dict, List, Set, Tuple
+import time
+from collections import OrderedDict, defaultdict
+from logging import DEBUG, getLogger
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
 
+from pyminehub.config import ConfigKey, get_value
+from pyminehub.dispatch import DispatchTable
 from pyminehub.network.const import PACKET_HEADER_SIZE, RAKNET_WEIRD
 from pyminehub.network.handler import Reliability
 from pyminehub.raknet.channel import Channel
 from pyminehub.raknet.codec import raknet_packet_codec
 from pyminehub.raknet.fragment import Fragment
-from pyminehub.raknet.frame import RakNetFrame
+from pyminehub.raknet.frame import RakNetFrame, RakNetFrameType
 from pyminehub.raknet.packet import RakNetPacketType, RakNetPacket, raknet_packet_factory
 from pyminehub.raknet.sending import SendQueue
 from pyminehub.value import LogString
 
 __all__ = [
+    'SessionStats',
     'Session'
 ]
 
 
 _logger = getLogger(__name__)
 
+_FRAME_HANDLERS = DispatchTable(RakNetFrameType, '_process_')
+
 
 def _create_send_packet(sequence_num: int, payload: bytes) -> RakNetPacket:
     return raknet_packet_factory.create(RakNetPacketType.FRAME_SET_4, sequence_num, payload)
@@ -27,6 +33,18 @@ def _create_send_packet(sequence_num: int, payload: bytes) -> RakNetPacket:
 
 _ALL_HEADER_SIZE = PACKET_HEADER_SIZE + RAKNET_WEIRD + len(raknet_packet_codec.encode(_create_send_packet(0, b'')))
 
+_RTT_SMOOTHING_FACTOR = 0.125  # weight of the latest sample, as TCP does (RFC 6298)
+
+
+SessionStats = NamedTuple('SessionStats', [
+    ('rtt', Optional[float]),  # seconds, smoothed round trip time, None if it is not measured yet
+    ('resends', int),
+    ('ncks_received', int),
+    ('ncks_sent', int),
+    ('send_queue_depth', int),
+    ('send_queue_max_depth', int)
+])
+
 
 class Session:
 
@@ -36,6 +54,7 @@ class Session:
             send_to_game_handler: Callable[[bytes], None],
             send_to_client: Callable[[RakNetPacket], None]
     ) -> None:
+        self._frame_handlers = _FRAME_HANDLERS.of(type(self))
         self._send_to_game_handler = send_to_game_handler
         self._send_to_client = send_to_client
         self._expected_sequence_num = 0  # type: int  # next sequence number for receive packet
@@ -46,6 +65,11 @@ class Session:
         self._fragment = Fragment()  # for split receive packet
         self._sequence_num = 0  # type: int  # next sequence number for send packet
         self._send_queue = SendQueue(mtu_size - _ALL_HEADER_SIZE, self._send_frame_set)
+        self._send_time = OrderedDict()  # type: Dict[int, float]  # sequence_num to time sent, for measuring RTT
+        self._rtt = None  # type: Optional[float]
+        self._resend_num = 0  # resent by the replaced send queues
+        self._nck_received_num = 0
+        self._nck_sent_num = 0
         self._sendable = asyncio.Event()
         self._closed = False
         self._sending_task = self._start_loop_to_send()
@@ -62,6 +86,16 @@ class Session:
     def is_closed(self) -> bool:
         return self._closed
 
+    @property
+    def stats(self) -> SessionStats:
+        return SessionStats(
+            round(self._rtt, 6) if self._rtt is not None else None,
+            self._resend_num + self._send_queue.resend_num,
+            self._nck_received_num,
+            self._nck_sent_num,
+            len(self._send_queue),
+            self._send_queue.max_size)
+
     def reset(self, mtu_size: int) -> None:
         self._expected_sequence_num = 0
         self._ack_set.clear()
@@ -70,12 +104,15 @@ class Session:
         self._channels.clear()
         self._fragment = Fragment()
         self._sequence_num = 0
+        self._resend_num += self._send_queue.resend_num
         self._send_queue = SendQueue(mtu_size - _ALL_HEADER_SIZE, self._send_frame_set)
+        self._send_time.clear()
         self._sendable.clear()
 
     def close(self):
         self._closed = True
         self._send_waiting_packets()
+        self._send_time.clear()
 
     def frame_received(self, packet_sequence_num: int, frames: List[RakNetFrame]) -> None:
         # TODO make sure to need check reliable_message_num
@@ -91,8 +128,9 @@ class Session:
 
     def _process_frames(self, frames: List[RakNetFrame]) -> None:
         for frame in frames:
-            _logger.debug('> %s', LogString(frame))
-            getattr(self, '_process_' + frame.type.name.lower())(frame)
+            if _logger.isEnabledFor(DEBUG):
+                _logger.debug('> %s', LogString(frame))
+            self._frame_handlers[frame.type](self, frame)
 
     def _process_unreliable(self, frame: RakNetFrame) -> None:
         self._send_to_game_handler(frame.payload)
@@ -132,6 +170,8 @@ class Session:
             action(sequence_num)
 
     def _nck_action(self, sequence_num: int) -> None:
+        self._nck_received_num += 1
+        self._send_time.pop(sequence_num, None)
         try:
             for reliable_sequence_num in self._resend_candidates[sequence_num]:
                 self._send_queue.resend(reliable_sequence_num)
@@ -139,6 +179,11 @@ class Session:
             pass
 
     def _ack_action(self, sequence_num: int) -> None:
+        send_time = self._send_time.pop(sequence_num, None)
+        if send_time is not None:
+            rtt = time.time() - send_time
+            self._rtt = rtt if self._rtt is None \
+                else self._rtt + _RTT_SMOOTHING_FACTOR * (rtt - self._rtt)
         try:
             for reliable_sequence_num in self._resend_candidates[sequence_num]:
                 self._send_queue.discard(reliable_sequence_num)
@@ -152,10 +197,21 @@ class Session:
     def _send_waiting_packets(self) -> None:
         self._send_ack_or_nck(RakNetPacketType.ACK, self._ack_set)
         self._send_ack_or_nck(RakNetPacketType.NCK, self._nck_set)
+        self._nck_sent_num += len(self._nck_set)
         self._ack_set.clear()
         self._nck_set.clear()
+        self._prune_send_time()
         self._send_queue.send()
 
+    def _prune_send_time(self) -> None:
+        """Forget the time sent of packets whose ACK or NCK doesn't arrive within RESEND_TIME."""
+        expiration_time = time.time() - get_value(ConfigKey.RESEND_TIME) / 1000
+        while len(self._send_time) > 0:
+            sequence_num, send_time = next(iter(self._send_time.items()))
+            if send_time > expiration_time:
+                break
+            del self._send_time[sequence_num]
+
     def _send_ack_or_nck(self, packet_id: RakNetPacketType, ack_set: Set[int]) -> None:
         sendto = self._send_to_client
 
@@ -189,5 +245,6 @@ class Session:
         """Callback from SendQueue."""
         packet = _create_send_packet(self._sequence_num, payload)
         self._resend_candidates[packet.packet_sequence_num] = reliable_sequence_num
+        self._send_time[packet.packet_sequence_num] = time.time()
         self._sequence_num += 1
         self._send_to_client(packet)
@@ -11,6 +11,7 @@ import protocol_login_logout
 import protocol_play
 import protocol_unconnected
 import rail
+import session_manager
 import world_block
 import world_creative
 import world_survival
@@ -21,6 +22,7 @@ def load_tests(loader, tests, pattern):
     modules = (
         doctestsuite,
         geometry,
+        session_manager,
         command,
         chunk_codec,
         chunk_edit,
@@ -1,7 +1,7 @@
 from pyminehub.mcpe.chunk import decode_chunk
 from pyminehub.mcpe.const import BlockType
 from pyminehub.mcpe.geometry import Vector3
-from pyminehub.mcpe.value import Block
+from pyminehub.mcpe.value import Block, PlacedBlock
 from testcase.chunk import ChunkTestCase
 
 
@@ -35,6 +35,43 @@ class ChunkEditTestCase(ChunkTestCase):
         for y in range(height, 127):
             self.assertEqual(BlockType.AIR, chunk.get_block(base.copy(y=y)).type)
 
+    def test_fill_block(self):
+        filled_chunk = decode_chunk(self.data)
+        expected_chunk = decode_chunk(self.data)
+        start, end = Vector3(2, 60, 3), Vector3(5, 70, 4)
+        stone = Block.create(BlockType.STONE, 0)
+        wool = Block.create(BlockType.WOOL, 5)
+        air = Block.create(BlockType.AIR, 0)
+
+        filled_chunk.fill(start, end, wool)
+        filled_chunk.set_column(0, 0, [stone] * 3, y=80)
+        filled_chunk.set_blocks([PlacedBlock(Vector3(9, 1, 9), air), PlacedBlock(Vector3(9, 90, 9), wool)])
+
+        for x in range(start.x, end.x + 1):
+            for z in range(start.z, end.z + 1):
+                for y in range(start.y, end.y + 1):
+                    expected_chunk.set_block(Vector3(x, y, z), wool)
+        for y in range(80, 83):
+            expected_chunk.set_block(Vector3(0, y, 0), stone)
+        expected_chunk.set_block(Vector3(9, 1, 9), air)
+        expected_chunk.set_block(Vector3(9, 90, 9), wool)
+
+        sub_chunks = tuple(expected_chunk)[0]
+        self.assertEqual(len(sub_chunks), len(tuple(filled_chunk)[0]))
+        for expected_sub_chunk, filled_sub_chunk in zip(sub_chunks, tuple(filled_chunk)[0]):
+            self.assertEqual(tuple(expected_sub_chunk), tuple(filled_sub_chunk))
+        self.assertEqual(71, filled_chunk.get_height(start.x, start.z))
+        self.assertEqual(83, filled_chunk.get_height(0, 0))
+        self.assertEqual(91, filled_chunk.get_height(9, 9))
+
+        filled_chunk.fill(Vector3(9, 1, 9), Vector3(9, 127, 9), air)
+        self.assertEqual(1, filled_chunk.get_height(9, 9))
+
+        filled_chunk.set_block(Vector3(9, 40, 9), stone)
+        self.assertEqual(41, filled_chunk.get_height(9, 9))
+        filled_chunk.set_block(Vector3(9, 40, 9), air)
+        self.assertEqual(1, filled_chunk.get_height(9, 9))
+
 
 if __name__ == '__main__':
     import unittest
@@ -12,19 +12,36 @@ class DocTestCase(unittest.TestCase):
         module_path = [
             'pyminehub/config',
             'pyminehub/value',
+            'pyminehub/metrics',
+            'pyminehub/dispatch',
             'pyminehub/binutil/converter',
             'pyminehub/binutil/composite',
             'pyminehub/network/codec',
+            'pyminehub/network/trace',
+            'pyminehub/network/metrics',
             'pyminehub/raknet/codec',
             'pyminehub/mcpe/const',
             'pyminehub/mcpe/geometry',
+            'pyminehub/mcpe/chunk',
             'pyminehub/mcpe/value',
             'pyminehub/mcpe/command/annotation',
             'pyminehub/mcpe/command/api',
             'pyminehub/mcpe/plugin/loader',
+            'pyminehub/mcpe/plugin/profiler',
             'pyminehub/mcpe/item/spec',
             'pyminehub/mcpe/block/spec',
+            'pyminehub/mcpe/block/property',
+            'pyminehub/mcpe/network/admission',
             'pyminehub/mcpe/network/codec/connection',
+            'pyminehub/mcpe/network/compression',
+            'pyminehub/mcpe/network/traffic',
+            'pyminehub/mcpe/network/viewdistance',
+            'pyminehub/mcpe/world/eventqueue',
+            'pyminehub/mcpe/world/executor',
+            'pyminehub/mcpe/world/inbox',
+            'pyminehub/mcpe/world/pregenerator',
+            'pyminehub/mcpe/world/streaming',
+            'pyminehub/mcpe/world/tick',
         ]
         for path in module_path:
             with self.subTest(module=path):
@@ -0,0 +1,222 @@
+import uuid
+from unittest import TestCase
+
+from pyminehub.mcpe.action import ActionType
+from pyminehub.mcpe.command.api import CommandRegistry
+from pyminehub.mcpe.const import BlockType
+from pyminehub.mcpe.event import EventType, event_factory
+from pyminehub.mcpe.geometry import Vector3, ChunkPosition
+from pyminehub.mcpe.network.packet import GamePacketType
+from pyminehub.mcpe.network.player import Player
+from pyminehub.mcpe.network.server import MCPEServerHandler
+from pyminehub.mcpe.network.session import SessionManager
+from pyminehub.mcpe.network.value import PlayerData, ClientData
+from pyminehub.mcpe.value import Block, PlacedBlock
+from util.mock import MockWorldProxy
+
+
+def _create_player(name: str) -> Player:
+    player_data = PlayerData('', uuid.uuid4(), name, '')
+    client_data = ClientData(0, 'en_US', '', '', b'', '', '')
+    return Player(0, player_data, client_data)
+
+
+def _login_sequence():
+    yield
+
+
+def _load_chunks(player: Player) -> None:
+    for request in player.next_required_chunk():
+        player.discard_chunk_request(request.position)
+        player.add_loaded_chunk(request.position)
+
+
+class SessionManagerTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self._manager = SessionManager()
+        self._player = _create_player('Taro')
+        self._addr = ('192.168.0.2', 19132)
+        self._manager.append(self._player, self._addr)
+        self._other_player = _create_player('Hanako')
+        self._other_addr = ('192.168.0.3', 19132)
+        self._manager.append(self._other_player, self._other_addr)
+        self._other_player.set_identity(3, 4)
+
+    def test_identity(self):
+        self.assertEqual([(self._other_addr, self._other_player)], list(self._manager))
+        self.assertIsNone(self._manager.find_by_entity(2))
+
+        self._player.set_identity(1, 2)
+        self.assertEqual(2, len(list(self._manager)))
+        self.assertEqual((self._addr, self._player), self._manager.find_by_entity(2))
+        self.assertEqual((self._other_addr, self._other_player), self._manager.find_by_entity(4))
+        self.assertEqual([(self._addr, self._player)], list(self._manager.excluding(self._other_player)))
+
+    def test_ready_and_living(self):
+        self._player.set_identity(1, 2)
+        self._player.login(_login_sequence())
+        self._player.update_required_chunk(1)
+        requests = self._player.next_required_chunk()
+        self.assertEqual(9, len(requests))
+        self.assertEqual([], list(self._manager.ready()))
+        self.assertEqual([], list(self._manager.living()))
+
+        for request in requests[:-1]:
+            self._player.discard_chunk_request(request.position)
+        self.assertEqual([], list(self._manager.ready()))
+        self._player.discard_chunk_request(requests[-1].position)
+        self.assertEqual([(self._addr, self._player)], list(self._manager.ready()))
+        self.assertEqual([], list(self._manager.living()))
+
+        self.assertTrue(self._player.next_login_sequence(None))
+        self.assertEqual([(self._addr, self._player)], list(self._manager.living()))
+
+        # chunks are requested again when the player moves away
+        self._player.position = Vector3(16.0 * 10, 64.0, 0.0)
+        self.assertEqual(9, len(self._player.next_required_chunk()))
+        self.assertEqual([], list(self._manager.ready()))
+        self.assertEqual([(self._addr, self._player)], list(self._manager.living()))
+
+    def test_subscribers(self):
+        self._player.set_identity(1, 2)
+        self._player.update_required_chunk(1)
+        _load_chunks(self._player)
+        self._other_player.position = Vector3(16.0 * 2, 64.0, 0.0)
+        self._other_player.update_required_chunk(1)
+        _load_chunks(self._other_player)
+
+        self.assertEqual([(self._addr, self._player)], list(self._manager.subscribers(ChunkPosition(0, 0))))
+        self.assertEqual(2, len(list(self._manager.subscribers(ChunkPosition(1, 0)))))
+        self.assertEqual(
+            [(self._other_addr, self._other_player)], list(self._manager.subscribers(ChunkPosition(3, 0))))
+        self.assertEqual([], list(self._manager.subscribers(ChunkPosition(4, 0))))
+
+        # chunks out of the chunk radius are unloaded
+        self._player.position = Vector3(-16.0 * 2, 64.0, 0.0)
+        _load_chunks(self._player)
+        self.assertEqual([], list(self._manager.subscribers(ChunkPosition(0, 1))))
+        self.assertEqual(
+            [(self._other_addr, self._other_player)], list(self._manager.subscribers(ChunkPosition(1, 0))))
+        self.assertEqual([(self._addr, self._player)], list(self._manager.subscribers(ChunkPosition(-3, 0))))
+
+    def test_watchers(self):
+        self._player.set_identity(1, 2)
+        self._player.monitor_entity(4)
+        self._player.monitor_entity(5)
+        self._other_player.monitor_entity(5)
+        self.assertEqual([(self._addr, self._player)], list(self._manager.watchers(4)))
+        self.assertEqual(2, len(list(self._manager.watchers(5))))
+
+        self._player.removed_monitored(5)
+        self.assertEqual([(self._other_addr, self._other_player)], list(self._manager.watchers(5)))
+        self._player.removed_monitored(4)
+        self.assertEqual([], list(self._manager.watchers(4)))
+
+    def test_delete(self):
+        self._player.set_identity(1, 2)
+        self._player.login(_login_sequence())
+        self._player.update_required_chunk(1)
+        _load_chunks(self._player)
+        self._player.next_login_sequence(None)
+        self._player.monitor_entity(4)
+        self.assertEqual([(self._addr, self._player)], list(self._manager.ready()))
+
+        del self._manager[self._addr]
+        self.assertNotIn(self._addr, self._manager)
+        self.assertNotIn(self._player.id, self._manager)
+        self.assertEqual([(self._other_addr, self._other_player)], list(self._manager))
+        self.assertEqual([], list(self._manager.living()))
+        self.assertEqual([], list(self._manager.ready()))
+        self.assertEqual([], list(self._manager.subscribers(ChunkPosition(0, 0))))
+        self.assertEqual([], list(self._manager.watchers(4)))
+        self.assertIsNone(self._manager.find_by_entity(2))
+        self.assertEqual({}, self._manager._subscribers)
+        self.assertEqual({}, self._manager._watchers)
+        self.assertEqual({4: self._other_addr}, self._manager._entity_address)
+
+        # the deleted player no longer changes the indexes
+        self._player.add_loaded_chunk(ChunkPosition(5, 5))
+        self.assertEqual([], list(self._manager.subscribers(ChunkPosition(5, 5))))
+
+
+class _RecordingHandler(MCPEServerHandler):
+
+    def __init__(self) -> None:
+        super().__init__(MockWorldProxy(), CommandRegistry())
+        self.sent = []
+
+    def send_game_packet(self, packet, addr, immediately=True) -> None:
+        self.sent.append((addr, packet.type))
+
+    def send_waiting_game_packet(self, addr) -> None:
+        pass
+
+    def send_connection_packet(self, packet, addr, reliability) -> None:
+        pass
+
+
+class ChunkSubscriptionTestCase(TestCase):
+
+    def setUp(self) -> None:
+        self._handler = _RecordingHandler()
+        self._players = {}
+        for i, chunk_x in enumerate((0, 10)):
+            player = _create_player('Player{}'.format(i))
+            addr = ('192.168.0.{}'.format(i + 2), 19132)
+            self._handler._session_manager.append(player, addr)
+            player.set_identity(i + 1, i + 1)
+            player.position = Vector3(16.0 * chunk_x, 64.0, 0.0)
+            player.update_required_chunk(1)
+            _load_chunks(player)
+            self._players[addr] = player
+        self._addr, self._other_addr = tuple(self._players)
+
+    def tearDown(self) -> None:
+        self._handler.terminate()
+
+    def _receivers(self, event) -> list:
+        self._handler.sent.clear()
+        self._handler._process_event(event)
+        return sorted(self._handler.sent)
+
+    def _update_block(self, chunk_x: int) -> list:
+        placed_block = PlacedBlock(Vector3(16 * chunk_x + 1, 60, 1), Block.create(BlockType.STONE, 0))
+        return self._receivers(event_factory.create(EventType.BLOCK_UPDATED, (placed_block, )))
+
+    def _update_chunk(self, chunk_x: int) -> list:
+        return self._receivers(event_factory.create(EventType.CHUNK_UPDATED, ChunkPosition(chunk_x, 0), b''))
+
+    def test_update_reaches_subscribers(self):
+        self.assertEqual([(self._addr, GamePacketType.UPDATE_BLOCK)], self._update_block(0))
+        self.assertEqual([(self._other_addr, GamePacketType.UPDATE_BLOCK)], self._update_block(10))
+        self.assertEqual([], self._update_block(5))
+        self.assertEqual([(self._addr, GamePacketType.FULL_CHUNK_DATA)], self._update_chunk(1))
+        self.assertEqual([(self._other_addr, GamePacketType.FULL_CHUNK_DATA)], self._update_chunk(9))
+        self.assertEqual([], self._update_chunk(5))
+
+    def test_unloaded_chunk(self):
+        player = self._players[self._addr]
+        player.position = Vector3(-16.0 * 10, 64.0, 0.0)
+        _load_chunks(player)
+        self.assertEqual([], self._update_block(0))
+        self.assertEqual([], self._update_chunk(0))
+        self.assertEqual([(self._addr, GamePacketType.UPDATE_BLOCK)], self._update_block(-10))
+
+        other_player = self._players[self._other_addr]
+        other_player.position = Vector3(16.0, 64.0, 0.0)
+        _load_chunks(other_player)
+        self.assertEqual([(self._other_addr, GamePacketType.UPDATE_BLOCK)], self._update_block(0))
+        self.assertEqual([(self._other_addr, GamePacketType.FULL_CHUNK_DATA)], self._update_chunk(0))
+
+    def test_disconnected_player(self):
+        self._handler._world.push_event(ActionType.LOGOUT_PLAYER, ())
+        self._handler.disconnect(self._addr)
+        self.assertEqual([], self._update_block(0))
+        self.assertEqual([], self._update_chunk(0))
+        self.assertEqual([(self._other_addr, GamePacketType.UPDATE_BLOCK)], self._update_block(10))
+
+
+if __name__ == '__main__':
+    import unittest
+    unittest.main()
@@ -1,7 +1,7 @@
 import asyncio
 from collections import deque
 from pkgutil import get_data
-from typing import Callable, Optional, Tuple, Union
+from typing import Callable, Iterator, Optional, Tuple, Union
 
 from pyminehub.mcpe.action import Action, ActionType
 from pyminehub.mcpe.chunk import Chunk
@@ -64,6 +64,9 @@ class MockDataStore(DataStore):
     def load_chunk(self, position: ChunkPosition) -> Optional[Chunk]:
         return self._load(position, self._chunk)
 
+    def load_chunk_positions(self) -> Iterator[ChunkPosition]:
+        return iter(tuple(self._chunk))
+
     def count_chunk(self) -> int:
         return len(self._chunk)
 
@@ -4,7 +4,7 @@ import world_creative
 from pyminehub.mcpe.action import ActionType
 from pyminehub.mcpe.const import *
 from pyminehub.mcpe.event import event_factory, EventType
-from pyminehub.mcpe.geometry import Vector3, Face
+from pyminehub.mcpe.geometry import Vector3, Face, ChunkPosition
 from pyminehub.mcpe.value import *
 
 
@@ -1223,6 +1223,46 @@ class WorldBlockTestCase(world_creative.WorldCreativeTestCase):
             (Vector3(x=257, y=64, z=256), BlockType.CHEST, 5),)
         self._assert_inventory_updated(item)
 
+    def test_fill_blocks(self):
+        self.test_login()
+        self.perform_action(
+            ActionType.FILL_BLOCKS,
+            start=Vector3(x=256, y=63, z=256),
+            end=Vector3(x=255, y=64, z=256),
+            block=Block.create(BlockType.PLANKS, 0)
+        )
+        self._assert_block_updated(
+            (Vector3(x=255, y=63, z=256), BlockType.PLANKS, 0),
+            (Vector3(x=255, y=64, z=256), BlockType.PLANKS, 0),
+            (Vector3(x=256, y=63, z=256), BlockType.PLANKS, 0),
+            (Vector3(x=256, y=64, z=256), BlockType.PLANKS, 0))
+
+        self.perform_action(
+            ActionType.SET_BLOCKS,
+            blocks=(
+                PlacedBlock(Vector3(x=256, y=64, z=256), Block.create(BlockType.AIR, 0)),
+                PlacedBlock(Vector3(x=256, y=128, z=256), Block.create(BlockType.PLANKS, 0)))
+        )
+        self._assert_block_updated(
+            (Vector3(x=256, y=64, z=256), BlockType.AIR, 0),)
+
+        item = self._equip(ItemType.PLANKS, 0)
+        self._put_item(Vector3(x=255, y=64, z=256), Vector3(0.5, 1.0, 0.5), Face.TOP, item)
+        self._assert_block_updated(
+            (Vector3(x=255, y=65, z=256), BlockType.PLANKS, 0),)
+        self._assert_inventory_updated(item)
+
+        # the chunk is resent instead of many blocks in it
+        self.perform_action(
+            ActionType.FILL_BLOCKS,
+            start=Vector3(x=256, y=70, z=256),
+            end=Vector3(x=271, y=71, z=271),
+            block=Block.create(BlockType.PLANKS, 0)
+        )
+        actual_event = self.next_event()
+        self.assertEqual(EventType.CHUNK_UPDATED, actual_event.type)
+        self.assertEqual(ChunkPosition(16, 16), actual_event.position)
+
 
 if __name__ == '__main__':
     import unittest
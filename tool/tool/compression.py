@@ -0,0 +1,75 @@
+"""
+Benchmark for compression of BATCH payloads.
+
+When tuning, execute `from tool.compression import *` in REPL.
+
+>>> result = bench(load_payloads('mppm_login_logout.txt'), levels=(0, 7), repeat=1)
+>>> [row.level for row in result]
+['0', '7', 'adaptive']
+>>> result[0].saved_bytes < result[1].saved_bytes
+True
+"""
+import time
+import zlib
+from typing import NamedTuple as _NamedTuple, List, Sequence, Tuple
+
+from pyminehub.binutil.converter import DataCodecContext
+from pyminehub.binutil.instance import VAR_INT_DATA
+from pyminehub.mcpe.network.compression import CompressionPolicy
+from pyminehub.mcpe.network.packet import ConnectionPacketType
+
+from tool.decoding import load_packets
+
+_Payload = Tuple[bytes, Tuple[int, ...]]
+
+BenchResult = _NamedTuple('BenchResult', [
+    ('level', str),
+    ('raw_bytes', int),
+    ('saved_bytes', int),
+    ('time', float)
+])
+
+
+def load_payloads(raknet_raw_file_name: str) -> List[_Payload]:
+    """Load BATCH payloads before compression with ID of game packets in them."""
+    payloads = []
+    for packet in load_packets(raknet_raw_file_name):
+        if packet.type is not ConnectionPacketType.BATCH:
+            continue
+        payload = bytearray()
+        context = DataCodecContext()
+        for p in packet.payloads:
+            VAR_INT_DATA.write(payload, len(p), context)
+            payload += p
+        payloads.append((bytes(payload), tuple(p[0] for p in packet.payloads if len(p) > 0)))
+    return payloads
+
+
+def _measure(level: str, payloads: Sequence[_Payload], compress, repeat: int) -> BenchResult:
+    raw_bytes = sum(len(payload) for payload, _ in payloads)
+    compressed_bytes = 0
+    start_time = time.process_time()
+    for _ in range(repeat):
+        compressed_bytes = sum(len(compress(payload, packet_ids)) for payload, packet_ids in payloads)
+    spent_time = (time.process_time() - start_time) / repeat
+    return BenchResult(level, raw_bytes, raw_bytes - compressed_bytes, round(spent_time, 6))
+
+
+def bench(payloads: Sequence[_Payload], levels: Sequence[int]=range(10), repeat: int=10) -> List[BenchResult]:
+    """Report bytes saved against CPU time spent, for each fixed level and the adaptive policy."""
+    result = list(
+        _measure(str(level), payloads, lambda payload, _, _level=level: zlib.compress(payload, _level), repeat)
+        for level in levels)
+    result.append(_measure('adaptive', payloads, CompressionPolicy().compress, repeat))
+    return result
+
+
+def print_bench(raknet_raw_file_name: str='mppm_login_logout.txt') -> None:
+    print('{:>8} {:>10} {:>10} {:>10}'.format('level', 'raw', 'saved', 'time'))
+    for row in bench(load_payloads(raknet_raw_file_name)):
+        print('{:>8} {:>10} {:>10} {:>10.6f}'.format(*row))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,87 @@
+"""
+Micro-benchmark for dispatching messages to handler methods.
+
+When tuning, execute `from tool.dispatch import *` in REPL.
+
+>>> result = bench(repeat=1)
+>>> [row.name for row in result]
+['getattr', 'table']
+>>> result[1].count
+1024
+"""
+import time
+from typing import Callable, NamedTuple as _NamedTuple, List, Sequence
+
+from pyminehub.dispatch import DispatchTable
+from pyminehub.mcpe.network.packet import GamePacketType
+
+BenchResult = _NamedTuple('BenchResult', [
+    ('name', str),
+    ('count', int),
+    ('time_per_message', float)
+])
+
+_MESSAGE_TYPES = (
+    GamePacketType.MOVE_PLAYER,
+    GamePacketType.PLAYER_ACTION,
+    GamePacketType.ANIMATE,
+    GamePacketType.INVENTORY_TRANSACTION
+)
+
+_HANDLERS = DispatchTable(GamePacketType, '_process_')
+
+
+class _Receiver:
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._handlers = _HANDLERS.of(type(self))
+
+    def receive_by_getattr(self, message_type: GamePacketType) -> None:
+        getattr(self, '_process_' + message_type.name.lower())(message_type)
+
+    def receive_by_table(self, message_type: GamePacketType) -> None:
+        self._handlers[message_type](self, message_type)
+
+    def _process_move_player(self, message_type: GamePacketType) -> None:
+        self.count += 1
+
+    def _process_player_action(self, message_type: GamePacketType) -> None:
+        self.count += 1
+
+    def _process_animate(self, message_type: GamePacketType) -> None:
+        self.count += 1
+
+    def _process_inventory_transaction(self, message_type: GamePacketType) -> None:
+        self.count += 1
+
+
+def _measure(name: str, receive: Callable[[GamePacketType], None], steps: int, repeat: int) -> BenchResult:
+    messages = list(_MESSAGE_TYPES[i % len(_MESSAGE_TYPES)] for i in range(steps))
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        for message_type in messages:
+            receive(message_type)
+    spent_time = (time.perf_counter() - start_time) / repeat
+    return BenchResult(name, steps, round(spent_time / steps, 9))
+
+
+def bench(steps: int=1024, repeat: int=100) -> List[BenchResult]:
+    """Report time spent dispatching a message, by building the method name and by the dispatch table."""
+    receiver = _Receiver()
+    return [
+        _measure('getattr', receiver.receive_by_getattr, steps, repeat),
+        _measure('table', receiver.receive_by_table, steps, repeat)
+    ]
+
+
+def print_bench(names: Sequence[str]=('getattr', 'table')) -> None:
+    print('{:>12} {:>8} {:>12}'.format('name', 'count', 'usec/msg'))
+    for row in bench():
+        if row.name in names:
+            print('{:>12} {:>8} {:>12.3f}'.format(row.name, row.count, row.time_per_message * 1e6))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
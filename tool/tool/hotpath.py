@@ -0,0 +1,86 @@
+"""
+Micro-benchmark for Block and Vector3 on the hot paths of movement and block edit.
+
+When tuning, execute `from tool.hotpath import *` in REPL.
+
+>>> result = bench(repeat=1)
+>>> [row.name for row in result]
+['move', 'block_edit']
+>>> result[1].retained_bytes_per_op
+0.0
+"""
+import time
+import tracemalloc
+from typing import Callable, NamedTuple as _NamedTuple, List, Sequence
+
+from pyminehub.mcpe.chunk import Chunk
+from pyminehub.mcpe.const import BlockType
+from pyminehub.mcpe.geometry import ChunkPosition, Vector3, to_local_position
+from pyminehub.mcpe.plugin.default import DefaultChunkGenerator
+from pyminehub.mcpe.value import Block
+
+BenchResult = _NamedTuple('BenchResult', [
+    ('name', str),
+    ('count', int),
+    ('retained_bytes_per_op', float),
+    ('time_per_op', float)
+])
+
+_STEP = Vector3(0.25, 0.0, 0.125)
+_BELOW = Vector3(0, -1, 0)
+
+
+def _move(chunk: Chunk, result: List) -> None:
+    """Follow the work done on MOVE_PLAYER: find the chunk and the block under the feet."""
+    position = Vector3(0.5, 63.0, 0.5)
+    for i in range(len(result)):
+        position = position + _STEP
+        ChunkPosition.at(position)
+        result[i] = chunk.get_block(to_local_position(position) + _BELOW)
+
+
+def _block_edit(chunk: Chunk, result: List) -> None:
+    """Follow the work done on a block edit: read the current block and put a new one."""
+    block = Block.create(BlockType.COBBLESTONE, 0)
+    for i in range(len(result)):
+        position = Vector3(i & 0xf, 60 + (i >> 8 & 0x3), i >> 4 & 0xf)
+        result[i] = chunk.get_block(position)
+        chunk.set_block(position, block)
+
+
+def _measure(name: str, func: Callable[[Chunk, List], None], steps: int, repeat: int) -> BenchResult:
+    chunk = DefaultChunkGenerator().create(ChunkPosition(0, 0))
+    result = [None] * steps
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    func(chunk, result)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    retained_bytes = max(0, after - before)
+    start_time = time.perf_counter()
+    for _ in range(repeat):
+        func(chunk, result)
+    spent_time = (time.perf_counter() - start_time) / repeat
+    return BenchResult(name, steps, round(retained_bytes / steps, 1), round(spent_time / steps, 9))
+
+
+def bench(steps: int=1024, repeat: int=10) -> List[BenchResult]:
+    """Report bytes of the Block values retained and time spent, per operation.
+
+    Blocks read from the chunk are held by the world (e.g. in PlacedBlock),
+    so the retained bytes show how many Block values are allocated instead of shared.
+    """
+    return [_measure('move', _move, steps, repeat), _measure('block_edit', _block_edit, steps, repeat)]
+
+
+def print_bench(names: Sequence[str]=('move', 'block_edit')) -> None:
+    print('{:>12} {:>8} {:>12} {:>12}'.format('name', 'count', 'bytes/op', 'usec/op'))
+    for row in bench():
+        if row.name in names:
+            print('{:>12} {:>8} {:>12.1f} {:>12.3f}'.format(
+                row.name, row.count, row.retained_bytes_per_op, row.time_per_op * 1e6))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()